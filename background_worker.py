@@ -0,0 +1,76 @@
+import queue
+import threading
+from typing import Any, Callable, List, Tuple
+
+class TaskCancelled(Exception):
+    """Levantada dentro da tarefa quando ela é cancelada"""
+
+class BackgroundTask:
+    """Executa uma função em uma thread separada, sem tocar no Tk
+
+    A função recebe a própria tarefa como primeiro argumento e deve chamar
+    `report(fração)` periodicamente: é ali que o progresso é publicado e o
+    cancelamento é verificado. Laços que não publicam progresso recebem
+    `checkpoint` (por exemplo como `cancel_check` do PipelineAnalyzer). A
+    thread principal consome as mensagens com poll() (por exemplo a partir
+    de `root.after`).
+
+    Com `after`, a função só começa depois que aquela tarefa terminar (em
+    geral a anterior, recém-cancelada), de modo que duas tarefas nunca usam
+    ao mesmo tempo o mesmo analisador. A espera é feita na thread nova.
+    """
+
+    def __init__(self, target: Callable[..., Any], *args, after: "BackgroundTask" = None):
+        self._queue = queue.Queue()
+        self._cancel = threading.Event()
+        self._after = after
+        self._thread = threading.Thread(target=self._run, args=(target, args), daemon=True)
+        self.finished = False
+        self._thread.start()
+
+    def _run(self, target, args):
+        try:
+            if self._after is not None:
+                self._after.join()
+                self._after = None
+            if self._cancel.is_set():
+                raise TaskCancelled()
+            self._queue.put(("done", target(self, *args)))
+        except TaskCancelled:
+            self._queue.put(("cancelled", None))
+        except Exception as e:
+            self._queue.put(("error", e))
+
+    def join(self, timeout: float = None) -> None:
+        """Espera a thread da tarefa terminar"""
+        self._thread.join(timeout)
+
+    def report(self, fraction: float) -> None:
+        """Publica o progresso (0.0 a 1.0) e interrompe a tarefa se ela foi cancelada"""
+        if self._cancel.is_set():
+            raise TaskCancelled()
+        self._queue.put(("progress", fraction))
+
+    def checkpoint(self) -> None:
+        """Interrompe a tarefa se ela foi cancelada, sem publicar progresso"""
+        if self._cancel.is_set():
+            raise TaskCancelled()
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def poll(self) -> List[Tuple[str, Any]]:
+        """Retorna, sem bloquear, as mensagens publicadas desde a última chamada"""
+        messages = []
+        while True:
+            try:
+                kind, payload = self._queue.get_nowait()
+            except queue.Empty:
+                return messages
+            if kind != "progress":
+                self.finished = True
+            messages.append((kind, payload))
@@ -0,0 +1,78 @@
+"""Benchmark do decodificador: caminho escalar (decode_instruction) x lote (decode_batch)"""
+import argparse
+import time
+
+import numpy as np
+
+from riscv_classifier import (
+    decode_batch, decode_instruction, get_opcode, get_rd, get_funct3, get_rs1,
+    get_rs2, get_funct7, get_imm_i, get_imm_s, get_imm_b, get_imm_u, get_imm_j,
+    decode_word, sign_extend, IMM_BITS
+)
+
+SCALAR_FIELDS = {
+    "opcode": get_opcode,
+    "rd": get_rd,
+    "funct3": get_funct3,
+    "rs1": get_rs1,
+    "rs2": get_rs2,
+    "funct7": get_funct7,
+    "imm_i": get_imm_i,
+    "imm_s": get_imm_s,
+    "imm_b": get_imm_b,
+    "imm_u": get_imm_u,
+    "imm_j": get_imm_j,
+}
+
+def random_words(count, seed=0):
+    """Gera `count` palavras de 32 bits aleatórias"""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, 1 << 32, size=count, dtype=np.uint32)
+
+def verify(words, batch):
+    """Confere, campo a campo, o lote contra as funções escalares"""
+    for i, word in enumerate(words.tolist()):
+        for name, getter in SCALAR_FIELDS.items():
+            if int(batch[name][i]) != getter(word):
+                raise AssertionError(f"{name} diverge em 0x{word:08X}")
+        for fmt, bits in IMM_BITS.items():
+            expected = sign_extend(SCALAR_FIELDS["imm_" + fmt](word), bits)
+            if int(batch["simm_" + fmt][i]) != expected:
+                raise AssertionError(f"simm_{fmt} diverge em 0x{word:08X}")
+        decoded = decode_word(word)
+        for name in ("type_code", "flags", "mnemonic"):
+            if int(batch[name][i]) != getattr(decoded, name):
+                raise AssertionError(f"{name} diverge em 0x{word:08X}")
+
+def bench_decode(count, scalar_count):
+    words = random_words(count)
+
+    start = time.perf_counter()
+    batch = decode_batch(words)
+    batch_time = time.perf_counter() - start
+
+    scalar_words = words[:scalar_count].tolist()
+    start = time.perf_counter()
+    for word in scalar_words:
+        decode_instruction(word)
+    scalar_time = time.perf_counter() - start
+
+    verify(words[:min(count, 100_000)], batch)
+
+    batch_rate = count / batch_time
+    scalar_rate = len(scalar_words) / scalar_time
+    print(f"decode_batch:       {count:>12,} palavras em {batch_time:8.3f} s ({batch_rate:,.0f} instr/s)")
+    print(f"decode_instruction: {len(scalar_words):>12,} palavras em {scalar_time:8.3f} s ({scalar_rate:,.0f} instr/s)")
+    print(f"speedup: {batch_rate / scalar_rate:.1f}x")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=10_000_000,
+                        help="número de palavras decodificadas em lote")
+    parser.add_argument("--scalar-count", type=int, default=1_000_000,
+                        help="número de palavras decodificadas pelo caminho escalar")
+    args = parser.parse_args()
+    bench_decode(args.count, min(args.count, args.scalar_count))
+
+if __name__ == "__main__":
+    main()
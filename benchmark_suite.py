@@ -0,0 +1,272 @@
+"""Suíte de benchmarks do decodificador e do analisador, com baselines em JSON
+
+Cada benchmark roda sobre programas sintéticos (program_generator) de 1k, 100k
+e 10M instruções, e o resultado é o menor tempo entre as repetições. Com
+--save os tempos viram uma baseline; com --compare cada tempo é comparado ao
+da baseline e o script termina com código 1 se algum ficar mais lento que a
+tolerância.
+
+    python benchmark_suite.py --sizes 1000,100000 --save baseline.json
+    python benchmark_suite.py --sizes 1000,100000 --compare baseline.json
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence
+
+from control_flow import ControlFlowGraph
+from branch_prediction import default_predictors
+from cache_model import Cache
+from delay_slots import fill_delay_slots
+from instruction_formatter import InstructionFormatter
+from instruction_table import clear_decode_caches
+from pipeline_analyzer import PipelineAnalyzer
+from program_generator import (
+    ProgramProfile, generate_branch_trace, generate_loop_program, generate_program
+)
+from riscv_classifier import decode_instruction, read_hex_file
+from riscv_simulator import Simulator
+
+BASELINE_VERSION = 1
+DEFAULT_SIZES = (1_000, 100_000, 10_000_000)
+DEFAULT_REPEAT = 3
+# Acima deste tamanho cada benchmark roda uma única vez
+REPEAT_LIMIT = 1_000_000
+# Fração de aumento de tempo tolerada antes de acusar regressão
+DEFAULT_TOLERANCE = 0.25
+
+@dataclass
+class BenchmarkInput:
+    words: Sequence[int]
+    hex_path: str
+
+    def analyzer(self) -> PipelineAnalyzer:
+        return PipelineAnalyzer(list(self.words))
+
+def _decode_instruction(data: BenchmarkInput) -> Callable[[], object]:
+    words = data.words.tolist()
+    def run():
+        for word in words:
+            decode_instruction(word)
+    return run
+
+def _read_hex_file(data: BenchmarkInput) -> Callable[[], object]:
+    return lambda: read_hex_file(data.hex_path)
+
+def _decode_instructions(data: BenchmarkInput) -> Callable[[], object]:
+    analyzer = data.analyzer()
+    clear_decode_caches()  # Senão decode_buffer devolveria a tabela já criada
+    return analyzer._decode_instructions
+
+def _detect_data_conflicts(data: BenchmarkInput) -> Callable[[], object]:
+    analyzer = data.analyzer()
+    return analyzer.detect_data_conflicts
+
+def _control_flow(data: BenchmarkInput) -> Callable[[], object]:
+    analyzer = data.analyzer()
+    return lambda: ControlFlowGraph(analyzer.table)
+
+def _insert_nops(data: BenchmarkInput) -> Callable[[], object]:
+    analyzer = data.analyzer()
+    conflicts = analyzer.detect_data_conflicts()
+    return lambda: analyzer.insert_nops(conflicts)
+
+def _reorder_instructions(data: BenchmarkInput) -> Callable[[], object]:
+    analyzer = data.analyzer()
+    conflicts = analyzer.detect_data_conflicts()
+    return lambda: analyzer.reorder_instructions(conflicts)
+
+def _apply_delayed_branch(data: BenchmarkInput) -> Callable[[], object]:
+    analyzer = data.analyzer()
+    cfg = analyzer.control_flow()
+    return lambda: fill_delay_slots(analyzer.table, cfg)
+
+def _branch_predictors(data: BenchmarkInput) -> Callable[[], object]:
+    # Um evento de desvio por instrução do tamanho medido
+    trace = generate_branch_trace(len(data.words))
+    predictors = default_predictors()
+    def run():
+        for predictor in predictors:
+            predictor.run(trace)
+    return run
+
+def _simulate(data: BenchmarkInput) -> Callable[[], object]:
+    # Laço que executa tantas instruções quanto o tamanho medido
+    words = generate_loop_program(len(data.words))
+    return lambda: Simulator(words).run()
+
+def _cache_model(data: BenchmarkInput) -> Callable[[], object]:
+    # Endereços de 16 KiB (alinhados a palavra) na cache padrão de 4 KiB
+    addresses = [word & 0x3FFC for word in data.words]
+    return lambda: Cache().access_many(addresses)
+
+def _analyze_all_techniques(data: BenchmarkInput) -> Callable[[], object]:
+    analyzer = data.analyzer()
+    return analyzer.analyze_all_techniques
+
+def _format_listing(data: BenchmarkInput) -> Callable[[], object]:
+    table = data.analyzer().table
+    formatter = InstructionFormatter(numbered=True)
+    def run():
+        with open(os.devnull, "w") as file:
+            formatter.write(table, file)
+    return run
+
+# Nome -> preparação; a preparação (fora da medição) roda antes de cada
+# repetição, com os caches de decodificação vazios, e retorna a função medida
+BENCHMARKS: Dict[str, Callable[[BenchmarkInput], Callable[[], object]]] = {
+    "decode_instruction": _decode_instruction,
+    "read_hex_file": _read_hex_file,
+    "_decode_instructions": _decode_instructions,
+    "detect_data_conflicts": _detect_data_conflicts,
+    "control_flow": _control_flow,
+    "insert_nops": _insert_nops,
+    "reorder_instructions": _reorder_instructions,
+    "apply_delayed_branch": _apply_delayed_branch,
+    "branch_predictors": _branch_predictors,
+    "simulate": _simulate,
+    "cache_model": _cache_model,
+    "analyze_all_techniques": _analyze_all_techniques,
+    "format_listing": _format_listing,
+}
+
+def write_hex_file(path: str, words: Sequence[int]) -> None:
+    with open(path, "w") as file:
+        for start in range(0, len(words), 1 << 16):
+            file.write("".join(f"{word:08X}\n" for word in words[start:start + (1 << 16)]))
+
+def measure(prepare: Callable[[BenchmarkInput], Callable[[], object]], data: BenchmarkInput,
+            repeat: int) -> float:
+    """Menor tempo de `repeat` execuções, com preparação e coleta de lixo fora da medição"""
+    best = float("inf")
+    for _ in range(repeat):
+        clear_decode_caches()
+        run = prepare(data)
+        gc.collect()
+        gc.disable()
+        try:
+            start = time.perf_counter()
+            run()
+            elapsed = time.perf_counter() - start
+        finally:
+            gc.enable()
+        best = min(best, elapsed)
+        run = None
+    return best
+
+def run_suite(sizes: Sequence[int], names: Sequence[str], profile: ProgramProfile,
+              repeat: int = DEFAULT_REPEAT, seed: int = 0,
+              report: Callable[[str, int, float], None] = None) -> Dict[str, Dict[str, float]]:
+    """Executa os benchmarks `names` em cada tamanho; chaves 'nome@tamanho'"""
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for size in sizes:
+            words = generate_program(size, profile, seed)
+            hex_path = os.path.join(directory, f"program_{size}.txt")
+            write_hex_file(hex_path, words)
+            data = BenchmarkInput(words, hex_path)
+            rounds = repeat if size <= REPEAT_LIMIT else 1
+            for name in names:
+                seconds = measure(BENCHMARKS[name], data, rounds)
+                results[f"{name}@{size}"] = {
+                    "seconds": seconds,
+                    "instructions_per_second": size / seconds if seconds else 0.0,
+                }
+                if report is not None:
+                    report(name, size, seconds)
+            os.remove(hex_path)
+    return results
+
+def baseline_document(results: Dict[str, Dict[str, float]], profile: ProgramProfile,
+                      seed: int) -> Dict:
+    return {
+        "version": BASELINE_VERSION,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "platform": platform.platform(),
+        "profile": profile.to_dict(),
+        "seed": seed,
+        "results": results,
+    }
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict,
+            tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    """Imprime a razão em relação à baseline e retorna as chaves que regrediram"""
+    regressions = []
+    reference = baseline.get("results", {})
+    for key, result in results.items():
+        previous = reference.get(key)
+        if previous is None or not previous["seconds"]:
+            print(f"{key:<40} sem baseline")
+            continue
+        ratio = result["seconds"] / previous["seconds"]
+        regressed = ratio > 1.0 + tolerance
+        if regressed:
+            regressions.append(key)
+        mark = "REGRESSÃO" if regressed else ("melhora" if ratio < 1.0 - tolerance else "")
+        print(f"{key:<40} {previous['seconds']:10.4f} s -> {result['seconds']:10.4f} s "
+              f"({ratio:5.2f}x) {mark}")
+    return regressions
+
+def _parse_sizes(text: str) -> List[int]:
+    return [int(value.replace("_", "")) for value in text.split(",") if value]
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=_parse_sizes, default=list(DEFAULT_SIZES),
+                        help="tamanhos dos programas, separados por vírgula")
+    parser.add_argument("--only", action="append", choices=list(BENCHMARKS),
+                        help="executa só este benchmark (pode repetir)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"repetições por medição (1 acima de {REPEAT_LIMIT:,} instruções)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--dependency-distance", type=float,
+                        default=ProgramProfile.dependency_distance,
+                        help="distância média até a produtora dos operandos")
+    parser.add_argument("--branch-density", type=float, default=ProgramProfile.branch_density,
+                        help="fração de desvios condicionais")
+    parser.add_argument("--jump-density", type=float, default=ProgramProfile.jump_density,
+                        help="fração de saltos (jal)")
+    parser.add_argument("--load", type=float, default=ProgramProfile.load,
+                        help="peso dos loads entre as instruções que não desviam")
+    parser.add_argument("--store", type=float, default=ProgramProfile.store,
+                        help="peso dos stores entre as instruções que não desviam")
+    parser.add_argument("--save", metavar="ARQUIVO", help="grava os resultados como baseline")
+    parser.add_argument("--compare", metavar="ARQUIVO", help="compara com uma baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="aumento relativo de tempo aceito antes de acusar regressão")
+    args = parser.parse_args(argv)
+
+    profile = ProgramProfile(
+        load=args.load, store=args.store, branch_density=args.branch_density,
+        jump_density=args.jump_density, dependency_distance=args.dependency_distance
+    )
+    names = args.only or list(BENCHMARKS)
+
+    def report(name: str, size: int, seconds: float) -> None:
+        print(f"{name:<24} {size:>12,} instr {seconds:10.4f} s ({size / seconds:,.0f} instr/s)",
+              flush=True)
+
+    results = run_suite(args.sizes, names, profile, args.repeat, args.seed, report)
+
+    status = 0
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)
+        if baseline.get("profile") != profile.to_dict() or baseline.get("seed") != args.seed:
+            print("Aviso: a baseline foi gerada com outro perfil de programa", file=sys.stderr)
+        if compare(results, baseline, args.tolerance):
+            status = 1
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(baseline_document(results, profile, args.seed), file, indent=2)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+from dataclasses import dataclass, field
+from typing import Any, Sequence
+
+from riscv_classifier import np
+
+ELF_MAGIC = b"\x7fELF"
+EM_RISCV = 243
+
+# Cabeçalho ELF após e_ident (e_type ... e_shstrndx) e cabeçalho de seção
+ELF_HEADER = {1: struct.Struct("<HHIIIIIHHHHHH"), 2: struct.Struct("<HHIQQQIHHHHHH")}
+SECTION_HEADER = {1: struct.Struct("<IIIIIIIIII"), 2: struct.Struct("<IIQQQQIIQQ")}
+
+@dataclass
+class ProgramImage:
+    """Instruções de um binário, como visão uint32 sem cópia sobre o arquivo mapeado"""
+    words: Sequence[int]
+    base_address: int = 0
+    path: str = ""
+    _mapping: Any = field(default=None, repr=False)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def address_of(self, index: int) -> int:
+        """Endereço da instrução `index`"""
+        return self.base_address + 4 * index
+
+    def index_of(self, address: int) -> int:
+        """Índice da instrução no endereço dado (ValueError se fora da seção)"""
+        offset = address - self.base_address
+        if offset % 4 or not 0 <= offset < 4 * len(self.words):
+            raise ValueError(f"endereço 0x{address:08X} fora da seção de código")
+        return offset // 4
+
+    def close(self) -> None:
+        """Libera o mapeamento do arquivo (as palavras deixam de ser válidas)"""
+        self.words = []
+        if self._mapping is not None:
+            try:
+                self._mapping.close()
+            except BufferError:
+                pass  # Ainda há visões das palavras em uso; o GC fecha depois
+            self._mapping = None
+
+def _word_view(mapping, offset: int, size: int):
+    """Visão uint32 little-endian de mapping[offset:offset+size], sem cópia"""
+    count = size // 4
+    if np is not None:
+        return np.frombuffer(mapping, dtype="<u4", count=count, offset=offset)
+    view = memoryview(mapping)[offset:offset + 4 * count].cast("I")
+    if sys.byteorder == "little":
+        return view
+    words = array("I", view)  # Máquina big-endian: precisa copiar
+    words.byteswap()
+    return words
+
+def _find_text_section(mapping) -> tuple:
+    """Retorna (offset, tamanho, endereço) da seção .text de um ELF32/ELF64
+
+    ELFs truncados ou malformados levantam ValueError.
+    """
+    size = len(mapping)
+    if size < 16:
+        raise ValueError("ELF truncado: cabeçalho incompleto")
+    elf_class, data_encoding = mapping[4], mapping[5]
+    if elf_class not in ELF_HEADER:
+        raise ValueError("classe ELF desconhecida")
+    if data_encoding != 1:
+        raise ValueError("apenas ELF little-endian é suportado")
+    if size < 16 + ELF_HEADER[elf_class].size:
+        raise ValueError("ELF truncado: cabeçalho incompleto")
+    header = ELF_HEADER[elf_class].unpack_from(mapping, 16)
+    machine, shoff = header[1], header[5]
+    shentsize, shnum, shstrndx = header[10], header[11], header[12]
+    if machine != EM_RISCV:
+        raise ValueError(f"ELF não é RISC-V (e_machine = {machine})")
+
+    section = SECTION_HEADER[elf_class]
+    if shnum == 0 or shstrndx >= shnum:
+        raise ValueError("ELF sem tabela de seções ou com e_shstrndx inválido")
+    if shentsize < section.size or shoff + shnum * shentsize > size:
+        raise ValueError("ELF truncado: tabela de seções fora do arquivo")
+    sections = [section.unpack_from(mapping, shoff + i * shentsize) for i in range(shnum)]
+    for _, kind, _, _, offset, length, *_ in sections:
+        # SHT_NOBITS (.bss) não ocupa espaço no arquivo
+        if kind != 8 and offset + length > size:
+            raise ValueError("ELF truncado: seção fora do arquivo")
+    names_offset = sections[shstrndx][4]
+    for name, _, _, addr, offset, length, *_ in sections:
+        start = names_offset + name
+        end = mapping.find(b"\0", start)
+        if start >= size or end < 0:
+            raise ValueError("ELF malformado: nome de seção fora do arquivo")
+        if mapping[start:end] == b".text":
+            return offset, length, addr
+    raise ValueError("seção .text não encontrada")
+
+def is_binary_program(path: str) -> bool:
+    """Indica se o arquivo é um ELF ou uma imagem binária crua (.bin)"""
+    if path.lower().endswith(".bin"):
+        return True
+    with open(path, "rb") as file:
+        return file.read(4) == ELF_MAGIC
+
+def load_program(path: str) -> ProgramImage:
+    """Mapeia em memória um executável ELF (seção .text) ou uma imagem binária crua
+
+    Imagens cruas são lidas como palavras little-endian a partir do endereço
+    0; bytes finais que não completam uma palavra são ignorados.
+    """
+    if os.path.getsize(path) == 0:
+        return ProgramImage(words=[], path=path)
+    with open(path, "rb") as file:
+        mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    if mapping[:4] == ELF_MAGIC:
+        try:
+            offset, size, address = _find_text_section(mapping)
+        except ValueError:
+            mapping.close()
+            raise
+    else:
+        offset, size, address = 0, len(mapping), 0
+    return ProgramImage(
+        words=_word_view(mapping, offset, size),
+        base_address=address,
+        path=path,
+        _mapping=mapping
+    )
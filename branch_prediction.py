@@ -0,0 +1,355 @@
+"""Modelos de predição de desvios sobre um trace dinâmico
+
+Em vez de cobrar bolhas fixas por desvio, cada modelo percorre a sequência
+de desvios e saltos executados (BranchTrace: PC, direção e destino) e conta
+as predições erradas; cada erro custa `penalty` bolhas (as mesmas
+CONTROL_SLOTS de um desvio resolvido no EX).
+
+Modelos: estático não-tomado, BTFN (para trás tomado, para frente não),
+tabelas de contadores de 1 ou 2 bits indexadas pelo PC (BHT), gshare
+(contadores indexados pelo PC xor histórico global) e um BTB mapeado
+diretamente, que só prevê tomado quando tem o destino guardado.
+
+As tabelas são arrays (bytearray/array). Com NumPy e traces longos, os
+modelos com tabela agrupam os eventos por entrada com um radix sort estável
+e simulam os contadores em blocos vetorizados (ver _scan_counters); sem
+NumPy o trace é percorrido evento a evento.
+"""
+from array import array
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, Sequence
+
+from instruction_table import np
+
+# Bolhas por predição errada (desvio resolvido no EX, como CONTROL_SLOTS)
+MISPREDICT_PENALTY = 2
+
+DEFAULT_BHT_ENTRIES = 1024
+DEFAULT_GSHARE_ENTRIES = 4096
+DEFAULT_BTB_ENTRIES = 64
+
+# Passos do laço de _scan_counters; abaixo disso o trace é percorrido evento a evento
+SCAN_STEPS = 2048
+NUMPY_MIN_EVENTS = 1 << 16
+
+class BranchTrace:
+    """Desvios e saltos executados, em ordem: endereço, se foi tomado e o destino
+
+    `targets` guarda o destino quando tomado (para desvios não tomados, o
+    alvo codificado na instrução).
+    """
+
+    def __init__(self, pcs: Iterable[int] = (), taken: Iterable[int] = (),
+                 targets: Iterable[int] = ()):
+        self.pcs = array('I', pcs)
+        self.taken = bytearray(taken)
+        self.targets = array('I', targets)
+        if not len(self.pcs) == len(self.taken) == len(self.targets):
+            raise ValueError("pcs, taken e targets precisam ter o mesmo tamanho")
+
+    def append(self, pc: int, taken: bool, target: int) -> None:
+        self.pcs.append(pc)
+        self.taken.append(1 if taken else 0)
+        self.targets.append(target)
+
+    def extend(self, other: "BranchTrace") -> None:
+        self.pcs.extend(other.pcs)
+        self.taken.extend(other.taken)
+        self.targets.extend(other.targets)
+
+    def __len__(self) -> int:
+        return len(self.pcs)
+
+    def taken_count(self) -> int:
+        return self.taken.count(1)
+
+    def arrays(self):
+        """Colunas como arrays NumPy (cópias, para não travar o redimensionamento)"""
+        return (np.array(self.pcs, dtype=np.uint32),
+                np.frombuffer(bytes(self.taken), dtype=np.uint8),
+                np.array(self.targets, dtype=np.uint32))
+
+@dataclass
+class PredictionStats:
+    predictor: str
+    events: int = 0
+    mispredictions: int = 0
+    penalty: int = MISPREDICT_PENALTY
+
+    @property
+    def accuracy(self) -> float:
+        return 1.0 - self.mispredictions / self.events if self.events else 1.0
+
+    @property
+    def stall_cycles(self) -> int:
+        return self.mispredictions * self.penalty
+
+    def to_dict(self) -> Dict[str, float]:
+        data = asdict(self)
+        data.update(accuracy=self.accuracy, stall_cycles=self.stall_cycles)
+        return data
+
+def _power_of_two(entries: int) -> int:
+    if entries < 1 or entries & (entries - 1):
+        raise ValueError(f"o número de entradas precisa ser potência de 2: {entries}")
+    return entries
+
+def _group(keys):
+    """Ordem estável dos eventos por entrada da tabela (radix sort para até 16 bits)"""
+    if len(keys) and int(keys.max()) < 1 << 16:
+        keys = keys.astype(np.uint16)
+    order = np.argsort(keys, kind="stable")
+    return order, keys[order]
+
+def _scan_counters(resets, taken, bits: int) -> int:
+    """Erros de contadores saturados sobre eventos já agrupados por entrada
+
+    `resets` marca o primeiro evento de cada entrada (estado inicial fraco
+    não-tomado). O trecho é dividido em `chunks` blocos percorridos juntos,
+    um evento de cada bloco por passo, e cada bloco é simulado a partir de
+    todos os estados iniciais possíveis; depois os blocos são encadeados
+    pelo estado final do anterior.
+    """
+    n = len(taken)
+    top = (1 << bits) - 1
+    threshold = 1 << (bits - 1)
+    initial = threshold - 1
+    chunks = max(1, n // SCAN_STEPS)
+    steps = -(-n // chunks)
+    # Código de cada evento: 2 * reinício + tomado. Eventos extras no fim
+    # reiniciam o contador e não são tomados, logo nunca erram
+    codes = np.full(chunks * steps, 2, dtype=np.uint8)
+    codes[:n] = taken
+    codes[:n] += resets.view(np.uint8) << 1
+    codes = np.ascontiguousarray(codes.reshape(chunks, steps).T) << bits
+
+    # Próximo estado e erro para cada (código, estado), em tabelas planas
+    states_count = top + 1
+    next_state = np.empty(4 * states_count, dtype=np.uint8)
+    error = np.empty(4 * states_count, dtype=np.uint8)
+    for code in range(4):
+        for state in range(states_count):
+            current = initial if code & 2 else state
+            outcome = code & 1
+            next_state[code * states_count + state] = \
+                min(current + 1, top) if outcome else max(current - 1, 0)
+            error[code * states_count + state] = (current >= threshold) != outcome
+
+    states = np.repeat(np.arange(states_count, dtype=np.uint8)[:, None], chunks, axis=1)
+    errors = np.zeros(states.shape, dtype=np.uint32)
+    index = np.empty(states.shape, dtype=np.uint8)
+    for code in codes:
+        np.add(states, code, out=index)
+        errors += error.take(index)
+        next_state.take(index, out=states)
+
+    mispredictions = 0
+    state = initial
+    for chunk_errors, chunk_states in zip(errors.T.tolist(), states.T.tolist()):
+        mispredictions += chunk_errors[state]
+        state = chunk_states[state]
+    return mispredictions
+
+def _counter_mispredictions(keys, taken, bits: int) -> int:
+    """Erros de uma tabela de contadores saturados de `bits` bits, começando em fraco não-tomado"""
+    n = len(keys)
+    if not n:
+        return 0
+    order, keys = _group(keys)
+    taken = taken[order]
+    first = np.empty(n, dtype=bool)
+    first[0] = True
+    np.not_equal(keys[1:], keys[:-1], out=first[1:])
+    if bits == 1:
+        # Erra a cada troca de direção na mesma entrada e no primeiro tomado de cada entrada
+        changed = np.empty(n, dtype=bool)
+        changed[0] = False
+        np.not_equal(taken[1:], taken[:-1], out=changed[1:])
+        return int(np.count_nonzero(np.where(first, taken, changed)))
+    return _scan_counters(first, taken, bits)
+
+class BranchPredictor:
+    """Base dos modelos: `mispredictions` conta os erros sobre um BranchTrace"""
+    name = "predictor"
+
+    def mispredictions(self, trace: BranchTrace) -> int:
+        if np is not None and len(trace) >= NUMPY_MIN_EVENTS:
+            return self._mispredictions_numpy(*trace.arrays())
+        return self._mispredictions_python(trace.pcs, trace.taken, trace.targets)
+
+    def _mispredictions_python(self, pcs: Sequence[int], taken: Sequence[int],
+                               targets: Sequence[int]) -> int:
+        raise NotImplementedError
+
+    def _mispredictions_numpy(self, pcs, taken, targets) -> int:
+        return self._mispredictions_python(pcs.tolist(), taken.tolist(), targets.tolist())
+
+    def run(self, trace: BranchTrace, penalty: int = MISPREDICT_PENALTY) -> PredictionStats:
+        return PredictionStats(self.name, len(trace), self.mispredictions(trace), penalty)
+
+class StaticNotTaken(BranchPredictor):
+    """Nunca desvia: erra todo desvio tomado"""
+    name = "not_taken"
+
+    def mispredictions(self, trace: BranchTrace) -> int:
+        return trace.taken_count()
+
+    def _mispredictions_python(self, pcs, taken, targets) -> int:
+        return sum(1 for outcome in taken if outcome)
+
+class BackwardTaken(BranchPredictor):
+    """BTFN: desvios para trás (laços) tomados, para frente não tomados"""
+    name = "btfn"
+
+    def _mispredictions_python(self, pcs, taken, targets) -> int:
+        return sum(1 for pc, outcome, target in zip(pcs, taken, targets)
+                   if bool(outcome) != (target < pc))
+
+    def _mispredictions_numpy(self, pcs, taken, targets) -> int:
+        return int(np.count_nonzero(taken.astype(bool) != (targets < pcs)))
+
+class BimodalPredictor(BranchPredictor):
+    """BHT: um contador saturado de `bits` bits por entrada, indexado pelo PC"""
+
+    def __init__(self, entries: int = DEFAULT_BHT_ENTRIES, bits: int = 2):
+        if bits not in (1, 2):
+            raise ValueError("a BHT usa contadores de 1 ou 2 bits")
+        self.entries = _power_of_two(entries)
+        self.bits = bits
+        self.name = f"bht{bits}[{entries}]"
+
+    def _mispredictions_python(self, pcs, taken, targets) -> int:
+        top = (1 << self.bits) - 1
+        threshold = 1 << (self.bits - 1)
+        table = bytearray([threshold - 1]) * self.entries
+        mask = self.entries - 1
+        mispredictions = 0
+        for index, outcome in zip(self._indices_python(pcs, taken), taken):
+            index &= mask
+            state = table[index]
+            if outcome:
+                if state < threshold:
+                    mispredictions += 1
+                if state < top:
+                    table[index] = state + 1
+            else:
+                if state >= threshold:
+                    mispredictions += 1
+                if state:
+                    table[index] = state - 1
+        return mispredictions
+
+    def _indices_python(self, pcs, taken) -> Iterable[int]:
+        return (pc >> 2 for pc in pcs)
+
+    def _mispredictions_numpy(self, pcs, taken, targets) -> int:
+        return _counter_mispredictions((pcs >> 2) & np.uint32(self.entries - 1), taken, self.bits)
+
+class GsharePredictor(BimodalPredictor):
+    """Contadores de 2 bits indexados pelo PC xor as últimas direções (histórico global)"""
+
+    def __init__(self, entries: int = DEFAULT_GSHARE_ENTRIES, history: int = None):
+        super().__init__(entries, 2)
+        self.history = history if history is not None else entries.bit_length() - 1
+        self.name = f"gshare[{entries}]"
+
+    def _indices_python(self, pcs, taken) -> Iterable[int]:
+        mask = (1 << self.history) - 1
+        history = 0
+        for pc, outcome in zip(pcs, taken):
+            yield (pc >> 2) ^ history
+            history = ((history << 1) | outcome) & mask
+
+    def _mispredictions_numpy(self, pcs, taken, targets) -> int:
+        # Histórico antes de cada evento: a direção k eventos atrás no bit k-1,
+        # montado dobrando a janela (a de 2w bits junta duas de w)
+        history = np.zeros(len(pcs), dtype=np.uint32)
+        history[1:] = taken[:-1]
+        width = 1
+        while width < self.history:
+            history[width:] |= history[:-width] << np.uint32(width)
+            width *= 2
+        history &= np.uint32((1 << self.history) - 1)
+        indices = ((pcs >> 2) ^ history) & np.uint32(self.entries - 1)
+        return _counter_mispredictions(indices, taken, 2)
+
+class BranchTargetBuffer(BranchPredictor):
+    """BTB mapeado diretamente: prevê tomado, para o destino guardado, quando o PC está nele
+
+    Só desvios tomados são guardados; acerta se prevê não-tomado e o desvio
+    não é tomado, ou se prevê tomado para o destino certo.
+    """
+
+    def __init__(self, entries: int = DEFAULT_BTB_ENTRIES):
+        self.entries = _power_of_two(entries)
+        self.name = f"btb[{entries}]"
+
+    def _mispredictions_python(self, pcs, taken, targets) -> int:
+        mask = self.entries - 1
+        tags = array('q', [-1]) * self.entries
+        destinations = array('I', [0]) * self.entries
+        mispredictions = 0
+        for pc, outcome, target in zip(pcs, taken, targets):
+            index = (pc >> 2) & mask
+            hit = tags[index] == pc
+            if outcome:
+                if not hit or destinations[index] != target:
+                    mispredictions += 1
+                tags[index] = pc
+                destinations[index] = target
+            elif hit:
+                mispredictions += 1
+        return mispredictions
+
+    def _mispredictions_numpy(self, pcs, taken, targets) -> int:
+        n = len(pcs)
+        order, keys = _group((pcs >> 2) & np.uint32(self.entries - 1))
+        pcs, taken, targets = pcs[order], taken[order].astype(bool), targets[order]
+        positions = np.arange(n)
+        # Início da entrada de cada evento e último desvio tomado antes dele
+        boundary = np.empty(n, dtype=bool)
+        boundary[0] = True
+        boundary[1:] = keys[1:] != keys[:-1]
+        group_start = np.maximum.accumulate(np.where(boundary, positions, 0))
+        last_taken = np.maximum.accumulate(np.where(taken, positions, -1))
+        previous = np.empty(n, dtype=np.int64)
+        previous[0] = -1
+        previous[1:] = last_taken[:-1]
+        valid = previous >= group_start
+        source = np.where(valid, previous, 0)
+        hit = valid & (pcs[source] == pcs)
+        wrong_target = hit & (targets[source] != targets)
+        return int(np.count_nonzero(np.where(taken, ~hit | wrong_target, hit)))
+
+def default_predictors() -> tuple:
+    return (StaticNotTaken(), BackwardTaken(), BimodalPredictor(bits=1),
+            BimodalPredictor(bits=2), GsharePredictor(), BranchTargetBuffer())
+
+# Nome na linha de comando -> (classe, argumentos fixos)
+PREDICTORS = {
+    "not_taken": (StaticNotTaken, {}),
+    "btfn": (BackwardTaken, {}),
+    "bht1": (BimodalPredictor, {"bits": 1}),
+    "bht2": (BimodalPredictor, {"bits": 2}),
+    "gshare": (GsharePredictor, {}),
+    "btb": (BranchTargetBuffer, {}),
+}
+
+def create_predictor(spec: str) -> BranchPredictor:
+    """Modelo a partir de 'nome' ou 'nome:entradas' (por exemplo, bht2:4096)"""
+    name, _, entries = spec.partition(":")
+    if name not in PREDICTORS:
+        raise ValueError(f"preditor desconhecido: {name} (use {', '.join(PREDICTORS)})")
+    cls, kwargs = PREDICTORS[name]
+    if entries:
+        if cls in (StaticNotTaken, BackwardTaken):
+            raise ValueError(f"{name} não tem tabela")
+        kwargs = dict(kwargs, entries=int(entries))
+    return cls(**kwargs)
+
+def evaluate_predictors(trace: BranchTrace, predictors: Iterable[BranchPredictor] = None,
+                        penalty: int = MISPREDICT_PENALTY) -> Dict[str, PredictionStats]:
+    """Resultado de cada modelo (por padrão, todos de default_predictors) sobre `trace`"""
+    if predictors is None:
+        predictors = default_predictors()
+    return {predictor.name: predictor.run(trace, penalty) for predictor in predictors}
@@ -0,0 +1,245 @@
+"""Modelo de caches de instruções e de dados (conjunto-associativas)
+
+Cada cache tem tamanho, associatividade e tamanho de linha configuráveis
+(potências de 2), substituição LRU ou aleatória e uma penalidade fixa por
+falta. As tags ficam em um único array('q') com `ways` posições por
+conjunto; com LRU, cada conjunto é mantido em ordem de uso (a posição 0 é
+a mais recente), de modo que um acerto na linha mais recente custa uma
+comparação. Acessos consecutivos à mesma linha (a busca sequencial de
+instruções, por exemplo) nem chegam a consultar o conjunto.
+
+Stores são tratados como loads (write-allocate, write-back sem custo de
+escrita). CacheAnalysis consome os índices executados e os endereços
+efetivos de riscv_simulator e soma as faltas das duas caches.
+"""
+import random
+from array import array
+from dataclasses import dataclass, asdict
+from typing import Dict, Iterable, List, Optional
+
+from riscv_simulator import TraceConsumer
+
+REPLACEMENT_POLICIES = ("lru", "random")
+
+# Ciclos de bolha por falta (acesso à memória principal)
+DEFAULT_MISS_PENALTY = 10
+
+_INVALID = -1
+
+def _log2(value: int, name: str) -> int:
+    if value < 1 or value & (value - 1):
+        raise ValueError(f"{name} precisa ser uma potência de 2: {value}")
+    return value.bit_length() - 1
+
+@dataclass(frozen=True)
+class CacheConfig:
+    size: int = 4096  # Bytes
+    associativity: int = 2
+    line_size: int = 32  # Bytes
+    replacement: str = "lru"
+    miss_penalty: int = DEFAULT_MISS_PENALTY
+    seed: int = 0  # Para a substituição aleatória
+
+    @property
+    def sets(self) -> int:
+        return self.size // (self.associativity * self.line_size)
+
+# Configuração usada quando nenhuma é informada (imutável, pode ser compartilhada)
+DEFAULT_CACHE_CONFIG = CacheConfig()
+
+@dataclass
+class CacheStats:
+    name: str
+    accesses: int
+    misses: int
+    miss_penalty: int
+
+    @property
+    def hits(self) -> int:
+        return self.accesses - self.misses
+
+    @property
+    def miss_rate(self) -> float:
+        return self.misses / self.accesses if self.accesses else 0.0
+
+    @property
+    def stall_cycles(self) -> int:
+        return self.misses * self.miss_penalty
+
+    def to_dict(self) -> Dict[str, float]:
+        data = asdict(self)
+        data.update(hits=self.hits, miss_rate=self.miss_rate, stall_cycles=self.stall_cycles)
+        return data
+
+class Cache:
+    """Uma cache conjunto-associativa; o estado persiste entre chamadas de access_many"""
+
+    def __init__(self, config: CacheConfig = None, name: str = "cache"):
+        if config is None:
+            config = CacheConfig()
+        if config.replacement not in REPLACEMENT_POLICIES:
+            raise ValueError(f"política de substituição desconhecida: {config.replacement}")
+        self.line_bits = _log2(config.line_size, "line_size")
+        _log2(config.associativity, "associativity")
+        if config.sets < 1:
+            raise ValueError("size precisa comportar ao menos um conjunto")
+        _log2(config.sets, "size / (associativity * line_size)")
+        self.config = config
+        self.name = name
+        self.ways = config.associativity
+        self.set_mask = config.sets - 1
+        # Número da linha (endereço >> line_bits) guardado em cada posição
+        self.tags = array('q', [_INVALID]) * (config.sets * self.ways)
+        self.rng = random.Random(config.seed)
+        self.accesses = 0
+        self.misses = 0
+        self.last_line = _INVALID
+
+    def access(self, address: int) -> bool:
+        """Acessa um endereço; True em um acerto"""
+        return not self.access_many((address,))
+
+    def access_many(self, addresses: Iterable[int]) -> int:
+        """Acessa os endereços em ordem e retorna quantas faltas ocorreram"""
+        if self.ways == 1:
+            misses, count = self._direct(addresses)
+        elif self.config.replacement == "lru":
+            lru = self._lru2 if self.ways == 2 else self._lru
+            misses, count = lru(addresses)
+        else:
+            misses, count = self._random(addresses)
+        self.accesses += count
+        self.misses += misses
+        return misses
+
+    def _direct(self, addresses: Iterable[int]):
+        tags, line_bits, set_mask = self.tags, self.line_bits, self.set_mask
+        last = self.last_line
+        misses = count = 0
+        for address in addresses:
+            count += 1
+            line = address >> line_bits
+            if line == last:
+                continue
+            last = line
+            slot = line & set_mask
+            if tags[slot] != line:
+                tags[slot] = line
+                misses += 1
+        self.last_line = last
+        return misses, count
+
+    def _lru(self, addresses: Iterable[int]):
+        tags, line_bits, set_mask, ways = self.tags, self.line_bits, self.set_mask, self.ways
+        last = self.last_line
+        misses = count = 0
+        for address in addresses:
+            count += 1
+            line = address >> line_bits
+            if line == last:
+                continue
+            last = line
+            base = (line & set_mask) * ways
+            if tags[base] == line:
+                continue
+            stop = base + ways
+            resident = tags[base:stop]
+            if line in resident:
+                position = base + resident.index(line)
+            else:
+                position = stop - 1  # A menos recente sai
+                misses += 1
+            tags[base + 1:position + 1] = tags[base:position]
+            tags[base] = line
+        self.last_line = last
+        return misses, count
+
+    def _lru2(self, addresses: Iterable[int]):
+        """_lru para 2 vias, sem fatias: basta trocar as duas posições"""
+        tags, line_bits, set_mask = self.tags, self.line_bits, self.set_mask
+        last = self.last_line
+        misses = count = 0
+        for address in addresses:
+            count += 1
+            line = address >> line_bits
+            if line == last:
+                continue
+            last = line
+            base = (line & set_mask) << 1
+            recent = tags[base]
+            if recent == line:
+                continue
+            if tags[base + 1] != line:
+                misses += 1
+            tags[base + 1] = recent
+            tags[base] = line
+        self.last_line = last
+        return misses, count
+
+    def _random(self, addresses: Iterable[int]):
+        tags, line_bits, set_mask, ways = self.tags, self.line_bits, self.set_mask, self.ways
+        way_bits = ways.bit_length() - 1
+        getrandbits = self.rng.getrandbits
+        last = self.last_line
+        misses = count = 0
+        for address in addresses:
+            count += 1
+            line = address >> line_bits
+            if line == last:
+                continue
+            last = line
+            base = (line & set_mask) * ways
+            resident = tags[base:base + ways]
+            if line in resident:
+                continue
+            misses += 1
+            # Posições vazias são ocupadas antes de qualquer substituição
+            if _INVALID in resident:
+                tags[base + resident.index(_INVALID)] = line
+            else:
+                tags[base + getrandbits(way_bits)] = line
+        self.last_line = last
+        return misses, count
+
+    def stats(self) -> CacheStats:
+        return CacheStats(self.name, self.accesses, self.misses, self.config.miss_penalty)
+
+    def reset(self) -> None:
+        self.tags = array('q', [_INVALID]) * len(self.tags)
+        self.rng.seed(self.config.seed)
+        self.accesses = self.misses = 0
+        self.last_line = _INVALID
+
+class CacheAnalysis(TraceConsumer):
+    """I-cache e D-cache alimentadas pela execução de riscv_simulator
+
+    A I-cache recebe o endereço de cada instrução executada e a D-cache o
+    endereço efetivo de cada load e store. Qualquer uma das duas pode ser
+    desligada passando None.
+    """
+
+    def __init__(self, icache: Optional[CacheConfig] = DEFAULT_CACHE_CONFIG,
+                 dcache: Optional[CacheConfig] = DEFAULT_CACHE_CONFIG, base_address: int = 0):
+        self.icache = Cache(icache, "icache") if icache is not None else None
+        self.dcache = Cache(dcache, "dcache") if dcache is not None else None
+        self.base_address = base_address
+
+    def feed(self, indices: array, addresses: array) -> None:
+        if self.icache is not None:
+            base = self.base_address
+            self.icache.access_many([base + (index << 2) for index in indices])
+        if self.dcache is not None:
+            self.dcache.access_many(addresses)
+
+    def stats(self) -> List[CacheStats]:
+        return [cache.stats() for cache in (self.icache, self.dcache) if cache is not None]
+
+    @property
+    def stall_cycles(self) -> int:
+        return sum(stats.stall_cycles for stats in self.stats())
+
+def simulate_cache(addresses: Iterable[int], config: CacheConfig = None) -> CacheStats:
+    """Estatísticas de uma cache nova sobre uma sequência de endereços"""
+    cache = Cache(config)
+    cache.access_many(addresses)
+    return cache.stats()
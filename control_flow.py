@@ -0,0 +1,155 @@
+"""Grafo de fluxo de controle (CFG) com alvos de desvio resolvidos
+
+Os imediatos B e J são estendidos em sinal e convertidos em índices de
+instrução; o programa é dividido em blocos básicos (líderes: a primeira
+instrução, os alvos resolvidos e as instruções depois de cada desvio), e os
+inícios dos blocos ficam em um array ordenado, de modo que "qual bloco
+contém este PC" é uma busca binária. A varredura das instruções de controle
+é feita em uma única passada, com a busca pelas flags feita em C sobre os
+bytes da coluna (bytes.translate + itertools.compress).
+"""
+from array import array
+from bisect import bisect_right
+from itertools import compress
+from typing import Iterator, List, Optional, Tuple
+
+from instruction_table import InstructionTable, TYPE_CODES, FLAG_BRANCH, FLAG_JUMP
+
+# Alvo de desvio indireto (jalr) ou fora do programa
+NO_TARGET = -1
+
+# Byte 1 para as flags de desvio/salto, 0 para as demais
+_CONTROL_MASK = bytes(1 if value & (FLAG_BRANCH | FLAG_JUMP) else 0 for value in range(256))
+# Byte 1 para instruções de tipo desconhecido (ecall, fence, ...), que formam blocos próprios
+_UNKNOWN_MASK = bytes(1 if value == TYPE_CODES["UNKNOWN"] else 0 for value in range(256))
+
+# Bit de sinal dos imediatos B (13 bits) e J (21 bits)
+_SIGN_BITS = {TYPE_CODES["B"]: 1 << 12, TYPE_CODES["J"]: 1 << 20}
+
+def branch_offset(imm: int, type_code: int) -> Optional[int]:
+    """Deslocamento com sinal, em bytes, de um desvio B ou salto J (None para os demais)"""
+    sign = _SIGN_BITS.get(type_code)
+    if sign is None:
+        return None
+    return imm - ((imm & sign) << 1)
+
+# Alcance (em bytes) dos deslocamentos de desvios B e saltos J
+_OFFSET_LIMITS = {0x63: 1 << 12, 0x6F: 1 << 20}
+
+def with_branch_offset(word: int, offset: int) -> Optional[int]:
+    """A mesma instrução B ou J com outro deslocamento, ou None se ele não couber"""
+    opcode = word & 0x7F
+    limit = _OFFSET_LIMITS.get(opcode)
+    if limit is None or offset & 1 or not -limit <= offset < limit:
+        return None
+    if opcode == 0x63:
+        return (word & 0x01FFF07F) | (((offset >> 12) & 0x1) << 31) \
+            | (((offset >> 5) & 0x3F) << 25) | (((offset >> 1) & 0xF) << 8) \
+            | (((offset >> 11) & 0x1) << 7)
+    return (word & 0xFFF) | (((offset >> 20) & 0x1) << 31) | (((offset >> 1) & 0x3FF) << 21) \
+        | (((offset >> 11) & 0x1) << 20) | (((offset >> 12) & 0xFF) << 12)
+
+class ControlFlowGraph:
+    """Blocos básicos [início, fim) de uma InstructionTable e as arestas entre eles
+
+    `branches` e `targets` guardam, em ordem, o índice de cada instrução de
+    controle e o índice do seu alvo (NO_TARGET para jalr e alvos fora do
+    programa). Blocos são identificados pela posição em `starts`.
+    """
+
+    def __init__(self, table: InstructionTable, base_address: int = 0):
+        self.table = table
+        self.base_address = base_address
+        n = len(table)
+        self.size = n
+        self.branches = array('l')
+        self.targets = array('l')
+
+        leaders = bytearray(n + 1)
+        leaders[0] = leaders[n] = 1
+        type_codes, imms = table.type_code, table.imm
+        control = table.flags.tobytes().translate(_CONTROL_MASK)
+        unknown = table.type_code.tobytes().translate(_UNKNOWN_MASK)
+
+        # Só as instruções de controle passam pelo laço em Python
+        for index in compress(range(n), control):
+            leaders[index + 1] = 1
+            target = NO_TARGET
+            offset = branch_offset(imms[index], type_codes[index])
+            if offset is not None and not offset & 3:
+                target = index + (offset >> 2)
+                if 0 <= target < n:
+                    leaders[target] = 1
+                else:
+                    target = NO_TARGET
+            self.branches.append(index)
+            self.targets.append(target)
+        for index in compress(range(n), unknown):
+            leaders[index] = leaders[index + 1] = 1
+
+        # Inícios dos blocos, seguidos de n como sentinela
+        self.starts = array('l', compress(range(n + 1), leaders))
+        self.successors = self._link()
+        self._predecessors = None
+
+    def _link(self) -> List[Tuple[int, ...]]:
+        """Sucessores de cada bloco: o seguinte, exceto nos que terminam em desvio ou salto"""
+        count = len(self)
+        successors = [(block,) for block in range(1, count)] + [()] if count else []
+        # Cada desvio é a última instrução do seu bloco, e cada alvo resolvido é um início
+        block_id = dict(zip(self.starts, range(count + 1)))
+        flags = self.table.flags
+        for index, target in zip(self.branches, self.targets):
+            block = block_id[index + 1] - 1
+            taken = (block_id[target],) if target != NO_TARGET else ()
+            if flags[index] & FLAG_BRANCH:
+                fall_through = successors[block]
+                successors[block] = taken + fall_through if taken != fall_through else taken
+            else:
+                successors[block] = taken  # jal/jalr: sem fall-through
+        return successors
+
+    @property
+    def predecessors(self) -> List[List[int]]:
+        """Predecessores de cada bloco (calculados no primeiro acesso)"""
+        if self._predecessors is None:
+            self._predecessors = [[] for _ in range(len(self))]
+            for block, successor in self.edges():
+                self._predecessors[successor].append(block)
+        return self._predecessors
+
+    def __len__(self) -> int:
+        return len(self.starts) - 1
+
+    def block_range(self, block: int) -> Tuple[int, int]:
+        return self.starts[block], self.starts[block + 1]
+
+    def blocks(self) -> List[Tuple[int, int]]:
+        """Todos os blocos como (início, fim), no formato de basic_blocks"""
+        starts = self.starts
+        return [(starts[block], starts[block + 1]) for block in range(len(self))]
+
+    def block_of(self, index: int) -> int:
+        """Bloco que contém a instrução `index` (O(log n))"""
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        return bisect_right(self.starts, index) - 1
+
+    def block_at(self, pc: int) -> Optional[int]:
+        """Bloco que contém o endereço `pc`, ou None fora do programa"""
+        offset = pc - self.base_address
+        if offset & 3 or not 0 <= offset < 4 * self.size:
+            return None
+        return self.block_of(offset >> 2)
+
+    def target_of(self, index: int) -> int:
+        """Índice do alvo da instrução de controle `index` (NO_TARGET se não resolvido)"""
+        position = bisect_right(self.branches, index) - 1
+        if position < 0 or self.branches[position] != index:
+            raise ValueError(f"instrução {index} não é um desvio")
+        return self.targets[position]
+
+    def edges(self) -> Iterator[Tuple[int, int]]:
+        for block, successors in enumerate(self.successors):
+            for successor in successors:
+                yield block, successor
@@ -0,0 +1,322 @@
+"""Preenchimento dos slots de delayed branch
+
+Cada desvio ou salto ganha `slots` posições logo depois dele, executadas
+nos dois caminhos. Elas são preenchidas, nesta ordem:
+
+1. com instruções independentes de antes do desvio, no mesmo bloco básico,
+   que podem ser movidas para depois dele sem alterar nenhuma dependência;
+2. com cópias das primeiras instruções do alvo (o desvio passa a apontar
+   para depois delas), quando o registrador que escrevem não é lido no
+   caminho não tomado;
+3. com as instruções seguintes (fall-through), quando o registrador que
+   escrevem não é lido no caminho tomado.
+
+Os slots restantes recebem NOPs. Loads e stores só são movidos dentro do
+bloco (fase 1), nunca executados especulativamente. Todos os deslocamentos
+estáticos são recalculados para o novo layout (os alvos fora do programa
+mantêm a distância até o início ou o fim dele), de modo que o programa
+resultante continua válido.
+"""
+from bisect import bisect_right
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from control_flow import ControlFlowGraph, NO_TARGET, branch_offset, with_branch_offset
+from instruction_table import (
+    InstructionTable, TYPE_CODES, NO_REG, FLAG_BRANCH, FLAG_JUMP, FLAG_LOAD, FLAG_STORE
+)
+from riscv_classifier import MNEMONIC_IDS
+
+NOP = 0x00000013  # addi x0, x0, 0
+
+# Slots por desvio (o mesmo da implementação anterior)
+DELAY_SLOTS = 1
+
+_UNKNOWN = TYPE_CODES["UNKNOWN"]
+_CONTROL = FLAG_BRANCH | FLAG_JUMP
+_MEMORY = FLAG_LOAD | FLAG_STORE
+_AUIPC = MNEMONIC_IDS["auipc"]
+
+@dataclass
+class DelaySlotReport:
+    """Slots preenchidos por origem e comparação com a versão anterior
+
+    A versão anterior tinha um único slot, preenchido com a instrução
+    seguinte quando ela não dependia do desvio; com mais slots, os extras
+    contam como NOPs dela. Esse preenchimento nem sempre preservava o
+    programa (a instrução passava a executar também no caminho tomado), e
+    `legacy_unsafe` conta esses casos. Cada NOP custa um ciclo, e
+    `cycles_saved` compara com a versão anterior tendo os preenchimentos
+    inseguros trocados por NOPs.
+    """
+    branches: int = 0
+    slots: int = 0
+    filled_before: int = 0
+    filled_target: int = 0
+    filled_fall_through: int = 0
+    nops: int = 0
+    legacy_nops: int = 0
+    legacy_unsafe: int = 0
+    unrelocated: int = 0  # Desvios cujo novo deslocamento não cabe no imediato
+
+    @property
+    def filled(self) -> int:
+        return self.filled_before + self.filled_target + self.filled_fall_through
+
+    @property
+    def fill_rate(self) -> float:
+        return self.filled / self.slots if self.slots else 1.0
+
+    @property
+    def cycles_saved(self) -> int:
+        return self.legacy_nops + self.legacy_unsafe - self.nops
+
+    def to_dict(self) -> Dict[str, float]:
+        data = asdict(self)
+        data.update(filled=self.filled, fill_rate=self.fill_rate, cycles_saved=self.cycles_saved)
+        return data
+
+@dataclass
+class DelaySlotResult:
+    program: List[int]
+    report: DelaySlotReport
+
+class DelaySlotFiller:
+    """Preenche os slots de delay de todos os desvios de uma tabela"""
+
+    def __init__(self, table: InstructionTable, cfg: ControlFlowGraph = None,
+                 slots: int = DELAY_SLOTS, cancel_check: Optional[Callable[[], None]] = None):
+        if slots < 1:
+            raise ValueError("é preciso ao menos um slot de delay")
+        self.table = table
+        self.cfg = cfg if cfg is not None else ControlFlowGraph(table)
+        self.slots = slots
+        # Chamada a cada desvio para permitir cancelamento
+        self.cancel_check = cancel_check
+        self.size = len(table)
+        self.is_target = bytearray(self.size + 1)
+        for target in self.cfg.targets:
+            if target != NO_TARGET:
+                self.is_target[target] = 1
+        self.hoisted = bytearray(self.size + 1)
+
+    def _movable(self, index: int) -> bool:
+        """Pode ser executada em um slot: não é desvio, instrução desconhecida, auipc
+        (o resultado depende do PC) nem já foi movida"""
+        table = self.table
+        return not (table.flags[index] & _CONTROL or table.type_code[index] == _UNKNOWN
+                    or table.mnemonic[index] == _AUIPC or self.hoisted[index])
+
+    def _dead(self, register: int, start: int) -> bool:
+        """`register` é escrito antes de ser lido a partir de `start`, no mesmo bloco
+
+        Sem leitura nem escrita até o fim do bloco o registrador pode estar
+        vivo adiante (ou ao fim do programa), então a resposta é conservadora.
+        """
+        if register <= 0:
+            return True
+        if start >= self.size:
+            return False
+        table = self.table
+        rd, rs1, rs2 = table.rd, table.rs1, table.rs2
+        starts = self.cfg.starts
+        stop = starts[bisect_right(starts, start)]
+        for index in range(start, stop):
+            if rs1[index] == register or rs2[index] == register:
+                return False
+            if rd[index] == register:
+                return True
+        return False
+
+    def _legacy(self) -> Tuple[int, int]:
+        """NOPs e preenchimentos inseguros da implementação anterior"""
+        table = self.table
+        n = self.size
+        rd, rs1, rs2, flags = table.rd, table.rs1, table.rs2, table.flags
+        nops = unsafe = 0
+        consumed = -1
+        for index, target in zip(self.cfg.branches, self.cfg.targets):
+            if index == consumed:
+                continue  # Já ocupou o slot do desvio anterior
+            following = index + 1
+            if following < n:
+                written, read = rd[following], rd[index]
+                dependent = (written != NO_REG and written in (rs1[index], rs2[index])) or \
+                    (read != NO_REG and read in (rs1[following], rs2[following]))
+                if not dependent:
+                    consumed = following
+                    # A instrução seguinte também executa no caminho tomado
+                    if (target == NO_TARGET or flags[following] & (_CONTROL | _MEMORY)
+                            or table.type_code[following] == _UNKNOWN
+                            or not self._dead(written, target)):
+                        unsafe += 1
+                    continue
+            nops += 1
+        return nops, unsafe
+
+    def _hoist(self, branch: int) -> List[int]:
+        """Instruções de antes do desvio, no mesmo bloco, que podem ir para os slots"""
+        table = self.table
+        rd, rs1, rs2, flags = table.rd, table.rs1, table.rs2, table.flags
+        start = self.cfg.starts[bisect_right(self.cfg.starts, branch) - 1]
+        # O desvio lê suas fontes antes dos slots; jal/jalr escrevem o link antes deles
+        branch_reads = {r for r in (rs1[branch], rs2[branch]) if r > 0}
+        link = rd[branch]
+        reads, writes = set(), set()
+        loads = stores = False
+        chosen = []
+        for index in range(branch - 1, start - 1, -1):
+            if len(chosen) == self.slots:
+                break
+            written = rd[index] if rd[index] > 0 else None
+            read = {r for r in (rs1[index], rs2[index]) if r > 0}
+            memory = flags[index] & _MEMORY
+            if (not self.is_target[index] and self._movable(index)
+                    and written not in branch_reads and written not in reads
+                    and written not in writes and (link <= 0 or link != written)
+                    and link not in read and not read & writes
+                    and not (memory & FLAG_STORE and (loads or stores))
+                    and not (memory & FLAG_LOAD and stores)):
+                chosen.append(index)
+                continue
+            # Fica no lugar: as próximas candidatas passarão por cima dela
+            reads |= read
+            if written is not None:
+                writes.add(written)
+            loads = loads or bool(memory & FLAG_LOAD)
+            stores = stores or bool(memory & FLAG_STORE)
+        chosen.reverse()
+        return chosen
+
+    def _from_target(self, branch: int, target: int, remaining: int, own_block: bool) -> int:
+        """Quantas instruções do início do alvo podem ser copiadas para os slots"""
+        if target == NO_TARGET or target == branch + 1 or own_block:
+            return 0
+        table = self.table
+        conditional = table.flags[branch] & FLAG_BRANCH
+        starts = self.cfg.starts
+        stop = starts[bisect_right(starts, target)]
+        copies = 0
+        while copies < remaining and target + copies < stop:
+            index = target + copies
+            if not self._movable(index) or table.flags[index] & _MEMORY:
+                break
+            if conditional and not self._dead(table.rd[index], branch + 1):
+                break
+            copies += 1
+        # O desvio passa a apontar para depois das cópias, que precisa continuar no lugar
+        while copies and (target + copies >= self.size or self.hoisted[target + copies]):
+            copies -= 1
+        return copies
+
+    def _from_fall_through(self, branch: int, destination: int, remaining: int) -> int:
+        """`remaining` se as instruções seguintes podem ocupar todos os slots restantes, senão 0"""
+        table = self.table
+        if destination == NO_TARGET or not table.flags[branch] & FLAG_BRANCH:
+            return 0
+        starts = self.cfg.starts
+        first = branch + 1
+        if first >= self.size or first + remaining > starts[bisect_right(starts, first)]:
+            return 0
+        for index in range(first, first + remaining):
+            if not self._movable(index) or table.flags[index] & _MEMORY:
+                return 0
+            if not self._dead(table.rd[index], destination):
+                return 0
+        return remaining
+
+    def fill(self) -> DelaySlotResult:
+        table, cfg, slots = self.table, self.cfg, self.slots
+        words = table.hex_code
+        n = self.size
+        report = DelaySlotReport(branches=len(cfg.branches), slots=len(cfg.branches) * slots)
+
+        # Fase 1: todas as instruções movidas de antes dos desvios, para que as
+        # fases seguintes não copiem nem contem com uma instrução que saiu do lugar
+        cancel_check = self.cancel_check
+        hoists = []
+        for branch in cfg.branches:
+            if cancel_check is not None:
+                cancel_check()
+            chosen = self._hoist(branch)
+            for index in chosen:
+                self.hoisted[index] = 1
+            hoists.append(chosen)
+
+        # Fase 2: cópias do alvo e instruções seguintes
+        plans: List[Tuple[int, List[int], int, int]] = []
+        for branch, target, chosen in zip(cfg.branches, cfg.targets, hoists):
+            if cancel_check is not None:
+                cancel_check()
+            remaining = slots - len(chosen)
+            copies = fall_through = 0
+            if remaining:
+                own_block = bool(chosen) and target != NO_TARGET and \
+                    cfg.block_of(target) == cfg.block_of(branch)
+                copies = self._from_target(branch, target, remaining, own_block)
+                destination = target + copies if target != NO_TARGET else NO_TARGET
+                fall_through = self._from_fall_through(branch, destination, remaining - copies)
+            plans.append((branch, chosen, copies, remaining - copies - fall_through))
+            report.filled_before += len(chosen)
+            report.filled_target += copies
+            report.filled_fall_through += fall_through
+
+        # Novo layout; (início antigo, início novo) de cada trecho copiado sem mudanças
+        program: List[int] = []
+        old_starts: List[int] = []
+        new_starts: List[int] = []
+
+        def emit(start: int, stop: int) -> None:
+            if start < stop:
+                old_starts.append(start)
+                new_starts.append(len(program))
+                program.extend(words[start:stop])
+
+        sources = []  # Posição de cada desvio no novo layout
+        position = 0
+        for (branch, chosen, copies, nops), target in zip(plans, cfg.targets):
+            for index in chosen:
+                emit(position, index)
+                position = index + 1
+            emit(position, branch + 1)
+            position = branch + 1
+            sources.append(len(program) - 1)
+            program.extend(words[index] for index in chosen)
+            if copies:
+                program.extend(words[target:target + copies])
+            program.extend([NOP] * nops)
+            report.nops += nops
+        emit(position, n)
+
+        def new_index(index: int) -> int:
+            # Fora do programa a distância até o início ou o fim é mantida
+            if index < 0:
+                return index
+            if index >= n:
+                return len(program) + index - n
+            run = bisect_right(old_starts, index) - 1
+            return new_starts[run] + index - old_starts[run]
+
+        # Recalcula os deslocamentos dos desvios com alvo estático (jalr fica como está)
+        for (branch, _, copies, _), target, source in zip(plans, cfg.targets, sources):
+            if target == NO_TARGET:
+                offset = branch_offset(table.imm[branch], table.type_code[branch])
+                if offset is None or offset & 3:
+                    continue
+                target = branch + (offset >> 2)  # Fora do programa
+            offset = (new_index(target + copies) - source) * 4
+            word = with_branch_offset(words[branch], offset)
+            if word is None:
+                report.unrelocated += 1
+            else:
+                program[source] = word
+
+        legacy_nops, report.legacy_unsafe = self._legacy()
+        report.legacy_nops = legacy_nops + len(cfg.branches) * (slots - 1)
+        return DelaySlotResult(program, report)
+
+def fill_delay_slots(table: InstructionTable, cfg: ControlFlowGraph = None,
+                     slots: int = DELAY_SLOTS,
+                     cancel_check: Optional[Callable[[], None]] = None) -> DelaySlotResult:
+    """Atalho para DelaySlotFiller(table, cfg, slots, cancel_check).fill()"""
+    return DelaySlotFiller(table, cfg, slots, cancel_check).fill()
@@ -0,0 +1,266 @@
+"""Análise de pipeline mantida em dia com edições linha a linha da entrada
+
+Em vez de reconstruir PipelineAnalyzer a cada alteração, IncrementalAnalyzer
+recebe apenas as linhas alteradas, decodifica só as palavras dessas linhas e
+corrige os resultados guardados: os conflitos só mudam dentro da janela de
+lookahead em volta da edição, e as bolhas (NOPs) voltam a coincidir com as
+anteriores poucas instruções depois dela.
+"""
+from array import array
+from bisect import bisect_left
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from instruction_table import InstructionTable, FLAG_BRANCH, FLAG_JUMP
+from pipeline_analyzer import (
+    PipelineAnalyzer, HazardScoreboard, ConflictType, DEFAULT_LOOKAHEAD, CONTROL_SLOTS,
+    NOP, TECHNIQUES
+)
+from riscv_classifier import parse_hex_line
+
+# Estado de cada linha da entrada
+LINE_EMPTY = 0    # Em branco ou só comentário
+LINE_WORD = 1     # Uma instrução
+LINE_INVALID = 2  # Texto que não é uma instrução (ignorado)
+
+class DirtyLines:
+    """Faixa de linhas alteradas desde a última análise
+
+    Cada edição substitui `removed` linhas a partir de `start` por `added`
+    linhas. As edições são acumuladas em uma única faixa
+    (início, fim antigo, fim novo): as linhas [início, fim antigo) do texto
+    já analisado viraram as linhas [início, fim novo) do texto atual.
+    """
+
+    def __init__(self):
+        self.range = None
+
+    def replace(self, start: int, removed: int, added: int) -> None:
+        end = start + removed
+        if self.range is None:
+            self.range = (start, end, start + added)
+            return
+        first, old_end, new_end = self.range
+        # Linhas depois de new_end correspondem às antigas depois de old_end
+        union_end = max(new_end, end)
+        self.range = (
+            min(first, start),
+            old_end + union_end - new_end,
+            union_end + added - removed
+        )
+
+    def take(self) -> Tuple[int, int, int]:
+        """Retorna a faixa acumulada e começa uma nova"""
+        dirty, self.range = self.range, None
+        return dirty
+
+class NopStream:
+    """Conflitos, bolhas e programa com NOPs de uma técnica, corrigidos por trechos
+
+    `detect(analyzer, start, stop)` retorna, em ordem de consumidora, os
+    conflitos cujas consumidoras estão em [start, stop); cada conflito só
+    envolve instruções a no máximo `window` posições uma da outra.
+    `consumers` acompanha `conflicts` com o índice da consumidora de cada
+    um, para as buscas binárias.
+    """
+
+    def __init__(self, analyzer: PipelineAnalyzer, detect: Callable, window: int,
+                 with_forwarding: bool):
+        self.analyzer = analyzer
+        self.detect = detect
+        self.window = window
+        self.with_forwarding = with_forwarding
+        self.conflicts = []
+        self.consumers = array('l')
+        self.stalls = array('l')
+        self.program = []
+
+    @property
+    def overhead(self) -> int:
+        return len(self.program) - len(self.stalls)
+
+    def splice(self, start: int, stop: int, count: int) -> None:
+        """Corrige o estado depois que as instruções [start, stop) viraram `count` novas
+
+        A tabela do analisador já deve estar atualizada.
+        """
+        self._splice_conflicts(start, stop, count)
+        self._splice_stalls(start, stop, count)
+
+    def _splice_conflicts(self, start: int, stop: int, count: int) -> None:
+        conflicts, consumers, window = self.conflicts, self.consumers, self.window
+        n = len(self.analyzer.table)
+        delta = count - (stop - start)
+        # Consumidoras a mais de `window` posições da edição mantêm os conflitos
+        head = bisect_left(consumers, start)
+        tail = bisect_left(consumers, stop + window)
+        fresh = self.detect(self.analyzer, start, min(n, start + count + window))
+        if delta:
+            shifted = [(i + delta, j + delta, kind) for i, j, kind in conflicts[tail:]]
+            shifted_consumers = array('l', [j + delta for j in consumers[tail:]])
+        else:
+            shifted, shifted_consumers = conflicts[tail:], consumers[tail:]
+        conflicts[head:] = fresh + shifted
+        consumers[head:] = array('l', [j for _, j, _ in fresh]) + shifted_consumers
+
+    def _splice_stalls(self, start: int, stop: int, count: int) -> None:
+        analyzer, old_stalls = self.analyzer, self.stalls
+        words = analyzer.table.hex_code
+        if start == 0 and stop == len(old_stalls):
+            # Programa inteiro substituído: cálculo direto
+            self.stalls = analyzer.compute_stalls(self.conflicts, self.with_forwarding)
+            self.program = _with_nops(words, self.stalls, 0)
+            return
+
+        n = len(analyzer.table)
+        delta = count - (stop - start)
+        window = max(self.window, 1)
+
+        # Posições relativas das possíveis produtoras anteriores à edição
+        position = {}
+        next_position = 0
+        for k in range(max(0, start - window), start):
+            next_position += old_stalls[k]
+            position[k] = next_position
+            next_position += 1
+
+        # Recalcula as bolhas até que `window` seguidas coincidam com as antigas
+        conflicts = self.conflicts
+        first = bisect_left(self.consumers, start)
+        stalls = array('l')
+        matching = 0
+        for j in range(start, n):
+            last = first
+            while last < len(conflicts) and conflicts[last][1] == j:
+                last += 1
+            stall = 0
+            if last > first:
+                required = analyzer.required_distances(conflicts[first:last], self.with_forwarding)
+                if j in required:
+                    earliest = max(position[i] + distance for i, distance in required[j])
+                    if earliest > next_position:
+                        stall = earliest - next_position
+                        next_position = earliest
+                first = last
+            position[j] = next_position
+            next_position += 1
+            stalls.append(stall)
+            if j >= start + count + self.window:
+                matching = matching + 1 if stall == old_stalls[j - delta] else 0
+                if matching >= window:
+                    break
+        end = start + len(stalls)  # Fim do trecho recalculado (índices novos)
+
+        # Trecho correspondente do programa com NOPs
+        old_end = end - delta
+        out_start = start + sum(old_stalls[:start])
+        out_stop = out_start + (old_end - start) + sum(old_stalls[start:old_end])
+        self.program[out_start:out_stop] = _with_nops(words, stalls, start)
+        old_stalls[start:old_end] = stalls
+
+def _with_nops(words: Sequence[int], stalls: Sequence[int], start: int) -> List[int]:
+    """Palavras words[start:start+len(stalls)] com as bolhas preenchidas por NOPs"""
+    result = []
+    for word, stall in zip(words[start:start + len(stalls)], stalls):
+        if stall:
+            result.extend([NOP] * stall)
+        result.append(word)
+    return result
+
+def _detect_data(with_forwarding: bool) -> Callable:
+    def detect(analyzer: PipelineAnalyzer, start: int, stop: int):
+        table = analyzer.table
+        scoreboard = HazardScoreboard(with_forwarding, analyzer.lookahead)
+        # As produtoras anteriores a `start` preparam o scoreboard
+        low = max(0, start - analyzer.lookahead)
+        scoreboard.position = low
+        scoreboard.scan(table.slice(low, start))
+        return scoreboard.scan(table.slice(start, stop))
+    return detect
+
+def _detect_control(analyzer: PipelineAnalyzer, start: int, stop: int):
+    """Como detect_control_conflicts, restrito às consumidoras em [start, stop)"""
+    flags = analyzer.table.flags
+    control = ConflictType.CONTROL
+    conflicts = []
+    for i in range(max(0, start - CONTROL_SLOTS), stop):
+        if flags[i] & (FLAG_BRANCH | FLAG_JUMP):
+            for j in range(max(i + 1, start), min(i + CONTROL_SLOTS + 1, stop)):
+                conflicts.append((i, j, control))
+    return conflicts
+
+class IncrementalAnalyzer:
+    """Resultados de analyze_all_techniques atualizados a cada edição
+
+    As técnicas 1, 2, 3, 4 e 7 são corrigidas localmente em update(). As
+    técnicas de reordenação, o delayed branch e a combinação dependem do
+    programa inteiro; elas são recalculadas por analyze_global_techniques
+    sobre snapshot(), normalmente fora da thread da interface.
+    """
+
+    def __init__(self, lookahead: int = DEFAULT_LOOKAHEAD):
+        self.lookahead = lookahead
+        self.line_state = bytearray()
+        self.analyzer = PipelineAnalyzer([], lookahead, table=InstructionTable())
+        self.words = self.analyzer.original_instructions
+        self.data = NopStream(self.analyzer, _detect_data(False), lookahead, False)
+        self.data_fw = NopStream(self.analyzer, _detect_data(True), lookahead, True)
+        self.control = NopStream(self.analyzer, _detect_control, CONTROL_SLOTS, False)
+
+    @property
+    def invalid_lines(self) -> int:
+        return self.line_state.count(LINE_INVALID)
+
+    def update(self, start: int, old_end: int, lines: Sequence[str]) -> Dict[str, Tuple[List[int], int]]:
+        """Aplica a troca das linhas [start, old_end) por `lines` e retorna os resultados locais
+
+        Linhas inválidas são ignoradas (e contadas em invalid_lines), já que
+        durante a digitação uma linha pode estar incompleta.
+        """
+        states = bytearray()
+        words = []
+        for line in lines:
+            try:
+                word = parse_hex_line(line)
+            except ValueError:
+                states.append(LINE_INVALID)
+                continue
+            if word is None:
+                states.append(LINE_EMPTY)
+            else:
+                states.append(LINE_WORD)
+                words.append(word)
+        first = self.line_state.count(LINE_WORD, 0, start)
+        stop = first + self.line_state.count(LINE_WORD, start, old_end)
+        self.line_state[start:old_end] = states
+        self.splice(first, stop, words)
+        return self.results()
+
+    def splice(self, start: int, stop: int, words: List[int]) -> None:
+        """Substitui as instruções [start, stop), redecodificando só as novas"""
+        self.words[start:stop] = words
+        self.analyzer.table.splice(start, stop, words)
+        for stream in (self.data, self.data_fw, self.control):
+            stream.splice(start, stop, len(words))
+
+    def results(self) -> Dict[str, Tuple[List[int], int]]:
+        """Resultados das técnicas corrigidas localmente, com as chaves de TECHNIQUES"""
+        return {
+            TECHNIQUES[0]: (self.words, len(self.data.conflicts)),
+            TECHNIQUES[1]: (self.words, len(self.data_fw.conflicts)),
+            TECHNIQUES[2]: (self.data.program, self.data.overhead),
+            TECHNIQUES[3]: (self.data_fw.program, self.data_fw.overhead),
+            TECHNIQUES[6]: (self.control.program, self.control.overhead),
+        }
+
+    def snapshot(self) -> PipelineAnalyzer:
+        """Cópia independente do programa atual, para outra thread"""
+        return PipelineAnalyzer(list(self.words), self.lookahead, table=self.analyzer.table.copy())
+
+# Técnicas que dependem do programa inteiro (reordenação, delayed branch e combinação)
+GLOBAL_TECHNIQUES = (TECHNIQUES[4], TECHNIQUES[5], TECHNIQUES[7], TECHNIQUES[8])
+
+def analyze_global_techniques(analyzer: PipelineAnalyzer,
+                              progress: Callable[[float], None] = None
+                              ) -> Dict[str, Tuple[List[int], int]]:
+    """Técnicas 5, 6, 8 e 9 de analyze_all_techniques, que dependem do programa inteiro"""
+    return analyzer.analyze_all_techniques(progress, GLOBAL_TECHNIQUES)
@@ -0,0 +1,161 @@
+"""Formatação em lote das instruções decodificadas
+
+Em vez de montar cada linha a partir de TRANSLATIONS (como
+format_instruction_info), cada combinação de idioma e estilo é compilada uma
+única vez em um template por tipo (estilo detalhado) ou por mnemônico
+(assembly compacto, `add x9, x8, x8`). Renderizar uma instrução é então uma
+única chamada a str.format com os campos extraídos da palavra e das colunas
+de uma InstructionTable, e as linhas são juntadas em blocos, seja em uma
+string, seja direto em um arquivo.
+"""
+from functools import lru_cache
+from typing import Callable, Iterable, List, TextIO, Tuple
+
+from instruction_table import InstructionTable
+from riscv_classifier import (
+    TYPE_NAMES, MNEMONICS, MNEMONIC_IDS, IMM_BITS, HEX_CHUNK_SIZE
+)
+from translations import TRANSLATIONS
+
+# Estilos de saída
+STYLE_VERBOSE = "verbose"  # Mesmo texto de format_instruction_info
+STYLE_ASM = "asm"          # Sintaxe de assembly compacta
+STYLES = (STYLE_VERBOSE, STYLE_ASM)
+
+# Campos posicionais disponíveis nos templates de cada estilo
+# Detalhado: {0} número da linha, {1} palavra, {2} rd, {3} funct3, {4} rs1,
+# {5} rs2, {6} imediato (sem sinal, como em decode_instruction), {7} funct7
+# Assembly:  {0} número da linha, {1} palavra, {2} rd, {3} rs1, {4} rs2,
+# {5} imediato com sinal, {6} imediato sem sinal (shamt nos deslocamentos)
+
+# Bit de sinal do imediato de cada tipo (0 = sem extensão de sinal)
+SIGN_BITS = tuple(
+    1 << (IMM_BITS[name.lower()] - 1) if name in ("I", "S", "B", "J") else 0
+    for name in TYPE_NAMES
+)
+
+# Sintaxe de cada grupo de mnemônicos
+_ASM_SYNTAX = (
+    (("add", "sub", "sll", "slt", "sltu", "xor", "srl", "sra", "or", "and"),
+     "{m} x{{2}}, x{{3}}, x{{4}}"),
+    (("addi", "slti", "sltiu", "xori", "ori", "andi"), "{m} x{{2}}, x{{3}}, {{5}}"),
+    (("slli", "srli", "srai"), "{m} x{{2}}, x{{3}}, {{4}}"),
+    (("lb", "lh", "lw", "lbu", "lhu", "jalr"), "{m} x{{2}}, {{5}}(x{{3}})"),
+    (("sb", "sh", "sw"), "{m} x{{4}}, {{5}}(x{{3}})"),
+    (("beq", "bne", "blt", "bge", "bltu", "bgeu"), "{m} x{{3}}, x{{4}}, {{5}}"),
+    (("lui", "auipc"), "{m} x{{2}}, 0x{{6:x}}"),
+    (("jal",), "{m} x{{2}}, {{5}}"),
+    (("fence", "ecall"), "{m}"),
+)
+ASM_UNKNOWN = ".word 0x{1:08x}"
+
+# Prefixo das linhas numeradas, como na listagem do classificador
+_NUMBERED_PREFIX = "{{0}}: 0x{{1:08X}} -> "
+
+def _field(template: str, index: int) -> str:
+    return template.replace("{}", "{" + str(index) + "}")
+
+@lru_cache(maxsize=None)
+def compile_templates(lang: str = 'pt_BR', style: str = STYLE_VERBOSE,
+                      numbered: bool = False) -> Tuple[Callable[..., str], ...]:
+    """Funções str.format compiladas, indexadas por type_code (detalhado) ou mnemônico (asm)"""
+    prefix = ""
+    if numbered:
+        prefix = TRANSLATIONS[lang]['instruction_label'] + " " + _NUMBERED_PREFIX.format()
+    if style == STYLE_ASM:
+        syntax = {}
+        for mnemonics, template in _ASM_SYNTAX:
+            for mnemonic in mnemonics:
+                syntax[MNEMONIC_IDS[mnemonic]] = template.format(m=mnemonic)
+        return tuple(
+            (prefix + syntax.get(code, ASM_UNKNOWN)).format for code in range(len(MNEMONICS))
+        )
+    if style != STYLE_VERBOSE:
+        raise ValueError(f"estilo desconhecido: {style}")
+
+    text = TRANSLATIONS[lang]
+    # Campos de cada tipo, na ordem de format_instruction_info
+    common = (_field(text['register_dest'], 2), _field(text['function3'], 3),
+              _field(text['register_src1'], 4))
+    rs2 = _field(text['register_src2'], 5)
+    imm = _field(text['immediate'], 6)
+    funct7 = _field(text['function7'], 7)
+    extra = {"R": (rs2, funct7), "S": (rs2, imm), "B": (rs2, imm),
+             "I": (imm,), "U": (imm,), "J": (imm,), "UNKNOWN": ()}
+    templates = []
+    for name in TYPE_NAMES:
+        label = "desconhecido" if name == "UNKNOWN" else name.lower()
+        head = text['instruction_format'].format(label)
+        templates.append((prefix + ", ".join((head,) + common + extra[name])).format)
+    return tuple(templates)
+
+class InstructionFormatter:
+    """Renderiza trechos de uma InstructionTable em um idioma e estilo"""
+
+    def __init__(self, lang: str = 'pt_BR', style: str = STYLE_VERBOSE, numbered: bool = False):
+        self.lang = lang
+        self.style = style
+        self.numbered = numbered
+        self.templates = compile_templates(lang, style, numbered)
+
+    def lines(self, table: InstructionTable, start: int = 0, stop: int = None,
+              first_number: int = 1) -> List[str]:
+        """Linhas das instruções [start, stop); a numeração começa em `first_number`"""
+        if stop is None:
+            stop = len(table)
+        words = table.hex_code[start:stop]
+        imms = table.imm[start:stop]
+        templates = self.templates
+        number = first_number + start
+        if self.style == STYLE_ASM:
+            sign_bits = SIGN_BITS
+            return [
+                templates[mnemonic](number + k, word, (word >> 7) & 0x1F, (word >> 15) & 0x1F,
+                                    (word >> 20) & 0x1F,
+                                    imm - ((imm & sign_bits[type_code]) << 1), imm)
+                for k, (word, imm, type_code, mnemonic) in enumerate(
+                    zip(words, imms, table.type_code[start:stop], table.mnemonic[start:stop]))
+            ]
+        return [
+            templates[type_code](number + k, word, (word >> 7) & 0x1F, (word >> 12) & 0x7,
+                                 (word >> 15) & 0x1F, (word >> 20) & 0x1F, imm, word >> 25)
+            for k, (word, imm, type_code) in enumerate(
+                zip(words, imms, table.type_code[start:stop]))
+        ]
+
+    def line(self, table: InstructionTable, index: int, first_number: int = 1) -> str:
+        return self.lines(table, index, index + 1, first_number)[0]
+
+    def render(self, table: InstructionTable, start: int = 0, stop: int = None) -> str:
+        """Todas as linhas em uma única string (terminada em quebra de linha)"""
+        lines = self.lines(table, start, stop)
+        return "\n".join(lines) + "\n" if lines else ""
+
+    def write(self, table: InstructionTable, file: TextIO, chunk_size: int = HEX_CHUNK_SIZE) -> int:
+        """Grava a listagem em blocos de `chunk_size` linhas; retorna o número de linhas"""
+        for start in range(0, len(table), chunk_size):
+            file.write("\n".join(self.lines(table, start, start + chunk_size)))
+            file.write("\n")
+        return len(table)
+
+    def write_words(self, chunks: Iterable[Iterable[int]], file: TextIO) -> int:
+        """Como write, decodificando blocos de palavras (por exemplo, de iter_hex_chunks)
+
+        A memória usada é limitada pelo tamanho de cada bloco.
+        """
+        count = 0
+        for chunk in chunks:
+            table = InstructionTable.from_words(chunk)
+            if len(table):
+                file.write("\n".join(self.lines(table, first_number=count + 1)))
+                file.write("\n")
+            count += len(table)
+        return count
+
+def format_word(word: int, lang: str = 'pt_BR', style: str = STYLE_VERBOSE) -> str:
+    """Uma única palavra, no mesmo texto das listagens"""
+    return InstructionFormatter(lang, style).line(InstructionTable.from_words([word]), 0)
+
+def format_words(words: Iterable[int], lang: str = 'pt_BR', style: str = STYLE_VERBOSE,
+                 numbered: bool = False) -> str:
+    return InstructionFormatter(lang, style, numbered).render(InstructionTable.from_words(words))
@@ -0,0 +1,249 @@
+from dataclasses import dataclass
+from heapq import heappush, heappop
+from typing import Callable, List, Optional, Tuple
+
+from instruction_table import (
+    InstructionTable, TYPE_CODES, FLAG_BRANCH, FLAG_JUMP, FLAG_LOAD, FLAG_STORE
+)
+from riscv_classifier import MNEMONIC_IDS
+
+# auipc soma o próprio PC: movê-la muda o valor calculado
+_AUIPC = MNEMONIC_IDS["auipc"]
+
+@dataclass
+class ScheduleResult:
+    order: List[int]      # Índices originais na nova ordem
+    program: List[int]    # Palavras na nova ordem
+    stalls_before: int    # Bolhas de dados na ordem original
+    stalls_after: int     # Bolhas de dados na ordem escalonada
+
+    @property
+    def stall_reduction(self) -> int:
+        return self.stalls_before - self.stalls_after
+
+def basic_blocks(table: InstructionTable) -> List[Tuple[int, int]]:
+    """Divide o programa em blocos [início, fim) terminados por branch/jump
+
+    Instruções de tipo desconhecido (ecall, fence, ...) e auipc formam
+    blocos próprios e nunca são movidas.
+    """
+    blocks = []
+    start = 0
+    unknown = TYPE_CODES["UNKNOWN"]
+    control = FLAG_BRANCH | FLAG_JUMP
+    for index, (flags, type_code, mnemonic) in enumerate(
+            zip(table.flags, table.type_code, table.mnemonic)):
+        if type_code == unknown or mnemonic == _AUIPC:
+            if start < index:
+                blocks.append((start, index))
+            blocks.append((index, index + 1))
+            start = index + 1
+        elif flags & control:
+            blocks.append((start, index + 1))
+            start = index + 1
+    if start < len(table):
+        blocks.append((start, len(table)))
+    return blocks
+
+def pin_pc_relative(table: InstructionTable, blocks: List[Tuple[int, int]]
+                    ) -> List[Tuple[int, int]]:
+    """Separa cada auipc em um bloco próprio, para que continue no mesmo endereço"""
+    mnemonics = table.mnemonic.tobytes()
+    marker = bytes((_AUIPC,))
+    if marker not in mnemonics:
+        return blocks
+    pinned = []
+    for start, end in blocks:
+        index = mnemonics.find(marker, start, end)
+        while index >= 0:
+            if start < index:
+                pinned.append((start, index))
+            pinned.append((index, index + 1))
+            start = index + 1
+            index = mnemonics.find(marker, start, end)
+        if start < end:
+            pinned.append((start, end))
+    return pinned
+
+class ListScheduler:
+    """Escalonador por lista com caminho crítico, bloco básico a bloco básico
+
+    Para cada bloco monta um DAG com dependências RAW (latência igual à
+    distância mínima sem bolha), WAR/WAW e de ordem de memória (stores não
+    trocam de lugar com loads ou outros stores), e emite a cada ciclo a
+    instrução pronta de maior altura no DAG. O desvio que termina o bloco
+    continua sendo a última instrução e cada auipc fica no seu endereço
+    (pin_pc_relative). O custo é O(n log n) no tamanho do bloco.
+    """
+
+    def __init__(self, table: InstructionTable, alu_distance: int, load_distance: int,
+                 blocks: List[Tuple[int, int]] = None,
+                 cancel_check: Optional[Callable[[], None]] = None):
+        self.table = table
+        self.alu_distance = alu_distance
+        self.load_distance = load_distance
+        # Blocos [início, fim) escalonados isoladamente (padrão: basic_blocks)
+        self.blocks = blocks
+        # Chamada a cada bloco (e dentro dos muito longos) para permitir cancelamento
+        self.cancel_check = cancel_check
+
+    def _latency(self, producer: int) -> int:
+        return self.load_distance if self.table.flags[producer] & FLAG_LOAD else self.alu_distance
+
+    def _build_dag(self, start: int, end: int):
+        """Arestas (sucessor, latência) de cada instrução do bloco, em índices locais"""
+        table = self.table
+        size = end - start
+        succs = [[] for _ in range(size)]
+        npreds = [0] * size
+        last_writer = {}
+        readers = {}
+        last_store = None
+        loads = []
+
+        def edge(a, b, latency):
+            succs[a].append((b, latency))
+            npreds[b] += 1
+
+        for k in range(size):
+            index = start + k
+            src1, src2, dest = table.rs1[index], table.rs2[index], table.rd[index]
+            flags = table.flags[index]
+            sources = [r for r in (src1, src2) if r > 0]
+            if len(sources) == 2 and sources[0] == sources[1]:
+                sources.pop()
+            for reg in sources:
+                if reg in last_writer:
+                    edge(last_writer[reg], k, self._latency(start + last_writer[reg]))
+            if dest > 0:
+                if dest in last_writer:
+                    edge(last_writer[dest], k, 1)
+                for reader in readers.pop(dest, ()):
+                    if reader != k:
+                        edge(reader, k, 1)
+            for reg in sources:
+                if reg != dest:
+                    readers.setdefault(reg, []).append(k)
+            if dest > 0:
+                last_writer[dest] = k
+            if flags & FLAG_LOAD:
+                if last_store is not None:
+                    edge(last_store, k, 1)
+                loads.append(k)
+            elif flags & FLAG_STORE:
+                if last_store is not None:
+                    edge(last_store, k, 1)
+                for load in loads:
+                    edge(load, k, 1)
+                loads = []
+                last_store = k
+
+        # O desvio que fecha o bloco depende de todas as outras instruções
+        if size and table.flags[end - 1] & (FLAG_BRANCH | FLAG_JUMP):
+            terminator = size - 1
+            for k in range(size - 1):
+                if not any(succ == terminator for succ, _ in succs[k]):
+                    edge(k, terminator, 1)
+        return succs, npreds
+
+    def _release(self, start: int, end: int, ready: List[int]) -> List[int]:
+        """Primeiro ciclo possível de cada instrução devido a produtores anteriores ao bloco"""
+        table = self.table
+        release = []
+        for index in range(start, end):
+            earliest = 0
+            for reg in (table.rs1[index], table.rs2[index]):
+                if reg > 0 and ready[reg] > earliest:
+                    earliest = ready[reg]
+            release.append(earliest)
+        return release
+
+    def _replay(self, start: int, order: List[int], cycle: int, ready: List[int]) -> int:
+        """Executa o bloco na ordem dada e retorna o ciclo após a última instrução"""
+        table = self.table
+        for k in order:
+            index = start + k
+            for reg in (table.rs1[index], table.rs2[index]):
+                if reg > 0 and ready[reg] > cycle:
+                    cycle = ready[reg]
+            dest = table.rd[index]
+            if dest > 0:
+                ready[dest] = cycle + self._latency(index)
+            cycle += 1
+        return cycle
+
+    def _schedule_block(self, start: int, end: int, cycle: int, ready: List[int]) -> List[int]:
+        size = end - start
+        succs, npreds = self._build_dag(start, end)
+        earliest = self._release(start, end, ready)
+
+        # Altura no DAG (caminho crítico até o fim do bloco)
+        height = [0] * size
+        for k in range(size - 1, -1, -1):
+            for succ, latency in succs[k]:
+                if latency + height[succ] > height[k]:
+                    height[k] = latency + height[succ]
+
+        pending = []   # (ciclo mais cedo, índice)
+        candidates = []  # (-altura, índice)
+        for k in range(size):
+            if npreds[k] == 0:
+                heappush(pending, (earliest[k], k))
+        order = []
+        cancel_check = self.cancel_check
+        while len(order) < size:
+            if cancel_check is not None and not cycle & 0xFFF:
+                cancel_check()  # Blocos muito longos podem ser cancelados no meio
+            while pending and pending[0][0] <= cycle:
+                _, k = heappop(pending)
+                heappush(candidates, (-height[k], k))
+            if not candidates:
+                cycle = pending[0][0]  # bolha: nenhuma instrução pronta
+                continue
+            _, k = heappop(candidates)
+            order.append(k)
+            for succ, latency in succs[k]:
+                if cycle + latency > earliest[succ]:
+                    earliest[succ] = cycle + latency
+                npreds[succ] -= 1
+                if npreds[succ] == 0:
+                    heappush(pending, (earliest[succ], succ))
+            cycle += 1
+        return order
+
+    def schedule(self) -> ScheduleResult:
+        """Escalona todos os blocos básicos e compara com a ordem original"""
+        table = self.table
+        ready_original = [0] * 32
+        ready = [0] * 32
+        cycle_original = cycle = 0
+        order = []
+        blocks = self.blocks if self.blocks is not None else basic_blocks(table)
+        blocks = pin_pc_relative(table, blocks)
+        cancel_check = self.cancel_check
+        for start, end in blocks:
+            if cancel_check is not None:
+                cancel_check()
+            identity = list(range(end - start))
+            cycle_original = self._replay(start, identity, cycle_original, ready_original)
+            if end - start > 2:
+                candidate = self._schedule_block(start, end, cycle, ready)
+                # Mantém a ordem original quando a heurística não ajuda
+                if self._replay(start, candidate, cycle, list(ready)) >= \
+                        self._replay(start, identity, cycle, list(ready)):
+                    candidate = identity
+            else:
+                candidate = identity
+            cycle = self._replay(start, candidate, cycle, ready)
+            order.extend(start + k for k in candidate)
+
+        n = len(table)
+        if cycle > cycle_original:
+            # A escolha gulosa por bloco pode atrasar os blocos seguintes
+            order, cycle = list(range(n)), cycle_original
+        return ScheduleResult(
+            order=order,
+            program=[table.hex_code[index] for index in order],
+            stalls_before=cycle_original - n,
+            stalls_after=cycle - n
+        )
@@ -0,0 +1,212 @@
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from hashlib import blake2b
+from typing import Iterable, Iterator, List, Tuple
+
+from riscv_classifier import (
+    np, decode_word, decode_batch, TYPE_NAMES, TYPE_CODES, MNEMONICS, NO_REG, NO_IMM,
+    FLAG_BRANCH, FLAG_JUMP, FLAG_WRITES_RD, FLAG_READS_RS1, FLAG_READS_RS2,
+    FLAG_LOAD, FLAG_STORE
+)
+
+# Quantidade de buffers decodificados mantidos por decode_buffer
+BUFFER_CACHE_SIZE = 4
+
+# A partir deste tamanho, extend usa decode_batch (quando há NumPy)
+BATCH_THRESHOLD = 4096
+
+@dataclass
+class Instruction:
+    hex_code: int
+    type: str
+    rd: int = None
+    rs1: int = None
+    rs2: int = None
+    imm: int = None
+    is_branch: bool = False
+    is_jump: bool = False
+    mnemonic: str = None
+
+# Nomes das colunas de InstructionTable e o typecode de cada uma
+COLUMNS = ("hex_code", "type_code", "rd", "rs1", "rs2", "imm", "flags", "mnemonic")
+COLUMN_TYPES = ("I", "B", "b", "b", "b", "i", "B", "B")
+
+class InstructionTable:
+    """Armazenamento colunar das instruções decodificadas
+
+    Cada campo fica em um `array` tipado (colunas paralelas), com sentinelas
+    (NO_REG / NO_IMM) no lugar de None. Objetos Instruction só são criados
+    quando alguém indexa ou itera a tabela.
+    """
+
+    def __init__(self):
+        self.hex_code = array('I')
+        self.type_code = array('B')
+        self.rd = array('b')
+        self.rs1 = array('b')
+        self.rs2 = array('b')
+        self.imm = array('i')
+        self.flags = array('B')
+        self.mnemonic = array('B')
+
+    @classmethod
+    def from_words(cls, words: Iterable[int]) -> "InstructionTable":
+        """Decodifica uma sequência de palavras de 32 bits em uma nova tabela"""
+        table = cls()
+        table.extend(words)
+        return table
+
+    def extend(self, words: Iterable[int]) -> None:
+        """Decodifica e acrescenta palavras ao final da tabela"""
+        if np is not None and (isinstance(words, np.ndarray) or (
+                isinstance(words, (list, array)) and len(words) >= BATCH_THRESHOLD)):
+            self._extend_batch(np.asarray(words, dtype=np.uint32))
+            return
+        hex_code, type_codes, rds, rs1s, rs2s, imms, flags, mnemonics = [], [], [], [], [], [], [], []
+        for word in words:
+            word = int(word)
+            decoded = decode_word(word)
+            flag = decoded.flags
+            hex_code.append(word)
+            type_codes.append(decoded.type_code)
+            rds.append(decoded.rd if flag & FLAG_WRITES_RD else NO_REG)
+            rs1s.append(decoded.rs1 if flag & FLAG_READS_RS1 else NO_REG)
+            rs2s.append(decoded.rs2 if flag & FLAG_READS_RS2 else NO_REG)
+            imms.append(decoded.imm)
+            flags.append(flag)
+            mnemonics.append(decoded.mnemonic)
+        self.hex_code.extend(hex_code)
+        self.type_code.extend(type_codes)
+        self.rd.extend(rds)
+        self.rs1.extend(rs1s)
+        self.rs2.extend(rs2s)
+        self.imm.extend(imms)
+        self.flags.extend(flags)
+        self.mnemonic.extend(mnemonics)
+
+    def _extend_batch(self, words) -> None:
+        """Caminho vetorizado de extend: decode_batch + cópia para as colunas
+
+        `words` é um ndarray uint32; tipo, flags e mnemônico vêm da mesma
+        DECODE_LUT usada por decode_word.
+        """
+        batch = decode_batch(words)
+        type_code = batch["type_code"]
+        flags = batch["flags"]
+        imm = np.select(
+            [type_code == TYPE_CODES[t] for t in ("I", "S", "B", "U", "J")],
+            [batch["imm_" + t.lower()] for t in ("I", "S", "B", "U", "J")],
+            NO_IMM
+        )
+        columns = (
+            (self.hex_code, words),
+            (self.type_code, type_code),
+            (self.rd, np.where(flags & FLAG_WRITES_RD, batch["rd"], NO_REG)),
+            (self.rs1, np.where(flags & FLAG_READS_RS1, batch["rs1"], NO_REG)),
+            (self.rs2, np.where(flags & FLAG_READS_RS2, batch["rs2"], NO_REG)),
+            (self.imm, imm),
+            (self.flags, flags),
+            (self.mnemonic, batch["mnemonic"]),
+        )
+        for column, values in columns:
+            column.frombytes(values.astype(column.typecode, copy=False).tobytes())
+
+    def columns(self) -> Tuple[array, ...]:
+        """Todas as colunas, na ordem de COLUMNS"""
+        return tuple(getattr(self, name) for name in COLUMNS)
+
+    def slice(self, start: int, stop: int) -> "InstructionTable":
+        """Nova tabela com cópias das linhas [start, stop)"""
+        table = InstructionTable()
+        for name, column in zip(COLUMNS, self.columns()):
+            setattr(table, name, column[start:stop])
+        return table
+
+    def copy(self) -> "InstructionTable":
+        return self.slice(0, len(self))
+
+    def take(self, indices: Iterable[int]) -> "InstructionTable":
+        """Nova tabela com as linhas na ordem de `indices`, sem redecodificar"""
+        table = InstructionTable()
+        if np is not None and isinstance(indices, (array, list, np.ndarray)) \
+                and len(indices) >= BATCH_THRESHOLD:
+            order = np.asarray(indices, dtype=np.intp)
+            for name, typecode, column in zip(COLUMNS, COLUMN_TYPES, self.columns()):
+                values = array(typecode)
+                values.frombytes(np.asarray(column)[order].tobytes())
+                setattr(table, name, values)
+            return table
+        indices = list(indices)
+        for name, typecode, column in zip(COLUMNS, COLUMN_TYPES, self.columns()):
+            setattr(table, name, array(typecode, [column[i] for i in indices]))
+        return table
+
+    def splice(self, start: int, stop: int, words: Iterable[int]) -> None:
+        """Substitui as linhas [start, stop) pelas palavras dadas, decodificando só elas"""
+        decoded = InstructionTable.from_words(words)
+        for column, values in zip(self.columns(), decoded.columns()):
+            column[start:stop] = values
+
+    def __len__(self) -> int:
+        return len(self.hex_code)
+
+    def __getitem__(self, index: int) -> Instruction:
+        """Materializa a instrução `index` como um objeto Instruction"""
+        rd = self.rd[index]
+        rs1 = self.rs1[index]
+        rs2 = self.rs2[index]
+        imm = self.imm[index]
+        flags = self.flags[index]
+        return Instruction(
+            hex_code=self.hex_code[index],
+            type=TYPE_NAMES[self.type_code[index]],
+            rd=None if rd == NO_REG else rd,
+            rs1=None if rs1 == NO_REG else rs1,
+            rs2=None if rs2 == NO_REG else rs2,
+            imm=None if imm == NO_IMM else imm,
+            is_branch=bool(flags & FLAG_BRANCH),
+            is_jump=bool(flags & FLAG_JUMP),
+            mnemonic=MNEMONICS[self.mnemonic[index]]
+        )
+
+    def __iter__(self) -> Iterator[Instruction]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_list(self) -> List[Instruction]:
+        """Materializa todas as instruções (use apenas em programas pequenos)"""
+        return list(self)
+
+    def nbytes(self) -> int:
+        """Memória ocupada pelas colunas, em bytes"""
+        return sum(column.itemsize * len(column) for column in self.columns())
+
+_buffer_cache = OrderedDict()
+
+def decode_buffer(words: Iterable[int]) -> InstructionTable:
+    """Decodifica um buffer de instruções, reaproveitando decodificações recentes
+
+    O cache é indexado pelo conteúdo do buffer, de modo que a visão de
+    decodificação e a análise de pipeline da mesma entrada compartilham a
+    mesma tabela. A tabela retornada é compartilhada e não deve ser alterada.
+    """
+    if np is not None and isinstance(words, np.ndarray):
+        data = np.ascontiguousarray(words, dtype=np.uint32)
+    else:
+        data = array('I', (int(word) for word in words))
+    key = blake2b(data, digest_size=16).digest()
+    table = _buffer_cache.get(key)
+    if table is None:
+        table = InstructionTable.from_words(data)
+        _buffer_cache[key] = table
+        if len(_buffer_cache) > BUFFER_CACHE_SIZE:
+            _buffer_cache.popitem(last=False)
+    else:
+        _buffer_cache.move_to_end(key)
+    return table
+
+def clear_decode_caches() -> None:
+    """Esvazia o cache de decode_buffer e o de decode_word (usado em benchmarks)"""
+    _buffer_cache.clear()
+    decode_word.cache_clear()
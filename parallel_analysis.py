@@ -0,0 +1,156 @@
+"""Avaliação das técnicas de analyze_all_techniques em paralelo
+
+O processo principal decodifica o programa e calcula as listas de conflitos
+uma única vez; as colunas da tabela e os conflitos (como pares de arrays)
+são copiados para um bloco de multiprocessing.shared_memory, e cada
+processo do pool monta sobre ele, sem cópia, um PipelineAnalyzer para
+calcular a sua técnica. Só os programas resultantes voltam por pickle (como
+array('I')).
+"""
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+from typing import Callable, Dict, List, Sequence, Tuple
+
+from instruction_table import InstructionTable, COLUMNS
+from pipeline_analyzer import PipelineAnalyzer, ConflictType, TECHNIQUES, CYCLE_TECHNIQUES
+
+# Abaixo deste tamanho o custo de subir o pool supera o ganho
+PARALLEL_MIN_INSTRUCTIONS = 20000
+
+# Grupos de técnicas executados em um mesmo processo (a combinação
+# reaproveita o escalonamento com forwarding) e os conflitos que cada
+# grupo precisa
+TECHNIQUE_GROUPS = (
+    ((TECHNIQUES[2],), ("data",)),
+    ((TECHNIQUES[3],), ("data_fw",)),
+    ((TECHNIQUES[4],), ("data",)),
+    ((TECHNIQUES[5], TECHNIQUES[8]), ("data_fw",)),
+    ((TECHNIQUES[6],), ("control",)),
+    ((TECHNIQUES[7],), ()),
+)
+
+# Alinhamento dos campos dentro do bloco compartilhado
+ALIGNMENT = 8
+
+def _pairs(conflicts: List[Tuple[int, int, ConflictType]]) -> Tuple[array, array]:
+    return array('i', [i for i, _, _ in conflicts]), array('i', [j for _, j, _ in conflicts])
+
+class SharedProgram:
+    """Tabela decodificada e listas de conflitos em um bloco de memória compartilhada
+
+    `layout` descreve cada campo como (nome, typecode, offset, tamanho) e é
+    tudo o que um processo precisa, junto com o nome do bloco, para
+    reconstruir os dados com attach().
+    """
+
+    def __init__(self, analyzer: PipelineAnalyzer):
+        fields = list(zip(COLUMNS, analyzer.table.columns()))
+        for name, conflicts in (("data", analyzer.data_conflicts(False)),
+                                ("data_fw", analyzer.data_conflicts(True)),
+                                ("control", analyzer.control_conflicts())):
+            producers, consumers = _pairs(conflicts)
+            fields += [(name + "_i", producers), (name + "_j", consumers)]
+
+        self.layout = []
+        offset = 0
+        for name, values in fields:
+            self.layout.append((name, values.typecode, offset, len(values)))
+            offset += -(-values.itemsize * len(values) // ALIGNMENT) * ALIGNMENT
+        self.memory = SharedMemory(create=True, size=max(offset, 1))
+        for (name, values), (_, _, offset, _) in zip(fields, self.layout):
+            size = values.itemsize * len(values)
+            self.memory.buf[offset:offset + size] = memoryview(values).cast('B')
+
+    @property
+    def name(self) -> str:
+        return self.memory.name
+
+    def close(self) -> None:
+        self.memory.close()
+        self.memory.unlink()
+
+def _attach(name: str):
+    """Abre um bloco criado pelo processo principal, que é quem o remove"""
+    try:
+        return SharedMemory(name=name, track=False)
+    except TypeError:
+        # Antes do Python 3.13 não há `track`; o pool usa o mesmo
+        # resource_tracker do processo principal, então o registro é único
+        return SharedMemory(name=name)
+
+def _run_group(name: str, layout: Sequence[Tuple[str, str, int, int]], lookahead: int,
+               techniques: Sequence[str], needs: Sequence[str]
+               ) -> List[Tuple[str, array, int]]:
+    """Executado no pool: calcula `techniques` sobre o bloco compartilhado"""
+    memory = _attach(name)
+    views = {}
+    try:
+        for field, typecode, offset, count in layout:
+            size = count * array(typecode).itemsize
+            views[field] = memory.buf[offset:offset + size].cast(typecode)
+        table = InstructionTable()
+        for column in COLUMNS:
+            setattr(table, column, views[column])
+        analyzer = PipelineAnalyzer(views["hex_code"], lookahead, table=table)
+        kinds = {"data": ConflictType.RAW, "data_fw": ConflictType.RAW,
+                 "control": ConflictType.CONTROL}
+        analyzer.use_conflicts(**{
+            need: [(i, j, kinds[need]) for i, j in zip(views[need + "_i"], views[need + "_j"])]
+            for need in needs
+        })
+
+        results = []
+        for technique in techniques:
+            program, overhead = analyzer.technique(technique)
+            # O programa original não é enviado de volta (o chamador já o tem)
+            original = program is analyzer.original_instructions
+            results.append((technique, None if original else array('I', program), overhead))
+        return results
+    finally:
+        analyzer = table = None
+        for view in views.values():
+            view.release()
+        memory.close()
+
+def analyze_all_techniques_parallel(analyzer: PipelineAnalyzer, workers: int = None,
+                                    progress: Callable[[float], None] = None
+                                    ) -> Dict[str, Tuple[Sequence[int], int]]:
+    """Como analyze_all_techniques, com as técnicas distribuídas entre processos
+
+    As técnicas só de detecção (1 e 2) saem direto das listas de conflitos;
+    as demais rodam no pool. O tempo total tende ao da técnica mais lenta.
+    """
+    shared = SharedProgram(analyzer)
+    results = {
+        TECHNIQUES[0]: (analyzer.original_instructions, len(analyzer.data_conflicts(False))),
+        TECHNIQUES[1]: (analyzer.original_instructions, len(analyzer.data_conflicts(True))),
+    }
+    try:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(max_workers=min(workers, len(TECHNIQUE_GROUPS))) as executor:
+            futures = [
+                executor.submit(_run_group, shared.name, shared.layout, analyzer.lookahead,
+                                techniques, needs)
+                for techniques, needs in TECHNIQUE_GROUPS
+            ]
+            for done, future in enumerate(as_completed(futures), 1):
+                for technique, program, overhead in future.result():
+                    if program is None:
+                        program = analyzer.original_instructions
+                    results[technique] = (program, overhead)
+                if progress is not None:
+                    progress(done / len(futures))
+    finally:
+        shared.close()
+    # Os processos não recebem o trace de desvios nem as estatísticas de cache:
+    # o custo previsto e as faltas são aplicados aqui
+    prediction = analyzer.branch_prediction()
+    if prediction is not None:
+        results[TECHNIQUES[6]] = (results[TECHNIQUES[6]][0], prediction.stall_cycles)
+    memory = analyzer.memory_stall_cycles()
+    if memory:
+        for technique in CYCLE_TECHNIQUES:
+            results[technique] = (results[technique][0], results[technique][1] + memory)
+    return {technique: results[technique] for technique in TECHNIQUES}
@@ -1,236 +1,540 @@
-from typing import List, Dict, Tuple
-from dataclasses import dataclass
+from array import array
+from collections.abc import Mapping
+from typing import Callable, List, Dict, Iterable, Iterator, Optional, Sequence, Tuple
 from enum import Enum
 
+from binary_loader import ProgramImage
+from branch_prediction import BranchPredictor, BranchTrace, PredictionStats, BimodalPredictor
+from control_flow import ControlFlowGraph
+from delay_slots import DELAY_SLOTS, DelaySlotResult, fill_delay_slots
+from instruction_scheduler import ListScheduler, ScheduleResult
+from instruction_table import (
+    np, InstructionTable, decode_buffer, NO_REG, FLAG_BRANCH, FLAG_JUMP,
+    FLAG_LOAD
+)
+
+# Distância máxima (em instruções) em que um RAW ainda causa bolha sem
+# forwarding: o resultado só pode ser lido pela instrução 4 posições depois
+DEFAULT_LOOKAHEAD = 3
+
+NOP = 0x00000013  # addi x0, x0, 0
+
+# Bolhas após um branch/jump (resolvido no estágio EX)
+CONTROL_SLOTS = 2
+
+# Chaves dos resultados de analyze_all_techniques, na ordem do grid da interface
+TECHNIQUES = (
+    "1_sem_forwarding_detect",
+    "2_com_forwarding_detect",
+    "3_sem_forwarding_nops",
+    "4_com_forwarding_nops",
+    "5_sem_forwarding_reorder",
+    "6_com_forwarding_reorder",
+    "7_control_nops",
+    "8_delayed_branch",
+    "9_combined",
+)
+
+# Técnicas cujo sobrecusto é medido em ciclos (as de detecção contam conflitos)
+CYCLE_TECHNIQUES = TECHNIQUES[2:]
+
 class ConflictType(Enum):
     RAW = "RAW"  # Read After Write
     WAR = "WAR"  # Write After Read
     WAW = "WAW"  # Write After Write
     CONTROL = "CONTROL"  # Conflito de controle (branch/jump)
 
-@dataclass
-class Instruction:
-    hex_code: int
-    type: str
-    rd: int = None
-    rs1: int = None
-    rs2: int = None
-    imm: int = None
-    is_branch: bool = False
-    is_jump: bool = False
+def raw_windows(with_forwarding: bool, lookahead: int = DEFAULT_LOOKAHEAD) -> Tuple[int, int]:
+    """Distância máxima de conflito RAW para produtores comuns e para loads
+
+    Sem forwarding, qualquer RAW a até `lookahead` instruções causa bolha.
+    Com forwarding (EX->EX e MEM->EX), só o load-use a distância 1.
+    """
+    if with_forwarding:
+        return 0, min(1, lookahead)
+    return lookahead, lookahead
+
+class HazardScoreboard:
+    """Detector de conflitos de dados em uma única passada
+
+    Mantém, para cada um dos 32 registradores, o último escritor e os
+    leitores desde essa escrita. Em um pipeline em ordem de 5 estágios só
+    RAW causa bolhas, então WAR/WAW só são reportados com
+    `name_dependences=True`. Cada fonte gera no máximo um conflito, com o
+    escritor mais próximo (rs1 == rs2 conta uma vez), e x0 nunca gera
+    conflito. Os conflitos saem ordenados pela instrução consumidora.
+
+    O estado persiste entre chamadas de scan, então um programa pode ser
+    analisado em blocos consecutivos (os índices são globais).
+    """
+
+    def __init__(self, with_forwarding: bool = False, lookahead: int = DEFAULT_LOOKAHEAD,
+                 name_dependences: bool = False):
+        self.alu_window, self.load_window = raw_windows(with_forwarding, lookahead)
+        self.window = lookahead
+        self.name_dependences = name_dependences
+        self.position = 0
+        far = -(max(lookahead, self.load_window) + 1)
+        self.last_writer = [far] * 32
+        # Janela RAW do último escritor (depende de ele ser um load)
+        self.writer_window = [0] * 32
+        self.last_readers = [[] for _ in range(32)]
+
+    def scan(self, table: InstructionTable) -> List[Tuple[int, int, ConflictType]]:
+        """Processa as próximas instruções e retorna os conflitos encontrados"""
+        alu_window, load_window, window = self.alu_window, self.load_window, self.window
+        name_dependences = self.name_dependences
+        last_writer, writer_window, last_readers = self.last_writer, self.writer_window, self.last_readers
+        raw = ConflictType.RAW
+        conflicts = []
+
+        j = self.position
+        for src1, src2, dest, flags in zip(table.rs1, table.rs2, table.rd, table.flags):
+            # RAW: compara as fontes com o último escritor de cada registrador
+            if src1 > 0 and j - last_writer[src1] <= writer_window[src1]:
+                conflicts.append((last_writer[src1], j, raw))
+            if src2 > 0 and src2 != src1 and j - last_writer[src2] <= writer_window[src2]:
+                conflicts.append((last_writer[src2], j, raw))
+
+            if name_dependences:
+                if dest > 0:
+                    # WAR: leitores recentes do registrador que agora é escrito
+                    for i in last_readers[dest]:
+                        if j - i <= window:
+                            conflicts.append((i, j, ConflictType.WAR))
+                    # WAW: escritor anterior do mesmo registrador
+                    if j - last_writer[dest] <= window:
+                        conflicts.append((last_writer[dest], j, ConflictType.WAW))
+                    last_readers[dest] = []
+                if src1 > 0 and src1 != dest:
+                    last_readers[src1].append(j)
+                if src2 > 0 and src2 != src1 and src2 != dest:
+                    last_readers[src2].append(j)
+
+            if dest > 0:
+                last_writer[dest] = j
+                writer_window[dest] = load_window if flags & FLAG_LOAD else alu_window
+            j += 1
+
+        self.position = j
+        return conflicts
 
 class PipelineAnalyzer:
-    def __init__(self, instructions: List[int]):
+    def __init__(self, instructions: List[int], lookahead: int = DEFAULT_LOOKAHEAD,
+                 table: InstructionTable = None, base_address: int = 0,
+                 cancel_check: Optional[Callable[[], None]] = None):
         self.original_instructions = instructions
-        self.decoded_instructions = self._decode_instructions()
+        self.lookahead = lookahead
+        # Chamada de tempos em tempos nos laços longos; pode levantar uma
+        # exceção para interromper o cálculo (ex.: BackgroundTask.checkpoint)
+        self.cancel_check = cancel_check
+        # Endereço da primeira instrução, para resolver alvos de desvios
+        self.base_address = base_address
+        self.table = table if table is not None else self._decode_instructions()
+        self.decoded_instructions = self.table
         self.conflicts = []
         self.solutions = {}
+        # Intermediários compartilhados entre técnicas (a tabela não muda depois de criada)
+        self._memo = {}
+        # Trace dinâmico de desvios (use_branch_trace) e o preditor usado sobre ele
+        self.branch_trace = None
+        self.branch_predictor = None
+        # Última execução de simulate (SimulationResult)
+        self.simulation = None
+        # Estatísticas de cache (use_cache_stats), cujas faltas somam ao custo das técnicas
+        self.cache_stats = []
+        # Muda a cada use_branch_trace/use_cache_stats: os TechniqueResults já
+        # calculados descartam o que memorizaram
+        self.stats_version = 0
 
-    def _decode_instructions(self) -> List[Instruction]:
-        """Decodifica as instruções hexadecimais em objetos Instruction"""
-        decoded = []
-        for hex_code in self.original_instructions:
-            opcode = hex_code & 0x7F
-            rd = (hex_code >> 7) & 0x1F
-            funct3 = (hex_code >> 12) & 0x7
-            rs1 = (hex_code >> 15) & 0x1F
-            rs2 = (hex_code >> 20) & 0x1F
-            
-            # Determina o tipo da instrução
-            if opcode == 0x33:  # Tipo R
-                inst_type = "R"
-                is_branch = False
-                is_jump = False
-            elif opcode in [0x13, 0x03, 0x67]:  # Tipo I
-                inst_type = "I"
-                is_branch = False
-                is_jump = (opcode == 0x67)
-            elif opcode == 0x23:  # Tipo S
-                inst_type = "S"
-                is_branch = False
-                is_jump = False
-            elif opcode == 0x63:  # Tipo B
-                inst_type = "B"
-                is_branch = True
-                is_jump = False
-            elif opcode in [0x37, 0x17]:  # Tipo U
-                inst_type = "U"
-                is_branch = False
-                is_jump = False
-            elif opcode == 0x6F:  # Tipo J
-                inst_type = "J"
-                is_branch = False
-                is_jump = True
-            else:
-                inst_type = "UNKNOWN"
-                is_branch = False
-                is_jump = False
-
-            decoded.append(Instruction(
-                hex_code=hex_code,
-                type=inst_type,
-                rd=rd if inst_type in ["R", "I", "U"] else None,
-                rs1=rs1 if inst_type in ["R", "I", "S", "B"] else None,
-                rs2=rs2 if inst_type in ["R", "S", "B"] else None,
-                is_branch=is_branch,
-                is_jump=is_jump
-            ))
-        return decoded
-
-    def detect_data_conflicts(self, with_forwarding: bool = False) -> List[Tuple[int, int, ConflictType]]:
-        """Detecta conflitos de dados entre instruções"""
-        conflicts = []
-        for i in range(len(self.decoded_instructions)):
-            for j in range(i + 1, min(i + 4, len(self.decoded_instructions))):
-                inst1 = self.decoded_instructions[i]
-                inst2 = self.decoded_instructions[j]
-                
-                # RAW (Read After Write)
-                if inst1.rd is not None and inst2.rs1 is not None and inst1.rd == inst2.rs1:
-                    if not with_forwarding or j - i > 1:
-                        conflicts.append((i, j, ConflictType.RAW))
-                if inst1.rd is not None and inst2.rs2 is not None and inst1.rd == inst2.rs2:
-                    if not with_forwarding or j - i > 1:
-                        conflicts.append((i, j, ConflictType.RAW))
-                
-                # WAW (Write After Write)
-                if inst1.rd is not None and inst2.rd is not None and inst1.rd == inst2.rd:
-                    conflicts.append((i, j, ConflictType.WAW))
-                
-                # WAR (Write After Read)
-                if inst1.rs1 is not None and inst2.rd is not None and inst1.rs1 == inst2.rd:
-                    conflicts.append((i, j, ConflictType.WAR))
-                if inst1.rs2 is not None and inst2.rd is not None and inst1.rs2 == inst2.rd:
-                    conflicts.append((i, j, ConflictType.WAR))
-        
-        return conflicts
+    @classmethod
+    def from_chunks(cls, chunks: Iterable[Sequence[int]],
+                    lookahead: int = DEFAULT_LOOKAHEAD) -> "PipelineAnalyzer":
+        """Cria o analisador decodificando os blocos de iter_hex_chunks um a um
+
+        As palavras originais ficam apenas na coluna hex_code da tabela.
+        """
+        table = InstructionTable()
+        for chunk in chunks:
+            table.extend(chunk)
+        return cls(table.hex_code, lookahead, table=table)
+
+    @classmethod
+    def from_image(cls, image: ProgramImage, lookahead: int = DEFAULT_LOOKAHEAD) -> "PipelineAnalyzer":
+        """Cria o analisador a partir de um binário carregado com load_program"""
+        return cls(image.words, lookahead, base_address=image.base_address)
+
+    def _decode_instructions(self) -> InstructionTable:
+        """Decodifica as instruções hexadecimais em uma tabela colunar
+
+        A tabela se comporta como uma sequência de Instruction, materializadas
+        apenas quando acessadas, e vem do mesmo motor (com cache) usado pela
+        visão de decodificação.
+        """
+        return decode_buffer(self.original_instructions)
+
+    def _raw_windows(self, with_forwarding: bool, lookahead: int = None) -> Tuple[int, int]:
+        return raw_windows(with_forwarding, self.lookahead if lookahead is None else lookahead)
+
+    def detect_data_conflicts(self, with_forwarding: bool = False, lookahead: int = None,
+                              name_dependences: bool = False) -> List[Tuple[int, int, ConflictType]]:
+        """Detecta conflitos de dados em uma única passada (ver HazardScoreboard)"""
+        scoreboard = HazardScoreboard(
+            with_forwarding, self.lookahead if lookahead is None else lookahead, name_dependences
+        )
+        return scoreboard.scan(self.table)
+
+    def detect_data_conflicts_vectorized(self, with_forwarding: bool = False,
+                                         lookahead: int = None) -> List[Tuple[int, int, ConflictType]]:
+        """Versão NumPy de detect_data_conflicts (apenas RAW)
+
+        Compara a coluna rd deslocada de 1..lookahead posições com as colunas
+        rs1/rs2 do programa inteiro de uma vez. Produz exatamente os mesmos
+        conflitos, na mesma ordem, que a versão com scoreboard.
+        """
+        if np is None:
+            raise ImportError("detect_data_conflicts_vectorized requer NumPy (pip install numpy)")
+        alu_window, load_window = self._raw_windows(with_forwarding, lookahead)
+        window = max(alu_window, load_window)
+        rd = np.frombuffer(self.table.rd, dtype=np.int8)
+        is_load = (np.frombuffer(self.table.flags, dtype=np.uint8) & FLAG_LOAD) != 0
+        rs1 = np.frombuffer(self.table.rs1, dtype=np.int8)
+        rs2 = np.frombuffer(self.table.rs2, dtype=np.int8)
+        n = len(rd)
+
+        consumers, producers, slots = [], [], []
+        for slot, src in enumerate((rs1, rs2)):
+            wanted = src > 0
+            if slot == 1:
+                # rs2 igual a rs1 tem o mesmo produtor, já contado
+                wanted &= rs2 != rs1
+            covered = np.zeros(n, dtype=bool)
+            for distance in range(1, min(window, n - 1) + 1):
+                match = np.zeros(n, dtype=bool)
+                match[distance:] = (rd[:-distance] == src[distance:]) & wanted[distance:]
+                # Só o escritor mais recente conta; os anteriores ficam encobertos
+                nearest = match & ~covered
+                covered |= match
+                j = np.nonzero(nearest)[0]
+                i = j - distance
+                limit = np.where(is_load[i], load_window, alu_window)
+                keep = distance <= limit
+                consumers.append(j[keep])
+                producers.append(i[keep])
+                slots.append(np.full(int(keep.sum()), slot, dtype=np.int8))
+
+        if not consumers:
+            return []
+        j = np.concatenate(consumers)
+        i = np.concatenate(producers)
+        order = np.lexsort((np.concatenate(slots), j))
+        raw = ConflictType.RAW
+        return [(a, b, raw) for a, b in zip(i[order].tolist(), j[order].tolist())]
 
     def detect_control_conflicts(self) -> List[Tuple[int, int]]:
         """Detecta conflitos de controle (branches e jumps)"""
         conflicts = []
-        for i, inst in enumerate(self.decoded_instructions):
-            if inst.is_branch or inst.is_jump:
+        n = len(self.table)
+        for i, flags in enumerate(self.table.flags):
+            if flags & (FLAG_BRANCH | FLAG_JUMP):
                 # Adiciona conflito para as próximas 2 instruções
-                for j in range(i + 1, min(i + 3, len(self.decoded_instructions))):
+                for j in range(i + 1, min(i + 3, n)):
                     conflicts.append((i, j))
         return conflicts
 
-    def insert_nops(self, conflicts: List[Tuple[int, int, ConflictType]], 
-                   with_forwarding: bool = False) -> List[int]:
-        """Insere NOPs para resolver conflitos"""
-        nop = 0x00000013  # addi x0, x0, 0
-        result = self.original_instructions.copy()
-        offset = 0
-        
+    def required_distances(self, conflicts: Iterable[Tuple[int, int, ConflictType]],
+                           with_forwarding: bool = False) -> Dict[int, List[Tuple[int, int]]]:
+        """Distâncias mínimas (produtor, distância) exigidas, agrupadas pela consumidora"""
+        alu_window, load_window = self._raw_windows(with_forwarding)
+        flags = self.table.flags
+        required = {}
         for i, j, conflict_type in conflicts:
             if conflict_type == ConflictType.RAW:
-                if not with_forwarding:
-                    # Insere NOPs entre as instruções
-                    for _ in range(j - i - 1):
-                        result.insert(i + 1 + offset, nop)
-                        offset += 1
+                distance = (load_window if flags[i] & FLAG_LOAD else alu_window) + 1
             elif conflict_type == ConflictType.CONTROL:
-                # Insere NOPs após branch/jump
-                result.insert(i + 1 + offset, nop)
-                result.insert(i + 1 + offset, nop)
-                offset += 2
-        
+                distance = CONTROL_SLOTS + 1
+            else:
+                continue  # WAR/WAW não causam bolhas em um pipeline em ordem
+            required.setdefault(j, []).append((i, distance))
+        return required
+
+    def compute_stalls(self, conflicts: List[Tuple[int, int, ConflictType]],
+                       with_forwarding: bool = False) -> array:
+        """Calcula quantos NOPs precisam entrar antes de cada instrução
+
+        Cada conflito (i, j) exige uma distância mínima entre i e j no programa
+        final; uma instrução com vários conflitos recebe o máximo entre eles, não
+        a soma. As posições são resolvidas em uma única passada, já contando os
+        NOPs inseridos antes dos produtores.
+        """
+        required = self.required_distances(conflicts, with_forwarding)
+        n = len(self.table)
+        stalls = array('l', bytes(array('l').itemsize * n))
+        position = array('l', stalls)
+        next_position = 0
+        cancel_check = self.cancel_check
+        for j in range(n):
+            if cancel_check is not None and not j & 0xFFFF:
+                cancel_check()
+            if j in required:
+                earliest = max(position[i] + distance for i, distance in required[j])
+                if earliest > next_position:
+                    stalls[j] = earliest - next_position
+                    next_position = earliest
+            position[j] = next_position
+            next_position += 1
+        return stalls
+
+    def insert_nops(self, conflicts: List[Tuple[int, int, ConflictType]], 
+                   with_forwarding: bool = False) -> List[int]:
+        """Insere NOPs para resolver conflitos
+
+        O programa resultante é montado de uma vez em uma lista pré-alocada,
+        a partir das bolhas calculadas por compute_stalls.
+        """
+        stalls = self.compute_stalls(conflicts, with_forwarding)
+        result = [NOP] * (len(stalls) + sum(stalls))
+        position = 0
+        for word, stall in zip(self.table.hex_code, stalls):
+            position += stall
+            result[position] = word
+            position += 1
         return result
 
+    def _memoized(self, key, compute: Callable):
+        value = self._memo.get(key)
+        if value is None:
+            value = self._memo[key] = compute()
+        return value
+
+    def data_conflicts(self, with_forwarding: bool = False) -> List[Tuple[int, int, ConflictType]]:
+        """detect_data_conflicts com o lookahead do analisador, calculado uma única vez"""
+        return self._memoized(("data", with_forwarding),
+                              lambda: self.detect_data_conflicts(with_forwarding))
+
+    def control_conflicts(self) -> List[Tuple[int, int, ConflictType]]:
+        """detect_control_conflicts no formato de insert_nops, calculado uma única vez"""
+        return self._memoized(("control",), lambda: [
+            (i, j, ConflictType.CONTROL) for i, j in self.detect_control_conflicts()
+        ])
+
+    def use_conflicts(self, data: List = None, data_fw: List = None, control: List = None) -> None:
+        """Reaproveita listas de conflitos já calculadas (por exemplo, em outro processo)"""
+        for key, conflicts in ((("data", False), data), (("data", True), data_fw),
+                               (("control",), control)):
+            if conflicts is not None:
+                self._memo[key] = conflicts
+
+    def use_branch_trace(self, trace: BranchTrace, predictor: BranchPredictor = None) -> None:
+        """Estima os conflitos de controle pelas predições erradas sobre `trace`
+
+        Com um trace, o sobrecusto da técnica 7 passa a ser o número de
+        bolhas de controle do preditor (por padrão, BHT de 2 bits), e não
+        CONTROL_SLOTS por desvio da listagem.
+        """
+        self.branch_trace = trace
+        self.branch_predictor = predictor if predictor is not None else BimodalPredictor()
+        self._memo.pop(("prediction",), None)
+        self.stats_version += 1
+
+    def branch_prediction(self) -> Optional[PredictionStats]:
+        """Resultado do preditor sobre o trace de use_branch_trace (None sem trace)"""
+        if self.branch_trace is None:
+            return None
+        return self._memoized(("prediction",), lambda: self.branch_predictor.run(
+            self.branch_trace, CONTROL_SLOTS))
+
+    def use_cache_stats(self, stats: Iterable) -> None:
+        """Soma as bolhas das faltas de cache (CacheStats) ao sobrecusto das técnicas
+
+        Só entram as técnicas cujo sobrecusto é medido em ciclos (CYCLE_TECHNIQUES);
+        nas de detecção ele é um número de conflitos. As faltas são medidas
+        sobre a execução do programa original e tratadas como iguais para
+        todas as técnicas.
+        """
+        self.cache_stats = list(stats)
+        self.stats_version += 1
+
+    def memory_stall_cycles(self) -> int:
+        return sum(stats.stall_cycles for stats in self.cache_stats)
+
+    def simulate(self, max_instructions: int = None, predictor: BranchPredictor = None,
+                 caches=None):
+        """Executa o programa no simulador RV32I e analisa a sequência executada
+
+        Os desvios executados passam a ser o trace de use_branch_trace, e o
+        DynamicReport devolvido traz os conflitos e ciclos do trace. Com
+        `caches` (uma CacheAnalysis), as faltas também entram nos ciclos e
+        passam a fazer parte do custo das técnicas (use_cache_stats).
+        """
+        from riscv_simulator import Simulator, DynamicAnalysis, DEFAULT_MAX_INSTRUCTIONS
+        analysis = DynamicAnalysis(self.table, self.lookahead, predictor)
+        consumers = (analysis,) if caches is None else (analysis, caches)
+        simulator = Simulator(self.table.hex_code, self.base_address)
+        result = simulator.run(max_instructions or DEFAULT_MAX_INSTRUCTIONS, consumers=consumers)
+        self.use_branch_trace(result.branch_trace, analysis.predictor)
+        self._memo[("prediction",)] = analysis.report.prediction
+        self.simulation = result
+        report = analysis.report
+        if caches is not None:
+            self.use_cache_stats(caches.stats())
+            report.caches = self.cache_stats
+            memory = self.memory_stall_cycles()
+            for timing in (report.timing, report.timing_fw):
+                timing.stalls["memory"] = memory
+                timing.cycles += memory
+        return report
+
+    def control_flow(self) -> ControlFlowGraph:
+        """Grafo de fluxo de controle com os alvos dos desvios resolvidos, calculado uma única vez"""
+        return self._memoized(("cfg",), lambda: ControlFlowGraph(self.table, self.base_address))
+
+    def block_conflicts(self, block: int, with_forwarding: bool = False
+                        ) -> List[Tuple[int, int, ConflictType]]:
+        """Conflitos de dados restritos ao bloco básico `block` do CFG (índices globais)"""
+        start, stop = self.control_flow().block_range(block)
+        scoreboard = HazardScoreboard(with_forwarding, self.lookahead)
+        scoreboard.position = start
+        return scoreboard.scan(self.table.slice(start, stop))
+
+    def schedule(self, with_forwarding: bool = False) -> ScheduleResult:
+        """Escalona cada bloco básico do CFG com list scheduling sobre o DAG de dependências
+
+        Os blocos também terminam antes de cada alvo de desvio, de modo que
+        nenhuma instrução atravessa um ponto de entrada.
+        """
+        def compute():
+            alu_window, load_window = self._raw_windows(with_forwarding)
+            return ListScheduler(self.table, alu_window + 1, load_window + 1,
+                                 self.control_flow().blocks(), self.cancel_check).schedule()
+        return self._memoized(("schedule", with_forwarding), compute)
+
     def reorder_instructions(self, conflicts: List[Tuple[int, int, ConflictType]], 
                            with_forwarding: bool = False) -> List[int]:
-        """Reordena instruções para reduzir conflitos"""
-        result = self.original_instructions.copy()
-        # Implementação básica - pode ser melhorada
-        for i, j, conflict_type in conflicts:
-            if conflict_type == ConflictType.RAW and not with_forwarding:
-                # Tenta mover instruções independentes para frente
-                for k in range(i + 1, j):
-                    if not self._has_dependency(self.decoded_instructions[k], 
-                                             self.decoded_instructions[i]):
-                        result[i], result[k] = result[k], result[i]
-                        break
-        return result
+        """Reordena instruções para reduzir conflitos
 
-    def _has_dependency(self, inst1: Instruction, inst2: Instruction) -> bool:
-        """Verifica se há dependência entre duas instruções"""
-        if inst1.rd is not None:
-            if inst2.rs1 is not None and inst1.rd == inst2.rs1:
-                return True
-            if inst2.rs2 is not None and inst1.rd == inst2.rs2:
-                return True
-        if inst2.rd is not None:
-            if inst1.rs1 is not None and inst2.rd == inst1.rs1:
-                return True
-            if inst1.rs2 is not None and inst2.rd == inst1.rs2:
-                return True
-        return False
-
-    def apply_delayed_branch(self) -> List[int]:
-        """Aplica a técnica de delayed branch"""
-        result = []
-        i = 0
-        while i < len(self.original_instructions):
-            inst = self.decoded_instructions[i]
-            if inst.is_branch or inst.is_jump:
-                # Adiciona a instrução de branch/jump
-                result.append(self.original_instructions[i])
-                # Tenta mover a próxima instrução útil para o slot de delay
-                if i + 1 < len(self.original_instructions):
-                    next_inst = self.decoded_instructions[i + 1]
-                    if not self._has_dependency(next_inst, inst):
-                        result.append(self.original_instructions[i + 1])
-                        i += 1
-                    else:
-                        # Insere NOP se não for possível mover instrução útil
-                        result.append(0x00000013)  # NOP
-                else:
-                    result.append(0x00000013)  # NOP
-            else:
-                result.append(self.original_instructions[i])
-            i += 1
-        return result
+        Sem conflitos RAW o programa é devolvido como está; caso contrário
+        usa o escalonador por lista de schedule().
+        """
+        if not any(conflict_type == ConflictType.RAW for _, _, conflict_type in conflicts):
+            return list(self.table.hex_code)
+        return self.schedule(with_forwarding).program
+
+    def delay_slots(self, slots: int = DELAY_SLOTS) -> DelaySlotResult:
+        """Programa com os slots de delay preenchidos e o relatório do preenchimento"""
+        return self._memoized(("delay", slots),
+                              lambda: fill_delay_slots(self.table, self.control_flow(), slots,
+                                                       self.cancel_check))
+
+    def apply_delayed_branch(self, slots: int = DELAY_SLOTS) -> List[int]:
+        """Aplica a técnica de delayed branch
+
+        Os slots são preenchidos com instruções de antes do desvio, do alvo ou
+        do fall-through (ver delay_slots) e os deslocamentos são recalculados.
+        """
+        return self.delay_slots(slots).program
+
+    def combined_solution(self) -> List[int]:
+        """Combinação das técnicas 4 e 6: reordena com forwarding e insere NOPs
+        para os conflitos que o escalonamento não eliminou"""
+        if not any(conflict_type == ConflictType.RAW for _, _, conflict_type in self.data_conflicts(True)):
+            return list(self.table.hex_code)
+        result = self.schedule(with_forwarding=True)
+        # A tabela reordenada é uma permutação das colunas: nada é decodificado de novo
+        reordered = PipelineAnalyzer(result.program, self.lookahead,
+                                     table=self.table.take(result.order))
+        return reordered.insert_nops(reordered.data_conflicts(True), with_forwarding=True)
+
+    def technique(self, name: str) -> Tuple[List[int], int]:
+        """Programa resultante e sobrecusto de uma das técnicas de TECHNIQUES"""
+        (detect, detect_fw, nops, nops_fw, reorder, reorder_fw,
+         control, delayed, combined) = TECHNIQUES
+        if name == detect:
+            return self.original_instructions, len(self.data_conflicts(False))
+        if name == detect_fw:
+            return self.original_instructions, len(self.data_conflicts(True))
+        memory = self.memory_stall_cycles()
+        if name in (nops, nops_fw):
+            with_forwarding = name == nops_fw
+            program = self.insert_nops(self.data_conflicts(with_forwarding), with_forwarding)
+        elif name in (reorder, reorder_fw):
+            with_forwarding = name == reorder_fw
+            program = self.reorder_instructions(self.data_conflicts(with_forwarding), with_forwarding)
+        elif name == control:
+            program = self.insert_nops(self.control_conflicts())
+            prediction = self.branch_prediction()
+            if prediction is not None:
+                return program, prediction.stall_cycles + memory
+        elif name == delayed:
+            program = self.apply_delayed_branch()
+        elif name == combined:
+            program = self.combined_solution()
+        else:
+            raise KeyError(name)
+        return program, len(program) - len(self.original_instructions) + memory
+
+    def results(self, techniques: Iterable[str] = TECHNIQUES) -> "TechniqueResults":
+        """Resultados calculados sob demanda, técnica a técnica"""
+        return TechniqueResults(self, techniques)
+
+    def analyze_all_techniques(self, progress: Callable[[float], None] = None,
+                               techniques: Iterable[str] = TECHNIQUES
+                               ) -> Dict[str, Tuple[List[int], int]]:
+        """Analisa e aplica todas as técnicas solicitadas
+
+        `techniques` restringe a análise a um subconjunto de TECHNIQUES.
+        `progress`, se informado, é chamado com a fração concluída após cada
+        técnica (e pode levantar exceção para interromper a análise).
+        """
+        return self.results(techniques).compute(progress)
+
+class TechniqueResults(Mapping):
+    """Resultados de analyze_all_techniques calculados só quando acessados
+
+    Cada técnica é calculada no primeiro acesso e memorizada; listas de
+    conflitos e escalonamentos são compartilhados entre as técnicas pelo
+    analisador.
+    """
+
+    def __init__(self, analyzer: PipelineAnalyzer, techniques: Iterable[str] = TECHNIQUES):
+        self.analyzer = analyzer
+        self.techniques = tuple(techniques)
+        unknown = set(self.techniques) - set(TECHNIQUES)
+        if unknown:
+            raise ValueError(f"técnicas desconhecidas: {', '.join(sorted(unknown))}")
+        self._values = {}
+        self._version = analyzer.stats_version
+
+    def _sync(self) -> None:
+        """Descarta os valores calculados antes de um novo trace ou novas estatísticas de cache"""
+        if self._version != self.analyzer.stats_version:
+            self._values.clear()
+            self._version = self.analyzer.stats_version
+
+    def __getitem__(self, technique: str) -> Tuple[List[int], int]:
+        if technique not in self.techniques:
+            raise KeyError(technique)
+        self._sync()
+        value = self._values.get(technique)
+        if value is None:
+            value = self._values[technique] = self.analyzer.technique(technique)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.techniques)
+
+    def __len__(self) -> int:
+        return len(self.techniques)
+
+    def is_computed(self, technique: str) -> bool:
+        self._sync()
+        return technique in self._values
 
-    def analyze_all_techniques(self) -> Dict[str, Tuple[List[int], int]]:
-        """Analisa e aplica todas as técnicas solicitadas"""
+    def compute(self, progress: Callable[[float], None] = None) -> Dict[str, Tuple[List[int], int]]:
+        """Calcula todas as técnicas, em ordem, e retorna um dicionário comum"""
         results = {}
-        
-        # 1. Sem forwarding, detectar conflitos
-        data_conflicts = self.detect_data_conflicts(with_forwarding=False)
-        results["1_sem_forwarding_detect"] = (self.original_instructions, len(data_conflicts))
-        
-        # 2. Com forwarding, detectar conflitos
-        data_conflicts_fw = self.detect_data_conflicts(with_forwarding=True)
-        results["2_com_forwarding_detect"] = (self.original_instructions, len(data_conflicts_fw))
-        
-        # 3. Sem forwarding, inserir NOPs
-        nop_solution = self.insert_nops(data_conflicts, with_forwarding=False)
-        results["3_sem_forwarding_nops"] = (nop_solution, len(nop_solution) - len(self.original_instructions))
-        
-        # 4. Com forwarding, inserir NOPs
-        nop_solution_fw = self.insert_nops(data_conflicts_fw, with_forwarding=True)
-        results["4_com_forwarding_nops"] = (nop_solution_fw, len(nop_solution_fw) - len(self.original_instructions))
-        
-        # 5. Sem forwarding, reordenar
-        reordered = self.reorder_instructions(data_conflicts, with_forwarding=False)
-        results["5_sem_forwarding_reorder"] = (reordered, len(reordered) - len(self.original_instructions))
-        
-        # 6. Com forwarding, reordenar
-        reordered_fw = self.reorder_instructions(data_conflicts_fw, with_forwarding=True)
-        results["6_com_forwarding_reorder"] = (reordered_fw, len(reordered_fw) - len(self.original_instructions))
-        
-        # 7. NOPs para conflitos de controle
-        control_conflicts = self.detect_control_conflicts()
-        control_nops = self.insert_nops([(i, j, ConflictType.CONTROL) for i, j in control_conflicts])
-        results["7_control_nops"] = (control_nops, len(control_nops) - len(self.original_instructions))
-        
-        # 8. Delayed branch
-        delayed = self.apply_delayed_branch()
-        results["8_delayed_branch"] = (delayed, len(delayed) - len(self.original_instructions))
-        
-        # 9. Combinação de 4 e 6
-        combined = self.insert_nops(data_conflicts_fw, with_forwarding=True)
-        combined = self.reorder_instructions(data_conflicts_fw, with_forwarding=True)
-        results["9_combined"] = (combined, len(combined) - len(self.original_instructions))
-        
-        return results 
\ No newline at end of file
+        for technique in self.techniques:
+            results[technique] = self[technique]
+            if progress is not None:
+                progress(len(results) / len(self.techniques))
+        return results
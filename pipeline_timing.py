@@ -0,0 +1,190 @@
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Dict, List, Optional, Tuple
+
+from instruction_table import (
+    InstructionTable, FLAG_BRANCH, FLAG_JUMP, FLAG_LOAD
+)
+from pipeline_analyzer import PipelineAnalyzer, DEFAULT_LOOKAHEAD, CONTROL_SLOTS
+
+class Forwarding(Enum):
+    NONE = "none"    # Sem forwarding: operandos só via banco de registradores
+    EX_EX = "ex_ex"  # Forwarding EX->EX e MEM->EX (load-use ainda gera bolha)
+
+class BranchResolution(Enum):
+    ID = "ID"  # Desvio resolvido no ID: 1 bolha
+    EX = "EX"  # Desvio resolvido no EX: 2 bolhas
+
+# Causas de bolha reportadas em TimingResult.stalls
+STALL_CAUSES = ("data", "load_use", "control")
+
+@dataclass
+class TimingConfig:
+    forwarding: Forwarding = Forwarding.NONE
+    branch_resolution: BranchResolution = BranchResolution.EX
+    load_use_bubble: int = 1
+    delay_slots: int = 0
+    lookahead: int = DEFAULT_LOOKAHEAD
+    # Bolhas por branch/jump; None = conforme branch_resolution e delay_slots
+    control_bubbles: Optional[int] = None
+
+@dataclass
+class TimingResult:
+    instructions: int
+    cycles: int
+    stalls: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def cpi(self) -> float:
+        return self.cycles / self.instructions if self.instructions else 0.0
+
+    @property
+    def total_stalls(self) -> int:
+        return sum(self.stalls.values())
+
+class PipelineTimer:
+    """Tempo de execução em um pipeline IF/ID/EX/MEM/WB em ordem, calculado em blocos
+
+    Mantém, para cada registrador, o primeiro ciclo em que uma instrução no
+    EX pode usar o seu valor; feed pode ser chamado com blocos consecutivos
+    de um programa (ou de um trace dinâmico) e result devolve o total até ali.
+    Branches e jumps custam bolhas fixas (sem predição), reduzidas pelos
+    delay slots configurados, a menos que `control_bubbles` diga outra coisa.
+    """
+
+    def __init__(self, config: TimingConfig = None):
+        if config is None:
+            config = TimingConfig()
+        self.config = config
+        self.forwarding = config.forwarding == Forwarding.EX_EX
+        branch_in_id = config.branch_resolution == BranchResolution.ID
+        if self.forwarding:
+            self.alu_distance = 1
+            self.load_distance = 1 + config.load_use_bubble
+        else:
+            self.alu_distance = self.load_distance = config.lookahead + 1
+        # Com forwarding, um branch (ou jalr, cujo alvo vem de rs1) resolvido no ID
+        # precisa dos operandos um ciclo antes
+        self.branch_extra = 1 if self.forwarding and branch_in_id else 0
+        if config.control_bubbles is not None:
+            self.control_penalty = config.control_bubbles
+        else:
+            self.control_penalty = max(0, (1 if branch_in_id else 2) - config.delay_slots)
+
+        self.ready = [0] * 32
+        self.ready_from_load = [False] * 32
+        self.data_stalls = self.load_use_stalls = self.control_stalls = 0
+        self.cycle = 0
+        self.pending_control = 0
+        self.instructions = 0
+
+    def feed(self, table: InstructionTable) -> None:
+        """Processa as próximas instruções"""
+        forwarding = self.forwarding
+        alu_distance, load_distance = self.alu_distance, self.load_distance
+        branch_extra, control_penalty = self.branch_extra, self.control_penalty
+        ready, ready_from_load = self.ready, self.ready_from_load
+        data_stalls, load_use_stalls = self.data_stalls, self.load_use_stalls
+        control_stalls = self.control_stalls
+        cycle, pending_control = self.cycle, self.pending_control
+        control_mask = FLAG_BRANCH | FLAG_JUMP
+
+        for src1, src2, dest, flags in zip(table.rs1, table.rs2, table.rd, table.flags):
+            # Ciclo em que a instrução entraria no EX sem conflitos de dados
+            base = cycle + 1 + pending_control
+            control_stalls += pending_control
+            issue = base
+            from_load = False
+            extra = branch_extra if flags & control_mask else 0
+            if src1 > 0 and ready[src1] + extra > issue:
+                issue = ready[src1] + extra
+                from_load = ready_from_load[src1]
+            if src2 > 0 and ready[src2] + extra > issue:
+                issue = ready[src2] + extra
+                from_load = ready_from_load[src2]
+            if issue > base:
+                if from_load and forwarding:
+                    load_use_stalls += issue - base
+                else:
+                    data_stalls += issue - base
+            if dest > 0:
+                is_load = flags & FLAG_LOAD
+                ready[dest] = issue + (load_distance if is_load else alu_distance)
+                ready_from_load[dest] = bool(is_load)
+            pending_control = control_penalty if flags & control_mask else 0
+            cycle = issue
+
+        self.data_stalls, self.load_use_stalls = data_stalls, load_use_stalls
+        self.control_stalls = control_stalls
+        self.cycle, self.pending_control = cycle, pending_control
+        self.instructions += len(table)
+
+    def result(self) -> TimingResult:
+        n = self.instructions
+        return TimingResult(
+            instructions=n,
+            # O primeiro EX ocorre no ciclo 3 e a última instrução ainda passa por MEM e WB
+            cycles=self.cycle + 4 if n else 0,
+            stalls=dict(zip(STALL_CAUSES, (self.data_stalls, self.load_use_stalls,
+                                           self.control_stalls)))
+        )
+
+def simulate(table: InstructionTable, config: TimingConfig = None) -> TimingResult:
+    """Simula o tempo de execução de `table` (ver PipelineTimer)"""
+    timer = PipelineTimer(config)
+    timer.feed(table)
+    return timer.result()
+
+# Modelo de pipeline em que cada técnica de analyze_all_techniques é avaliada
+TECHNIQUE_FORWARDING = {
+    "1_sem_forwarding_detect": Forwarding.NONE,
+    "2_com_forwarding_detect": Forwarding.EX_EX,
+    "3_sem_forwarding_nops": Forwarding.NONE,
+    "4_com_forwarding_nops": Forwarding.EX_EX,
+    "5_sem_forwarding_reorder": Forwarding.NONE,
+    "6_com_forwarding_reorder": Forwarding.EX_EX,
+    "7_control_nops": Forwarding.NONE,
+    "8_delayed_branch": Forwarding.NONE,
+    "9_combined": Forwarding.EX_EX,
+}
+
+# Instruções sempre executadas após cada desvio nos programas gerados pelas
+# técnicas de controle (NOPs explícitos ou delay slot)
+TECHNIQUE_DELAY_SLOTS = {
+    "7_control_nops": CONTROL_SLOTS,
+    "8_delayed_branch": 1,
+}
+
+def simulate_all_techniques(analyzer: PipelineAnalyzer,
+                            results: Dict[str, Tuple[List[int], int]] = None,
+                            branch_resolution: BranchResolution = BranchResolution.EX
+                            ) -> Dict[str, Tuple[List[int], TimingResult]]:
+    """Simula o programa produzido por cada técnica no modelo correspondente"""
+    if results is None:
+        results = analyzer.analyze_all_techniques()
+    timings = {}
+    for technique, (program, _) in results.items():
+        config = TimingConfig(
+            forwarding=TECHNIQUE_FORWARDING.get(technique, Forwarding.NONE),
+            branch_resolution=branch_resolution,
+            delay_slots=TECHNIQUE_DELAY_SLOTS.get(technique, 0),
+            lookahead=analyzer.lookahead
+        )
+        if program is analyzer.original_instructions:
+            table = analyzer.table
+        else:
+            table = InstructionTable.from_words(program)
+        timings[technique] = (program, simulate(table, config))
+    return timings
+
+def cycles_all_techniques(analyzer: PipelineAnalyzer,
+                          results: Dict[str, Tuple[List[int], int]] = None,
+                          branch_resolution: BranchResolution = BranchResolution.EX
+                          ) -> Dict[str, Tuple[List[int], int]]:
+    """Como analyze_all_techniques, mas com o total de ciclos no lugar do sobrecusto"""
+    return {
+        technique: (program, timing.cycles)
+        for technique, (program, timing) in simulate_all_techniques(
+            analyzer, results, branch_resolution
+        ).items()
+    }
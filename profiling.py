@@ -0,0 +1,320 @@
+"""Instrumentação opcional das etapas de decodificação, análise e interface
+
+Desligada por padrão. enable() troca as funções listadas em INSTRUMENTED
+(métodos de PipelineAnalyzer, decode_instruction, read_hex_file, ...) por
+versões que medem cada chamada, e disable() devolve as originais, de modo
+que sem instrumentação o custo é zero. Trechos que não são funções da
+biblioteca (handlers da interface) usam stage() ou @profiled, que só fazem
+uma verificação quando desligados.
+
+Para cada etapa são registrados o tempo de parede, o número de chamadas, as
+instruções processadas (e portanto instruções/s) e, com memory=True, o pico
+de memória alocada (tracemalloc). O resultado pode ser gravado em JSON
+(write_json) ou no formato trace-event do Chrome (write_chrome_trace), que
+abre em chrome://tracing ou no Perfetto.
+"""
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import nullcontext
+from dataclasses import dataclass, asdict
+from typing import Callable, Dict, List, Optional
+
+import branch_prediction
+import cache_model
+import instruction_formatter
+import instruction_table
+import pipeline_analyzer
+import riscv_classifier
+import riscv_simulator
+
+# Eventos guardados para o trace do Chrome; os demais só entram nas estatísticas
+MAX_TRACE_EVENTS = 1_000_000
+
+def _table_items(args, result) -> int:
+    return len(args[0].table)
+
+def _one(args, result) -> int:
+    return 1
+
+def _trace_items(args, result) -> int:
+    return len(args[1])
+
+def _executed_items(args, result) -> int:
+    return result.executed if result is not None else 0
+
+def _result_items(args, result) -> int:
+    return len(result) if result is not None else 0
+
+# (dono, atributo, etapa, instruções processadas a partir de (args, resultado))
+INSTRUMENTED = (
+    (riscv_classifier, "decode_instruction", "decode_instruction", _one),
+    (riscv_classifier, "read_hex_file", "read_hex_file", _result_items),
+    (instruction_table, "decode_buffer", "decode_buffer", _result_items),
+    (instruction_formatter.InstructionFormatter, "lines", "format_lines", _result_items),
+    (pipeline_analyzer.PipelineAnalyzer, "_decode_instructions", "decode", _result_items),
+    (pipeline_analyzer.PipelineAnalyzer, "detect_data_conflicts", "detect_data_conflicts", _table_items),
+    (pipeline_analyzer.PipelineAnalyzer, "detect_control_conflicts", "detect_control_conflicts", _table_items),
+    (pipeline_analyzer.PipelineAnalyzer, "insert_nops", "insert_nops", _table_items),
+    (pipeline_analyzer.PipelineAnalyzer, "control_flow", "control_flow", _table_items),
+    (pipeline_analyzer.PipelineAnalyzer, "schedule", "schedule", _table_items),
+    (pipeline_analyzer.PipelineAnalyzer, "reorder_instructions", "reorder_instructions", _table_items),
+    (pipeline_analyzer.PipelineAnalyzer, "apply_delayed_branch", "apply_delayed_branch", _table_items),
+    (pipeline_analyzer.PipelineAnalyzer, "combined_solution", "combined_solution", _table_items),
+    (pipeline_analyzer.PipelineAnalyzer, "analyze_all_techniques", "analyze_all_techniques", _table_items),
+    (branch_prediction.BranchPredictor, "run", "branch_prediction", _trace_items),
+    (riscv_simulator.Simulator, "run", "simulate", _executed_items),
+    (cache_model.Cache, "access_many", "cache", _trace_items),
+)
+
+@dataclass
+class StageStats:
+    calls: int = 0
+    seconds: float = 0.0
+    items: int = 0
+    peak_bytes: int = 0
+
+    @property
+    def instructions_per_second(self) -> float:
+        return self.items / self.seconds if self.seconds else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        data = asdict(self)
+        data["instructions_per_second"] = self.instructions_per_second
+        return data
+
+class _Frame:
+    """Etapa em andamento em uma thread"""
+    __slots__ = ("name", "start", "memory_start", "memory_peak")
+
+    def __init__(self, name: str, start: float, memory_start: int):
+        self.name = name
+        self.start = start
+        self.memory_start = memory_start
+        self.memory_peak = memory_start
+
+class Profiler:
+    """Estatísticas por etapa e eventos para o trace
+
+    Os tempos são inclusivos: uma etapa chamada dentro de outra conta nas
+    duas. O pico de memória de uma etapa também inclui o das etapas internas
+    e, como tracemalloc é global, o de outras threads no mesmo intervalo.
+    """
+
+    def __init__(self, memory: bool = False, trace: bool = True):
+        self.memory = memory
+        self.trace = trace
+        self.stats: Dict[str, StageStats] = {}
+        self.events: List[Dict] = []
+        self.dropped_events = 0
+        self.origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> List[_Frame]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def begin(self, name: str) -> _Frame:
+        memory_start = 0
+        if self.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            stack = self._stack()
+            if stack:
+                stack[-1].memory_peak = max(stack[-1].memory_peak, peak)
+            tracemalloc.reset_peak()
+            memory_start = current
+        frame = _Frame(name, time.perf_counter(), memory_start)
+        self._stack().append(frame)
+        return frame
+
+    def end(self, frame: _Frame, items: int = 0) -> None:
+        elapsed = time.perf_counter() - frame.start
+        stack = self._stack()
+        if stack and stack[-1] is frame:
+            stack.pop()
+        peak_bytes = 0
+        if self.memory and tracemalloc.is_tracing():
+            _, peak = tracemalloc.get_traced_memory()
+            frame.memory_peak = max(frame.memory_peak, peak)
+            peak_bytes = frame.memory_peak - frame.memory_start
+            if stack:
+                stack[-1].memory_peak = max(stack[-1].memory_peak, frame.memory_peak)
+        with self._lock:
+            stats = self.stats.get(frame.name)
+            if stats is None:
+                stats = self.stats[frame.name] = StageStats()
+            stats.calls += 1
+            stats.seconds += elapsed
+            stats.items += items
+            stats.peak_bytes = max(stats.peak_bytes, peak_bytes)
+            if self.trace:
+                if len(self.events) < MAX_TRACE_EVENTS:
+                    self.events.append({
+                        "name": frame.name, "ph": "X", "pid": os.getpid(),
+                        "tid": threading.get_ident(),
+                        "ts": (frame.start - self.origin) * 1e6, "dur": elapsed * 1e6,
+                        "args": {"instructions": items, "peak_bytes": peak_bytes},
+                    })
+                else:
+                    self.dropped_events += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stats.clear()
+            self.events.clear()
+            self.dropped_events = 0
+
+    def summary(self) -> List[tuple]:
+        """(etapa, StageStats) em ordem decrescente de tempo"""
+        with self._lock:
+            items = list(self.stats.items())
+        return sorted(items, key=lambda item: item[1].seconds, reverse=True)
+
+    def to_dict(self) -> Dict:
+        return {
+            "stages": {name: stats.to_dict() for name, stats in self.summary()},
+            "memory": self.memory,
+            "dropped_events": self.dropped_events,
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    def write_chrome_trace(self, path: str) -> None:
+        with self._lock:
+            events = list(self.events)
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+# Profiler ativo (None = instrumentação desligada)
+_profiler: Optional[Profiler] = None
+# (objeto, atributo, valor original) de cada função trocada por enable()
+_patched: List[tuple] = []
+
+def get_profiler() -> Optional[Profiler]:
+    return _profiler
+
+def is_enabled() -> bool:
+    return _profiler is not None
+
+def _wrap(function: Callable, name: str, count_items: Callable) -> Callable:
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        profiler = _profiler
+        if profiler is None:
+            return function(*args, **kwargs)
+        frame = profiler.begin(name)
+        result = None
+        try:
+            result = function(*args, **kwargs)
+            return result
+        finally:
+            profiler.end(frame, count_items(args, result))
+    return wrapper
+
+def _patch(owner, attribute: str, name: str, count_items: Callable) -> None:
+    original = owner.__dict__[attribute]
+    wrapper = _wrap(original, name, count_items)
+    setattr(owner, attribute, wrapper)
+    _patched.append((owner, attribute, original))
+    if isinstance(owner, type):
+        return  # Métodos são procurados na classe a cada chamada
+    # Funções importadas com `from módulo import função` têm outras referências
+    for module in list(sys.modules.values()):
+        if module is owner or module is None:
+            continue
+        namespace = getattr(module, "__dict__", None)
+        if namespace is None:
+            continue
+        for key, value in list(namespace.items()):
+            if value is original:
+                setattr(module, key, wrapper)
+                _patched.append((module, key, original))
+
+def enable(memory: bool = False, trace: bool = True) -> Profiler:
+    """Liga a instrumentação (ou devolve o Profiler já ativo)
+
+    Com `memory`, liga também o tracemalloc, que deixa o programa bem mais
+    lento; os tempos medidos assim não devem ser comparados com os normais.
+    """
+    global _profiler
+    if _profiler is not None:
+        return _profiler
+    _profiler = Profiler(memory, trace)
+    if memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+    for owner, attribute, name, count_items in INSTRUMENTED:
+        _patch(owner, attribute, name, count_items)
+    return _profiler
+
+def disable() -> Optional[Profiler]:
+    """Desliga a instrumentação e devolve o Profiler com o que foi medido"""
+    global _profiler
+    profiler, _profiler = _profiler, None
+    while _patched:
+        owner, attribute, original = _patched.pop()
+        setattr(owner, attribute, original)
+    if profiler is not None and profiler.memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    return profiler
+
+class _Stage:
+    __slots__ = ("profiler", "name", "items", "frame")
+
+    def __init__(self, profiler: Profiler, name: str, items: int):
+        self.profiler = profiler
+        self.name = name
+        self.items = items
+
+    def __enter__(self):
+        self.frame = self.profiler.begin(self.name)
+        return self
+
+    def __exit__(self, *exc_info):
+        self.profiler.end(self.frame, self.items)
+        return False
+
+_NO_STAGE = nullcontext()
+
+def stage(name: str, items: int = 0):
+    """Context manager que mede um trecho como a etapa `name`, com `items` instruções"""
+    profiler = _profiler
+    if profiler is None:
+        return _NO_STAGE
+    return _Stage(profiler, name, items)
+
+def profiled(name: str = None) -> Callable:
+    """Decorador para handlers: mede cada chamada quando a instrumentação está ligada"""
+    def decorate(function: Callable) -> Callable:
+        stage_name = name or function.__qualname__
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return function(*args, **kwargs)
+            frame = profiler.begin(stage_name)
+            try:
+                return function(*args, **kwargs)
+            finally:
+                profiler.end(frame)
+        return wrapper
+    return decorate
+
+def write_profile(path: str, profiler: Profiler = None) -> None:
+    """Grava em `path`: trace do Chrome se terminar em .trace.json, senão o resumo JSON"""
+    profiler = profiler or _profiler
+    if profiler is None:
+        return
+    if path.endswith(".trace.json"):
+        profiler.write_chrome_trace(path)
+    else:
+        profiler.write_json(path)
@@ -0,0 +1,241 @@
+"""Gerador de programas RV32I sintéticos para benchmarks
+
+O programa gerado é uma sequência de palavras válidas cuja composição é
+controlada por ProgramProfile: a proporção de cada classe de instrução, a
+distância média entre uma instrução e a produtora de seus operandos e a
+densidade de desvios. Com a mesma semente o resultado é sempre o mesmo.
+"""
+import math
+import random
+from array import array
+from dataclasses import dataclass, asdict
+from typing import Dict
+
+from branch_prediction import BranchTrace
+
+# Registradores usados como destino (x0, ra e sp ficam de fora)
+FIRST_REG = 5
+REG_COUNT = 32
+
+# (funct3, funct7) de cada operação por classe
+R_OPS = ((0, 0x00), (0, 0x20), (1, 0x00), (2, 0x00), (3, 0x00),
+         (4, 0x00), (5, 0x00), (5, 0x20), (6, 0x00), (7, 0x00))
+I_OPS = (0, 2, 3, 4, 6, 7)
+LOAD_OPS = (0, 1, 2, 4, 5)
+STORE_OPS = (0, 1, 2)
+BRANCH_OPS = (0, 1, 4, 5, 6, 7)
+
+def encode_r(opcode: int, rd: int, funct3: int, rs1: int, rs2: int, funct7: int) -> int:
+    return (funct7 << 25) | (rs2 << 20) | (rs1 << 15) | (funct3 << 12) | (rd << 7) | opcode
+
+def encode_i(opcode: int, rd: int, funct3: int, rs1: int, imm: int) -> int:
+    return ((imm & 0xFFF) << 20) | (rs1 << 15) | (funct3 << 12) | (rd << 7) | opcode
+
+def encode_s(opcode: int, funct3: int, rs1: int, rs2: int, imm: int) -> int:
+    return (((imm >> 5) & 0x7F) << 25) | (rs2 << 20) | (rs1 << 15) | (funct3 << 12) \
+        | ((imm & 0x1F) << 7) | opcode
+
+def encode_b(opcode: int, funct3: int, rs1: int, rs2: int, imm: int) -> int:
+    return (((imm >> 12) & 0x1) << 31) | (((imm >> 5) & 0x3F) << 25) | (rs2 << 20) \
+        | (rs1 << 15) | (funct3 << 12) | (((imm >> 1) & 0xF) << 8) \
+        | (((imm >> 11) & 0x1) << 7) | opcode
+
+def encode_u(opcode: int, rd: int, imm: int) -> int:
+    return (imm & 0xFFFFF000) | (rd << 7) | opcode
+
+def encode_j(opcode: int, rd: int, imm: int) -> int:
+    return (((imm >> 20) & 0x1) << 31) | (((imm >> 1) & 0x3FF) << 21) \
+        | (((imm >> 11) & 0x1) << 20) | (((imm >> 12) & 0xFF) << 12) | (rd << 7) | opcode
+
+@dataclass
+class ProgramProfile:
+    """Composição do programa sintético
+
+    Os pesos das classes que não são desvios são normalizados entre si;
+    `branch_density` e `jump_density` são frações do total de instruções.
+    A distância até a produtora segue uma distribuição geométrica com média
+    `dependency_distance` (1 = sempre a instrução anterior).
+    """
+    alu: float = 0.40
+    alu_imm: float = 0.30
+    load: float = 0.15
+    store: float = 0.10
+    lui: float = 0.05
+    branch_density: float = 0.10
+    jump_density: float = 0.02
+    dependency_distance: float = 2.0
+    max_branch_offset: int = 64  # Em instruções; no máximo 1023 (imediato B)
+
+    def to_dict(self) -> Dict[str, float]:
+        return asdict(self)
+
+class ProgramGenerator:
+    """Gera palavras segundo um ProgramProfile"""
+
+    def __init__(self, profile: ProgramProfile = None, seed: int = 0):
+        self.profile = profile or ProgramProfile()
+        self.rng = random.Random(seed)
+        p = self.profile
+        classes = (("alu", p.alu), ("alu_imm", p.alu_imm), ("load", p.load),
+                   ("store", p.store), ("lui", p.lui))
+        total = sum(weight for _, weight in classes)
+        if total <= 0:
+            raise ValueError("o perfil precisa de ao menos uma classe com peso positivo")
+        straight = max(0.0, 1.0 - p.branch_density - p.jump_density)
+        # Limites cumulativos: desvios, saltos e depois as classes comuns
+        self.thresholds = []
+        cumulative = p.branch_density
+        self.thresholds.append((cumulative, "branch"))
+        cumulative += p.jump_density
+        self.thresholds.append((cumulative, "jump"))
+        for name, weight in classes:
+            cumulative += straight * weight / total
+            self.thresholds.append((cumulative, name))
+        mean = max(1.0, p.dependency_distance)
+        # Distância geométrica com suporte em 1, 2, ...: 1 + floor(log(u) / log(1 - 1/média))
+        self.log_keep = math.log(1.0 - 1.0 / mean) if mean > 1.0 else None
+        self.max_offset = max(1, min(p.max_branch_offset, 1023))
+
+    def _distance(self) -> int:
+        if self.log_keep is None:
+            return 1
+        return 1 + int(math.log(1.0 - self.rng.random()) / self.log_keep)
+
+    def generate(self, count: int) -> array:
+        """Retorna `count` palavras como array('I')"""
+        rng = self.rng
+        random_value = rng.random
+        randrange = rng.randrange
+        choice = rng.choice
+        distance = self._distance
+        thresholds = self.thresholds
+        max_offset = self.max_offset
+        words = array('I')
+        append = words.append
+        # Destinos recentes, para escolher as fontes pela distância
+        history = [randrange(FIRST_REG, REG_COUNT) for _ in range(64)]
+        history_mask = len(history) - 1
+        head = 0
+
+        def source() -> int:
+            d = distance()
+            return history[(head - d) & history_mask] if d <= history_mask else randrange(FIRST_REG, REG_COUNT)
+
+        for index in range(count):
+            draw = random_value()
+            for limit, kind in thresholds:
+                if draw < limit:
+                    break
+            rd = 0
+            if kind == "alu":
+                funct3, funct7 = choice(R_OPS)
+                rd = randrange(FIRST_REG, REG_COUNT)
+                append(encode_r(0x33, rd, funct3, source(), source(), funct7))
+            elif kind == "alu_imm":
+                rd = randrange(FIRST_REG, REG_COUNT)
+                append(encode_i(0x13, rd, choice(I_OPS), source(), randrange(-2048, 2048)))
+            elif kind == "load":
+                rd = randrange(FIRST_REG, REG_COUNT)
+                append(encode_i(0x03, rd, choice(LOAD_OPS), source(), randrange(-512, 512) * 4))
+            elif kind == "store":
+                append(encode_s(0x23, choice(STORE_OPS), source(), source(), randrange(-512, 512) * 4))
+            elif kind == "lui":
+                rd = randrange(FIRST_REG, REG_COUNT)
+                append(encode_u(0x37, rd, randrange(0, 1 << 20) << 12))
+            else:
+                # Alvo dentro do programa e diferente da própria instrução
+                low = max(-index, -max_offset)
+                high = min(count - 1 - index, max_offset)
+                offset = randrange(low, high + 1) if high > low else 0
+                if offset == 0:
+                    offset = 1 if index + 1 < count else -1 if index else 0
+                if kind == "branch":
+                    append(encode_b(0x63, choice(BRANCH_OPS), source(), source(), offset * 4))
+                else:
+                    rd = 1 if random_value() < 0.5 else 0
+                    append(encode_j(0x6F, rd, offset * 4))
+            if rd:
+                head = (head + 1) & history_mask
+                history[head] = rd
+        return words
+
+def generate_program(count: int, profile: ProgramProfile = None, seed: int = 0) -> array:
+    """Atalho para ProgramGenerator(profile, seed).generate(count)"""
+    return ProgramGenerator(profile, seed).generate(count)
+
+def generate_branch_trace(count: int, branches: int = 1024, seed: int = 0) -> BranchTrace:
+    """Trace sintético de `count` desvios executados, com comportamento de laços
+
+    Os desvios estáticos são agrupados em regiões de 8; cada visita a uma
+    região a percorre algumas vezes, como um laço. Cada desvio tem um tipo:
+    fecha o laço (tomado até a última volta), quase sempre tomado, quase
+    nunca tomado ou aleatório.
+    """
+    rng = random.Random(seed)
+    random_value = rng.random
+    region_size = 8
+    pcs = [4 * index for index in range(branches)]
+    kinds = [rng.choice(("loop", "taken", "not_taken", "random")) for _ in range(branches)]
+    targets = [pc - 4 * rng.randrange(1, 16) if kind == "loop" else pc + 4 * rng.randrange(1, 16)
+               for pc, kind in zip(pcs, kinds)]
+    targets = [max(0, target) for target in targets]
+    trace_pcs, taken, trace_targets = array('I'), bytearray(), array('I')
+    while len(taken) < count:
+        first = rng.randrange(0, branches, region_size)
+        region = range(first, min(first + region_size, branches))
+        trips = 1 + int(-math.log(1.0 - random_value()) * 8)
+        for trip in range(trips):
+            last_trip = trip == trips - 1
+            for index in region:
+                kind = kinds[index]
+                if kind == "loop":
+                    outcome = not last_trip
+                elif kind == "taken":
+                    outcome = random_value() < 0.95
+                elif kind == "not_taken":
+                    outcome = random_value() < 0.05
+                else:
+                    outcome = random_value() < 0.5
+                trace_pcs.append(pcs[index])
+                taken.append(outcome)
+                trace_targets.append(targets[index])
+    trace = BranchTrace()
+    trace.pcs, trace.taken, trace.targets = trace_pcs[:count], taken[:count], trace_targets[:count]
+    return trace
+
+# Registradores do laço de generate_loop_program (fora dos destinos do gerador)
+LOOP_COUNTER = 4  # tp
+STACK_REG = 2     # sp
+# O bne que fecha o laço alcança no máximo 1024 instruções para trás
+MAX_LOOP_BODY = 1022
+
+def generate_loop_program(count: int, body: int = 256, seed: int = 0) -> array:
+    """Programa que executa cerca de `count` instruções e termina com ecall (a7 = 93)
+
+    O corpo do laço é um generate_program sem desvios, em que loads e stores
+    usam endereços relativos ao sp, para que o programa possa ser simulado.
+    """
+    if not 1 <= body <= MAX_LOOP_BODY:
+        raise ValueError(f"o corpo do laço precisa ter de 1 a {MAX_LOOP_BODY} instruções")
+    profile = ProgramProfile(load=0.0, store=0.0, branch_density=0.0, jump_density=0.0)
+    rng = random.Random(seed)
+    words = generate_program(body, profile, seed)
+    # Um em cada oito vira um acesso à pilha, metade loads e metade stores
+    for index in range(0, body, 8):
+        offset = -4 * rng.randrange(1, 64)
+        register = rng.randrange(FIRST_REG, REG_COUNT)
+        if rng.random() < 0.5:
+            words[index] = encode_i(0x03, register, 2, STACK_REG, offset)
+        else:
+            words[index] = encode_s(0x23, 2, STACK_REG, register, offset)
+    iterations = max(1, count // (body + 2))
+    # lui + addi com o arredondamento do imediato de 12 bits com sinal
+    upper = (iterations + 0x800) & 0xFFFFF000
+    program = array('I', (encode_u(0x37, LOOP_COUNTER, upper),
+                          encode_i(0x13, LOOP_COUNTER, 0, LOOP_COUNTER, iterations - upper)))
+    program.extend(words)
+    program.append(encode_i(0x13, LOOP_COUNTER, 0, LOOP_COUNTER, -1))
+    program.append(encode_b(0x63, 1, LOOP_COUNTER, 0, -4 * (body + 1)))  # bne tp, x0, laço
+    program.append(encode_i(0x13, 17, 0, 0, 93))
+    program.append(0x00000073)  # ecall
+    return program
@@ -0,0 +1,213 @@
+"""Cache em disco dos resultados de analyze_all_techniques
+
+Cada entrada é um arquivo cujo nome é o hash das palavras do programa e da
+configuração do analisador, de modo que um acerto não precisa decodificar
+nada. Os arquivos são escritos em um temporário e publicados com os.replace
+(atômico), então vários processos podem ler e gravar o mesmo diretório ao
+mesmo tempo. O tamanho total é limitado, removendo as entradas usadas há
+mais tempo (data de modificação, atualizada a cada acerto).
+"""
+import os
+import struct
+import sys
+import tempfile
+from array import array
+from hashlib import blake2b
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from instruction_table import np
+from parallel_analysis import analyze_all_techniques_parallel, PARALLEL_MIN_INSTRUCTIONS
+from pipeline_analyzer import (
+    PipelineAnalyzer, DEFAULT_LOOKAHEAD, CONTROL_SLOTS, TECHNIQUES, raw_windows
+)
+
+# Mude ao alterar o formato ou o resultado de alguma técnica
+CACHE_VERSION = 6
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "RISCV_ANALYSIS_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "riscv_pipeline")
+)
+DEFAULT_MAX_BYTES = 256 << 20
+CACHE_SUFFIX = ".rvc"
+
+# Cabeçalho (magic, versão, nº de técnicas) e entrada de cada técnica
+# (tamanho do nome, sobrecusto, referência, nº de palavras)
+HEADER = struct.Struct("<4sHH")
+ENTRY = struct.Struct("<BqiI")
+MAGIC = b"RVPC"
+
+# Referências: o programa vem logo em seguida, ou é o programa original;
+# valores >= 0 apontam para a técnica anterior com o mesmo programa
+REF_DATA = -1
+REF_ORIGINAL = -2
+
+def _to_bytes(words: Sequence[int]) -> bytes:
+    """Palavras como bytes uint32 little-endian"""
+    if np is not None and isinstance(words, np.ndarray):
+        return np.ascontiguousarray(words, dtype="<u4").tobytes()
+    data = words if isinstance(words, array) and words.typecode == 'I' else array('I', words)
+    if sys.byteorder == "big":
+        data = array('I', data)
+        data.byteswap()
+    return data.tobytes()
+
+class ResultCache:
+    """Diretório de resultados de análise, limitado a `max_bytes`"""
+
+    def __init__(self, directory: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def key(self, words: Sequence[int], lookahead: int = DEFAULT_LOOKAHEAD,
+            techniques: Sequence[str] = TECHNIQUES) -> str:
+        """Hash das palavras e da configuração (janelas de conflito e técnicas)"""
+        config = (
+            f"v{CACHE_VERSION};lookahead={lookahead};"
+            f"windows={raw_windows(False, lookahead)},{raw_windows(True, lookahead)};"
+            f"control={CONTROL_SLOTS};techniques={','.join(techniques)}"
+        )
+        digest = blake2b(config.encode(), digest_size=20)
+        digest.update(_to_bytes(words))
+        return digest.hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + CACHE_SUFFIX)
+
+    def get(self, key: str, words: Sequence[int]) -> Optional[Dict[str, Tuple[Sequence[int], int]]]:
+        """Resultados guardados para `key`, ou None
+
+        Os programas voltam como array('I'); técnicas que não alteram o
+        programa recebem o próprio `words`.
+        """
+        path = self._path(key)
+        try:
+            with open(path, "rb") as file:
+                data = file.read()
+            os.utime(path)  # Marca como usado recentemente
+        except OSError:
+            return None  # Ausente ou removido por outro processo
+        try:
+            return self._decode(data, words)
+        except (struct.error, ValueError, UnicodeDecodeError):
+            self._remove(path)  # Arquivo inválido: trata como ausente
+            return None
+
+    def _decode(self, data: bytes, words: Sequence[int]) -> Dict[str, Tuple[Sequence[int], int]]:
+        magic, version, count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != CACHE_VERSION:
+            raise ValueError("formato de cache desconhecido")
+        offset = HEADER.size
+        results = {}
+        programs = []
+        for _ in range(count):
+            name_size, overhead, ref, length = ENTRY.unpack_from(data, offset)
+            offset += ENTRY.size
+            name = data[offset:offset + name_size].decode()
+            offset += name_size
+            if ref == REF_DATA:
+                program = array('I')
+                program.frombytes(data[offset:offset + 4 * length])
+                if len(program) != length:
+                    raise ValueError("entrada de cache truncada")
+                if sys.byteorder == "big":
+                    program.byteswap()
+                offset += 4 * length
+            elif ref == REF_ORIGINAL:
+                program = words
+            elif 0 <= ref < len(programs):
+                program = programs[ref]
+            else:
+                raise ValueError("referência inválida na entrada de cache")
+            programs.append(program)
+            results[name] = (program, overhead)
+        return results
+
+    def put(self, key: str, results: Dict[str, Tuple[Sequence[int], int]],
+            words: Sequence[int]) -> None:
+        """Grava os resultados de forma atômica e aplica o limite de tamanho"""
+        parts = [HEADER.pack(MAGIC, CACHE_VERSION, len(results))]
+        seen = {}  # Conteúdo do programa -> primeira técnica que o produziu
+        for index, (name, (program, overhead)) in enumerate(results.items()):
+            encoded = name.encode()
+            data = None
+            if program is words:
+                ref = REF_ORIGINAL
+            else:
+                data = _to_bytes(program)
+                ref = seen.setdefault(data, index)
+                if ref == index:
+                    ref = REF_DATA
+            parts.append(ENTRY.pack(len(encoded), overhead, ref, len(program)))
+            parts.append(encoded)
+            if ref == REF_DATA:
+                parts.append(data)
+
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(b"".join(parts))
+            os.replace(temp_path, self._path(key))
+        except OSError:
+            self._remove(temp_path)
+            raise
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove as entradas menos usadas até o total caber em max_bytes"""
+        entries = []
+        total = 0
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if not entry.name.endswith(CACHE_SUFFIX):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            self._remove(path)
+            total -= size
+
+    def clear(self) -> None:
+        with os.scandir(self.directory) as scan:
+            for entry in scan:
+                if entry.name.endswith(CACHE_SUFFIX):
+                    self._remove(entry.path)
+
+    @staticmethod
+    def _remove(path: str) -> None:
+        try:
+            os.remove(path)
+        except OSError:
+            pass  # Outro processo já removeu
+
+def _analyze(words: Sequence[int], lookahead: int, base_address: int,
+             progress: Callable[[float], None], workers: int) -> Dict[str, Tuple[Sequence[int], int]]:
+    analyzer = PipelineAnalyzer(words, lookahead, base_address=base_address)
+    if workers is not None and workers > 1 and len(words) >= PARALLEL_MIN_INSTRUCTIONS:
+        return analyze_all_techniques_parallel(analyzer, workers, progress)
+    return analyzer.analyze_all_techniques(progress)
+
+def analyze_cached(words: Sequence[int], lookahead: int = DEFAULT_LOOKAHEAD,
+                   cache: ResultCache = None, base_address: int = 0,
+                   progress: Callable[[float], None] = None, workers: int = None
+                   ) -> Dict[str, Tuple[Sequence[int], int]]:
+    """analyze_all_techniques consultando o cache antes de decodificar o programa
+
+    Com `workers` > 1, programas grandes têm as técnicas avaliadas em
+    paralelo (ver analyze_all_techniques_parallel).
+    """
+    if cache is None:
+        return _analyze(words, lookahead, base_address, progress, workers)
+    key = cache.key(words, lookahead)
+    results = cache.get(key, words)
+    if results is None:
+        results = _analyze(words, lookahead, base_address, progress, workers)
+        cache.put(key, results, words)
+    return results
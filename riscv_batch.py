@@ -0,0 +1,164 @@
+"""Análise em lote, sem interface gráfica, de vários arquivos de instruções
+
+Cada arquivo (texto hexadecimal, .bin ou ELF) é decodificado e passa por
+PipelineAnalyzer.analyze_all_techniques; o trabalho é distribuído entre
+processos e cada arquivo gera uma linha de resumo em CSV ou JSON Lines.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List
+
+from binary_loader import is_binary_program, load_program
+import profiling
+from pipeline_analyzer import DEFAULT_LOOKAHEAD, TECHNIQUES
+from result_cache import ResultCache, analyze_cached, DEFAULT_CACHE_DIR, DEFAULT_MAX_BYTES
+from riscv_classifier import iter_hex_chunks
+
+# Extensões procuradas ao percorrer diretórios
+DEFAULT_EXTENSIONS = (".txt", ".hex", ".bin", ".elf")
+
+FIELDS = ("file", "instructions", "invalid_lines") + TECHNIQUES + ("error",)
+
+def collect_files(paths: Iterable[str], extensions=DEFAULT_EXTENSIONS) -> List[str]:
+    """Expande diretórios (recursivamente) na lista ordenada de arquivos a analisar"""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(
+                    os.path.join(root, name) for name in names
+                    if name.lower().endswith(extensions)
+                )
+        else:
+            files.append(path)
+    return sorted(files)
+
+def _add_overheads(row: Dict[str, object], words, base_address: int, lookahead: int,
+                   cache: ResultCache, technique_workers: int) -> None:
+    row["instructions"] = len(words)
+    results = analyze_cached(words, lookahead, cache, base_address, workers=technique_workers)
+    for technique, (_, overhead) in results.items():
+        row[technique] = overhead
+
+def analyze_file(path: str, lookahead: int = DEFAULT_LOOKAHEAD,
+                 cache: ResultCache = None, technique_workers: int = None) -> Dict[str, object]:
+    """Analisa um arquivo e retorna sua linha de resumo (nunca levanta exceção)"""
+    row = {"file": path, "instructions": 0, "invalid_lines": 0, "error": ""}
+    image = None
+    try:
+        if is_binary_program(path):
+            image = load_program(path)
+            # Sem referências locais às palavras, para que o mapeamento possa ser fechado
+            _add_overheads(row, image.words, image.base_address, lookahead, cache, technique_workers)
+        else:
+            invalid = []
+            words = array('I')
+            for chunk in iter_hex_chunks(path, on_error=lambda line_no, text: invalid.append(line_no)):
+                words.extend(chunk)
+            row["invalid_lines"] = len(invalid)
+            _add_overheads(row, words, 0, lookahead, cache, technique_workers)
+    except (OSError, ValueError) as e:
+        row["error"] = str(e)
+    except Exception as e:
+        # Qualquer outra falha também fica só na linha deste arquivo, sem derrubar o lote
+        row["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        if image is not None:
+            image.close()
+    return row
+
+# Cache do processo atual (cada processo do pool abre o seu)
+_cache = None
+
+def _analyze(args) -> Dict[str, object]:
+    global _cache
+    path, lookahead, cache_dir, cache_bytes, technique_workers = args
+    if cache_dir is not None and (_cache is None or _cache.directory != cache_dir):
+        try:
+            _cache = ResultCache(cache_dir, cache_bytes)
+        except OSError as e:
+            return {"file": path, "instructions": 0, "invalid_lines": 0, "error": str(e)}
+    return analyze_file(path, lookahead, _cache if cache_dir is not None else None,
+                        technique_workers)
+
+def analyze_files(files: List[str], workers: int = None,
+                  lookahead: int = DEFAULT_LOOKAHEAD, cache_dir: str = None,
+                  cache_bytes: int = DEFAULT_MAX_BYTES,
+                  technique_workers: int = None) -> Iterator[Dict[str, object]]:
+    """Analisa os arquivos em paralelo, produzindo as linhas na ordem de `files`
+
+    Com `cache_dir`, os resultados são lidos de/gravados em um ResultCache
+    compartilhado pelos processos. Com `technique_workers`, as técnicas de
+    cada arquivo grande também são distribuídas entre processos.
+    """
+    jobs = [(path, lookahead, cache_dir, cache_bytes, technique_workers) for path in files]
+    if workers == 1 or len(files) <= 1:
+        yield from map(_analyze, jobs)
+        return
+    workers = workers or os.cpu_count() or 1
+    # Vários arquivos por tarefa amortizam o custo de comunicação entre processos
+    chunksize = max(1, len(jobs) // (workers * 8))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_analyze, jobs, chunksize=chunksize)
+
+def write_rows(rows: Iterable[Dict[str, object]], output, output_format: str = "csv") -> None:
+    if output_format == "jsonl":
+        for row in rows:
+            output.write(json.dumps(row) + "\n")
+        return
+    writer = csv.DictWriter(output, fieldnames=FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("paths", nargs="+", help="arquivos ou diretórios de entrada")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="número de processos (padrão: número de CPUs)")
+    parser.add_argument("-f", "--format", choices=("csv", "jsonl"), default="csv",
+                        help="formato da saída")
+    parser.add_argument("-o", "--output", default="-", help="arquivo de saída (padrão: stdout)")
+    parser.add_argument("--lookahead", type=int, default=DEFAULT_LOOKAHEAD,
+                        help="janela de detecção de conflitos RAW sem forwarding")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR,
+                        help="diretório do cache de resultados (padrão: %(default)s)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES >> 20,
+                        help="tamanho máximo do cache em MiB")
+    parser.add_argument("--no-cache", action="store_true", help="não usar o cache de resultados")
+    parser.add_argument("--technique-workers", type=int, default=None,
+                        help="processos por arquivo para avaliar as técnicas em paralelo "
+                             "(útil com -j 1 em poucos arquivos grandes)")
+    parser.add_argument("--profile", metavar="ARQUIVO",
+                        help="grava os tempos por etapa (JSON, ou trace do Chrome se o nome "
+                             "terminar em .trace.json); implica -j 1")
+    parser.add_argument("--profile-memory", action="store_true",
+                        help="com --profile, mede também o pico de memória (mais lento)")
+    args = parser.parse_args(argv)
+
+    files = collect_files(args.paths)
+    cache_dir = None if args.no_cache else args.cache_dir
+    workers = args.workers
+    if args.profile:
+        # Só o processo atual é instrumentado
+        workers = 1
+        profiling.enable(memory=args.profile_memory)
+    rows = analyze_files(files, workers, args.lookahead, cache_dir, args.cache_size << 20,
+                         args.technique_workers)
+    try:
+        if args.output == "-":
+            write_rows(rows, sys.stdout, args.format)
+        else:
+            with open(args.output, "w", newline="") as output:
+                write_rows(rows, output, args.format)
+    finally:
+        if args.profile:
+            profiling.write_profile(args.profile, profiling.disable())
+
+if __name__ == "__main__":
+    main()
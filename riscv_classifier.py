@@ -1,5 +1,17 @@
+import re
+import sys
+import warnings
+from array import array
+from functools import lru_cache
+from typing import NamedTuple
+
 from translations import TRANSLATIONS
 
+try:
+    import numpy as np
+except ImportError:  # NumPy é opcional: só os caminhos em lote dependem dele
+    np = None
+
 def get_opcode(instruction):
     """Extrai o opcode (bits 0-6) da instrução"""
     return instruction & 0x7F
@@ -54,56 +66,257 @@ def get_imm_j(instruction):
     imm_19_12 = (instruction >> 12) & 0xFF
     return (imm_20 << 20) | (imm_19_12 << 12) | (imm_11 << 11) | (imm_10_1 << 1)
 
+# Largura (em bits) de cada formato de imediato, usada na extensão de sinal
+IMM_BITS = {"i": 12, "s": 12, "b": 13, "u": 20, "j": 21}
+
+def sign_extend(value, bits):
+    """Estende o sinal de um imediato de `bits` bits"""
+    sign = 1 << (bits - 1)
+    return (value ^ sign) - sign
+
+# Códigos de tipo usados pelo motor de decodificação e pela tabela colunar
+TYPE_NAMES = ("R", "I", "S", "B", "U", "J", "UNKNOWN")
+TYPE_CODES = {name: code for code, name in enumerate(TYPE_NAMES)}
+
+# Sentinelas usadas no lugar de None
+NO_REG = -1
+NO_IMM = -1
+
+# Flags de cada instrução decodificada
+FLAG_BRANCH = 0x01
+FLAG_JUMP = 0x02
+FLAG_WRITES_RD = 0x04
+FLAG_READS_RS1 = 0x08
+FLAG_READS_RS2 = 0x10
+FLAG_LOAD = 0x20
+FLAG_STORE = 0x40
+
+# Mapeamento dos opcodes para os tipos de instrução
+OPCODE_TYPES = {
+    0x33: "R",  # Operações aritméticas e lógicas
+    0x13: "I",  # Operações imediatas
+    0x03: "I",  # Load
+    0x23: "S",  # Store
+    0x63: "B",  # Branch
+    0x37: "U",  # LUI
+    0x17: "U",  # AUIPC
+    0x6F: "J",  # JAL
+    0x67: "I",  # JALR
+}
+
+# Flags de controle e de acesso à memória por opcode
+OPCODE_FLAGS = {
+    0x63: FLAG_BRANCH,
+    0x6F: FLAG_JUMP,
+    0x67: FLAG_JUMP,
+    0x03: FLAG_LOAD,
+    0x23: FLAG_STORE,
+}
+
+# Registradores lidos/escritos por tipo de instrução
+TYPE_REG_FLAGS = {
+    "R": FLAG_WRITES_RD | FLAG_READS_RS1 | FLAG_READS_RS2,
+    "I": FLAG_WRITES_RD | FLAG_READS_RS1,
+    "S": FLAG_READS_RS1 | FLAG_READS_RS2,
+    "B": FLAG_READS_RS1 | FLAG_READS_RS2,
+    "U": FLAG_WRITES_RD,
+    "J": FLAG_WRITES_RD,
+    "UNKNOWN": 0,
+}
+
+IMM_GETTERS = {
+    "I": get_imm_i,
+    "S": get_imm_s,
+    "B": get_imm_b,
+    "U": get_imm_u,
+    "J": get_imm_j,
+}
+
+# Mnemônicos RV32I: (mnemônico, opcode, funct3, funct7); None = qualquer valor
+MNEMONIC_SPECS = (
+    ("lui", 0x37, None, None),
+    ("auipc", 0x17, None, None),
+    ("jal", 0x6F, None, None),
+    ("jalr", 0x67, 0, None),
+    ("beq", 0x63, 0, None),
+    ("bne", 0x63, 1, None),
+    ("blt", 0x63, 4, None),
+    ("bge", 0x63, 5, None),
+    ("bltu", 0x63, 6, None),
+    ("bgeu", 0x63, 7, None),
+    ("lb", 0x03, 0, None),
+    ("lh", 0x03, 1, None),
+    ("lw", 0x03, 2, None),
+    ("lbu", 0x03, 4, None),
+    ("lhu", 0x03, 5, None),
+    ("sb", 0x23, 0, None),
+    ("sh", 0x23, 1, None),
+    ("sw", 0x23, 2, None),
+    ("addi", 0x13, 0, None),
+    ("slti", 0x13, 2, None),
+    ("sltiu", 0x13, 3, None),
+    ("xori", 0x13, 4, None),
+    ("ori", 0x13, 6, None),
+    ("andi", 0x13, 7, None),
+    ("slli", 0x13, 1, 0x00),
+    ("srli", 0x13, 5, 0x00),
+    ("srai", 0x13, 5, 0x20),
+    ("add", 0x33, 0, 0x00),
+    ("sub", 0x33, 0, 0x20),
+    ("sll", 0x33, 1, 0x00),
+    ("slt", 0x33, 2, 0x00),
+    ("sltu", 0x33, 3, 0x00),
+    ("xor", 0x33, 4, 0x00),
+    ("srl", 0x33, 5, 0x00),
+    ("sra", 0x33, 5, 0x20),
+    ("or", 0x33, 6, 0x00),
+    ("and", 0x33, 7, 0x00),
+    ("fence", 0x0F, 0, None),
+    ("ecall", 0x73, 0, None),
+)
+MNEMONICS = ("unknown",) + tuple(spec[0] for spec in MNEMONIC_SPECS)
+MNEMONIC_IDS = {name: code for code, name in enumerate(MNEMONICS)}
+
+# Cada entrada da tabela guarda o tipo (bits 0-2), as flags (bits 8-15)
+# e o id do mnemônico (bits 16-23)
+LUT_SIZE = 1 << 17
+
+def lut_index(instruction):
+    """Índice (funct7, funct3, opcode) da instrução na tabela de decodificação"""
+    return ((instruction >> 15) & 0x1FC00) | ((instruction >> 5) & 0x380) | (instruction & 0x7F)
+
+def _lut_entry(tipo, opcode, mnemonic):
+    flags = TYPE_REG_FLAGS[tipo] | OPCODE_FLAGS.get(opcode, 0)
+    return TYPE_CODES[tipo] | (flags << 8) | (MNEMONIC_IDS[mnemonic] << 16)
+
+def _build_decode_lut():
+    """Gera a tabela de 2^17 entradas indexada por (funct7, funct3, opcode)"""
+    lut = array('I', [_lut_entry("UNKNOWN", 0, "unknown")]) * LUT_SIZE
+    # Opcodes conhecidos: o tipo vale para qualquer funct3/funct7
+    for opcode, tipo in OPCODE_TYPES.items():
+        entry = _lut_entry(tipo, opcode, "unknown")
+        for funct in range(1 << 10):
+            lut[(funct << 7) | opcode] = entry
+    for mnemonic, opcode, funct3, funct7 in MNEMONIC_SPECS:
+        entry = _lut_entry(OPCODE_TYPES.get(opcode, "UNKNOWN"), opcode, mnemonic)
+        for f3 in range(8) if funct3 is None else (funct3,):
+            for f7 in range(128) if funct7 is None else (funct7,):
+                lut[(f7 << 10) | (f3 << 7) | opcode] = entry
+    return lut
+
+DECODE_LUT = _build_decode_lut()
+
+class DecodedWord(NamedTuple):
+    """Resultado do motor de decodificação para uma palavra"""
+    type_code: int
+    opcode: int
+    rd: int
+    funct3: int
+    rs1: int
+    rs2: int
+    funct7: int
+    imm: int
+    flags: int
+    mnemonic: int
+
+@lru_cache(maxsize=1 << 16)
+def decode_word(instruction):
+    """Motor único de decodificação, com cache por palavra
+
+    Alimenta tanto decode_instruction (visão de decodificação) quanto a
+    InstructionTable usada pelo PipelineAnalyzer. Tipo, mnemônico e flags vêm
+    de um único acesso a DECODE_LUT.
+    """
+    entry = DECODE_LUT[lut_index(instruction)]
+    type_code = entry & 0x7
+    get_imm = IMM_GETTERS.get(TYPE_NAMES[type_code])
+    return DecodedWord(
+        type_code,
+        instruction & 0x7F,
+        (instruction >> 7) & 0x1F,
+        (instruction >> 12) & 0x7,
+        (instruction >> 15) & 0x1F,
+        (instruction >> 20) & 0x1F,
+        (instruction >> 25) & 0x7F,
+        get_imm(instruction) if get_imm else NO_IMM,
+        (entry >> 8) & 0xFF,
+        entry >> 16
+    )
+
 def decode_instruction(instruction, lang='pt_BR'):
     """Decodifica todos os campos da instrução baseado no tipo"""
-    opcode = get_opcode(instruction)
-    
-    # Mapeamento dos opcodes para os tipos de instrução
-    opcode_types = {
-        0x33: "R",  # Operações aritméticas e lógicas
-        0x13: "I",  # Operações imediatas
-        0x03: "I",  # Load
-        0x23: "S",  # Store
-        0x63: "B",  # Branch
-        0x37: "U",  # LUI
-        0x17: "U",  # AUIPC
-        0x6F: "J",  # JAL
-        0x67: "I",  # JALR
-    }
-    
-    tipo = opcode_types.get(opcode, "Desconhecido")
+    decoded = decode_word(instruction)
+    tipo = TYPE_NAMES[decoded.type_code]
     result = {
-        "tipo": tipo,
-        "opcode": opcode,
-        "rd": get_rd(instruction),
-        "funct3": get_funct3(instruction),
-        "rs1": get_rs1(instruction)
+        "tipo": tipo if tipo != "UNKNOWN" else "Desconhecido",
+        "opcode": decoded.opcode,
+        "rd": decoded.rd,
+        "funct3": decoded.funct3,
+        "rs1": decoded.rs1
     }
     
     if tipo == "R":
         result.update({
-            "rs2": get_rs2(instruction),
-            "funct7": get_funct7(instruction)
+            "rs2": decoded.rs2,
+            "funct7": decoded.funct7
         })
-    elif tipo == "I":
-        result["imm"] = get_imm_i(instruction)
-    elif tipo == "S":
+    elif tipo in ("S", "B"):
         result.update({
-            "rs2": get_rs2(instruction),
-            "imm": get_imm_s(instruction)
+            "rs2": decoded.rs2,
+            "imm": decoded.imm
         })
-    elif tipo == "B":
-        result.update({
-            "rs2": get_rs2(instruction),
-            "imm": get_imm_b(instruction)
-        })
-    elif tipo == "U":
-        result["imm"] = get_imm_u(instruction)
-    elif tipo == "J":
-        result["imm"] = get_imm_j(instruction)
+    elif tipo in ("I", "U", "J"):
+        result["imm"] = decoded.imm
     
     return result
 
+def decode_batch(words):
+    """Decodifica um vetor de instruções (uint32) de uma só vez
+
+    Retorna um dicionário de colunas NumPy (struct-of-arrays) com os campos
+    opcode, rd, funct3, rs1, rs2 e funct7, os imediatos brutos imm_i ... imm_j
+    (idênticos bit a bit a get_imm_i ... get_imm_j), as versões com sinal
+    estendido simm_i ... simm_j e as colunas type_code, flags e mnemonic
+    obtidas de DECODE_LUT, como em decode_word.
+    """
+    if np is None:
+        raise ImportError("decode_batch requer NumPy (pip install numpy)")
+    w = np.asarray(words, dtype=np.uint32)
+
+    imm_i = w >> 20
+    imm_s = ((w >> 20) & 0xFE0) | ((w >> 7) & 0x1F)
+    imm_b = (((w >> 19) & 0x1000) | ((w << 4) & 0x800)
+             | ((w >> 20) & 0x7E0) | ((w >> 7) & 0x1E))
+    imm_u = w >> 12
+    imm_j = (((w >> 11) & 0x100000) | (w & 0xFF000)
+             | ((w >> 9) & 0x800) | ((w >> 20) & 0x7FE))
+
+    batch = {
+        "opcode": (w & 0x7F).astype(np.uint8),
+        "rd": ((w >> 7) & 0x1F).astype(np.uint8),
+        "funct3": ((w >> 12) & 0x7).astype(np.uint8),
+        "rs1": ((w >> 15) & 0x1F).astype(np.uint8),
+        "rs2": ((w >> 20) & 0x1F).astype(np.uint8),
+        "funct7": (w >> 25).astype(np.uint8),
+        "imm_i": imm_i,
+        "imm_s": imm_s,
+        "imm_b": imm_b,
+        "imm_u": imm_u,
+        "imm_j": imm_j,
+    }
+    for fmt, raw in (("i", imm_i), ("s", imm_s), ("b", imm_b), ("u", imm_u), ("j", imm_j)):
+        sign = np.uint32(1 << (IMM_BITS[fmt] - 1))
+        batch["simm_" + fmt] = (raw ^ sign).view(np.int32) - np.int32(sign)
+
+    # Tipo, flags e mnemônico: um acesso à tabela de decodificação por palavra
+    entries = np.frombuffer(DECODE_LUT, dtype=np.uint32)[
+        ((w >> 15) & 0x1FC00) | ((w >> 5) & 0x380) | (w & 0x7F)
+    ]
+    batch["type_code"] = (entries & 0x7).astype(np.uint8)
+    batch["flags"] = ((entries >> 8) & 0xFF).astype(np.uint8)
+    batch["mnemonic"] = (entries >> 16).astype(np.uint8)
+    return batch
+
 def format_instruction_info(info, lang='pt_BR'):
     """Formata a informação da instrução para exibição"""
     base = TRANSLATIONS[lang]['instruction_format'].format(info['tipo'].lower())
@@ -123,32 +336,116 @@ def format_instruction_info(info, lang='pt_BR'):
     
     return base
 
-def read_hex_file(filename):
+# Instruções por bloco em iter_hex_chunks
+HEX_CHUNK_SIZE = 1 << 16
+
+if np is not None:
+    # Valor de cada byte ASCII como dígito hexadecimal (0xFF = inválido)
+    _HEX_DIGITS = np.full(256, 0xFF, dtype=np.uint8)
+    _HEX_DIGITS[np.frombuffer(b"0123456789abcdef", dtype=np.uint8)] = np.arange(16)
+    _HEX_DIGITS[np.frombuffer(b"0123456789ABCDEF", dtype=np.uint8)] = np.arange(16)
+    _NIBBLE_SHIFTS = np.arange(28, -1, -4, dtype=np.uint32)
+
+# Dígitos de uma instrução depois do prefixo 0x opcional
+_HEX_WORD = re.compile(r"[0-9a-fA-F]{1,8}")
+
+def parse_hex_line(text):
+    """Converte uma linha de texto em instrução
+
+    Aceita prefixo 0x e comentários (# ou //). Retorna None para linhas
+    vazias ou só com comentário e levanta ValueError se a linha for inválida.
+    """
+    text = text.split('#', 1)[0].split('//', 1)[0].strip()
+    if not text:
+        return None
+    if text[:2] in ('0x', '0X'):
+        text = text[2:]
+    if not _HEX_WORD.fullmatch(text):
+        raise ValueError(f"instrução inválida: {text!r}")
+    return int(text, 16)
+
+def _parse_fixed_width(data):
+    """Converte de uma vez um bloco só com linhas 'XXXXXXXX\\n' (None se não for o caso)"""
+    if len(data) % 9:
+        return None
+    raw = np.frombuffer(data, dtype=np.uint8).reshape(-1, 9)
+    if not (raw[:, 8] == 0x0A).all():
+        return None
+    digits = _HEX_DIGITS[raw[:, :8]]
+    if (digits == 0xFF).any():
+        return None
+    return (digits.astype(np.uint32) << _NIBBLE_SHIFTS).sum(axis=1, dtype=np.uint32)
+
+def _report_bad_line(line_no, text):
+    warnings.warn(f"linha {line_no} inválida ignorada: {text!r}", stacklevel=2)
+
+def _print_bad_line(line_no, text):
+    print(f"Aviso: linha {line_no} inválida ignorada: {text!r}")
+
+def iter_hex_chunks(filename, chunk_size=HEX_CHUNK_SIZE, on_error=None):
+    """Lê um arquivo de instruções em hexadecimal em blocos de `chunk_size` palavras
+
+    A memória usada é limitada pelo tamanho do bloco. Com NumPy os blocos são
+    arrays uint32 e blocos de linhas no formato fixo 'XXXXXXXX' são
+    convertidos em lote; sem NumPy são array('I'). Linhas inválidas não
+    interrompem a leitura: são passadas a `on_error(numero_da_linha, texto)`
+    (por padrão, um aviso de `warnings`).
+    """
+    if on_error is None:
+        on_error = _report_bad_line
+    empty = np.empty(0, dtype=np.uint32) if np is not None else array('I')
+    buffered = empty
+    line_no = 0
+    with open(filename, 'rb') as file:
+        while True:
+            lines = file.readlines(chunk_size * 9)
+            if not lines:
+                break
+            words = _parse_fixed_width(b''.join(lines)) if np is not None else None
+            if words is None:
+                words = array('I')
+                for number, line in enumerate(lines, line_no + 1):
+                    text = line.decode('ascii', 'replace')
+                    try:
+                        instruction = parse_hex_line(text)
+                    except ValueError:
+                        on_error(number, text.strip())
+                        continue
+                    if instruction is not None:
+                        words.append(instruction)
+                if np is not None:
+                    words = np.frombuffer(words, dtype=np.uint32)
+            line_no += len(lines)
+
+            buffered = np.concatenate((buffered, words)) if np is not None else buffered + words
+            while len(buffered) >= chunk_size:
+                yield buffered[:chunk_size]
+                buffered = buffered[chunk_size:]
+    if len(buffered):
+        yield buffered
+
+def read_hex_file(filename, on_error=None):
     """Lê um arquivo de instruções em hexadecimal"""
     instructions = []
     try:
-        with open(filename, 'r') as file:
-            for line in file:
-                hex_str = line.strip()
-                if hex_str:
-                    instruction = int(hex_str, 16)
-                    instructions.append(instruction)
+        for chunk in iter_hex_chunks(filename, on_error=on_error):
+            instructions.extend(chunk.tolist())
     except FileNotFoundError:
         print(f"Erro: Arquivo {filename} não encontrado")
         return None
     return instructions
 
 def main():
+    # Importado aqui porque o formatador depende deste módulo
+    from instruction_formatter import InstructionFormatter
+
     filename = input("Digite o nome do arquivo de instruções: ")
-    instructions = read_hex_file(filename)
+    instructions = read_hex_file(filename, on_error=_print_bad_line)
     
     if instructions:
         print("\nDecodificação das instruções:")
         print("=" * 70)
-        for i, instruction in enumerate(instructions):
-            info = decode_instruction(instruction)
-            formatted_info = format_instruction_info(info)
-            print(f"Instrução {i+1}: 0x{instruction:08X} -> {formatted_info}")
+        InstructionFormatter(numbered=True).write_words([instructions], sys.stdout)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
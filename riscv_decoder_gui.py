@@ -1,10 +1,62 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, scrolledtext, messagebox
-from riscv_classifier import decode_instruction, read_hex_file
-from pipeline_analyzer import PipelineAnalyzer
+from riscv_classifier import parse_hex_line, read_hex_file
+from binary_loader import is_binary_program, load_program
+from instruction_table import decode_buffer, TYPE_NAMES, NO_REG, NO_IMM
+from instruction_formatter import InstructionFormatter, STYLE_ASM
+from pipeline_analyzer import PipelineAnalyzer, TechniqueResults, TECHNIQUES
+from incremental_analysis import IncrementalAnalyzer, DirtyLines, analyze_global_techniques
+from background_worker import BackgroundTask
+from virtual_table import VirtualTableView
+from result_cache import ResultCache
 from translations import TRANSLATIONS
+from profiling import profiled, stage
+import profiling
 import os
 
+# Intervalo (ms) entre consultas à tarefa em segundo plano
+POLL_MS = 50
+# Linhas lidas entre cada atualização de progresso da decodificação
+DECODE_CHUNK = 1 << 14
+# Pausa na digitação (ms) antes da análise ao vivo
+LIVE_DELAY_MS = 300
+# Instruções de um arquivo carregado copiadas para o campo de entrada; acima
+# disso o campo mostra só o começo e fica somente leitura
+PREVIEW_LINES = 5000
+# Largura (pixels) das colunas endereço, hex, tipo, rd, rs1, rs2, imm e assembly
+DECODE_COLUMN_WIDTHS = (110, 110, 100, 60, 60, 60, 90, 220)
+# Índice e texto das entradas do menu de desempenho (o índice 2 é o separador)
+PROFILING_MENU_KEYS = ((0, 'profiling_enable'), (1, 'profiling_memory'), (3, 'profiling_show'),
+                       (4, 'profiling_export_json'), (5, 'profiling_export_trace'),
+                       (6, 'profiling_reset'))
+
+def instruction_rows(table, base_address=0):
+    """Função que monta, sob demanda, a linha `index` da visão decodificada"""
+    hex_code, type_code = table.hex_code, table.type_code
+    rd, rs1, rs2, imm = table.rd, table.rs1, table.rs2, table.imm
+    asm = InstructionFormatter(style=STYLE_ASM)
+
+    def register(reg):
+        return "" if reg == NO_REG else f"x{reg}"
+
+    def row(index):
+        value = imm[index]
+        return (
+            f"0x{base_address + 4 * index:08X}",
+            f"0x{hex_code[index]:08X}",
+            TYPE_NAMES[type_code[index]],
+            register(rd[index]),
+            register(rs1[index]),
+            register(rs2[index]),
+            "" if value == NO_IMM else value,
+            asm.line(table, index)
+        )
+    return row
+
+def analyze_global_techniques_task(task, analyzer):
+    analyzer.cancel_check = task.checkpoint
+    return analyze_global_techniques(analyzer, progress=task.report)
+
 class RiscVDecoderGUI:
     def __init__(self, root):
         self.root = root
@@ -19,6 +71,7 @@ class RiscVDecoderGUI:
         
         # Menu de idiomas
         self.create_language_menu()
+        self.create_profiling_menu()
         
         # Estilo
         style = ttk.Style()
@@ -53,6 +106,12 @@ class RiscVDecoderGUI:
             font=("Courier", 10)
         )
         self.input_text.pack(fill="both", expand=True, padx=5, pady=5)
+
+        # Análise ao vivo: linhas alteradas desde a última atualização
+        self.incremental = None
+        self.dirty_lines = DirtyLines()
+        self.live_job = None
+        self.watch_input_edits()
         
         # Notebook para diferentes visualizações
         self.notebook = ttk.Notebook(main_frame)
@@ -62,17 +121,28 @@ class RiscVDecoderGUI:
         decode_frame = ttk.Frame(self.notebook)
         self.notebook.add(decode_frame, text=self.get_text('decode_tab'))
         
-        self.decode_text = scrolledtext.ScrolledText(
+        # Só as linhas visíveis existem no widget, mesmo para milhões de instruções
+        self.decode_view = VirtualTableView(
             decode_frame,
-            height=10,
-            width=50,
-            font=("Courier", 10)
+            self.get_text('decode_columns'),
+            DECODE_COLUMN_WIDTHS
         )
-        self.decode_text.pack(fill="both", expand=True, padx=5, pady=5)
+        self.decode_view.pack(fill="both", expand=True, padx=5, pady=5)
+        self.decode_view.on_select = self.show_instruction_details
+
+        # Detalhes da instrução selecionada
+        self.details_var = tk.StringVar()
+        ttk.Label(
+            decode_frame,
+            textvariable=self.details_var,
+            font=("Courier", 10)
+        ).pack(fill="x", padx=5, pady=2)
         
         # Aba de análise de pipeline
         pipeline_frame = ttk.Frame(self.notebook)
         self.notebook.add(pipeline_frame, text=self.get_text('pipeline_tab'))
+        # As técnicas pendentes são calculadas quando o grid fica visível
+        self.notebook.bind("<<NotebookTabChanged>>", lambda event: self.fill_results_grid())
         
         # Frame para grid de resultados
         grid_frame = ttk.Frame(pipeline_frame)
@@ -81,22 +151,60 @@ class RiscVDecoderGUI:
         # Criar grid de resultados
         self.create_results_grid(grid_frame)
         
-        # Barra de status
+        # Barra de status, com progresso e cancelamento da tarefa em andamento
+        status_frame = ttk.Frame(self.root)
+        status_frame.pack(side="bottom", fill="x")
+
+        self.cancel_button = ttk.Button(
+            status_frame,
+            text=self.get_text('cancel'),
+            command=self.cancel_task,
+            state="disabled"
+        )
+        self.cancel_button.pack(side="right", padx=5, pady=2)
+
+        self.progress = ttk.Progressbar(status_frame, length=200, maximum=1.0)
+        self.progress.pack(side="right", padx=5, pady=2)
+
         self.status_var = tk.StringVar()
         self.status_var.set(self.get_text('ready'))
         self.status_bar = ttk.Label(
-            self.root,
+            status_frame,
             textvariable=self.status_var,
             relief="sunken",
             padding=5
         )
-        self.status_bar.pack(side="bottom", fill="x")
-        
+        self.status_bar.pack(side="left", fill="x", expand=True)
+
         # Armazenar resultados da análise
         self.analysis_results = {}
+        self.analysis_count = 0
+        self.analysis_key = None
+
+        # Cache em disco dos resultados (opcional: sem ele a análise é sempre refeita)
+        try:
+            self.result_cache = ResultCache()
+        except OSError:
+            self.result_cache = None
+
+        # Tarefa em segundo plano em andamento (decodificação ou análise) e a
+        # última iniciada, que pode ainda estar terminando depois de cancelada
+        self.task = None
+        self.last_task = None
+        # Preenchimento do grid pedido com outra tarefa em andamento, que
+        # começa quando ela termina em vez de cancelá-la
+        self.fill_queued = False
+
+        # Tabela mostrada na visão decodificada e endereço da primeira instrução
+        self.decoded_table = None
+        self.base_address = 0
+        # Programa carregado de um arquivo grande demais para o campo de
+        # entrada, que mostra só as primeiras PREVIEW_LINES instruções; None
+        # quando o programa é o próprio texto do campo
+        self.loaded_words = None
 
     def create_language_menu(self):
-        menubar = tk.Menu(self.root)
+        menubar = self.menubar = tk.Menu(self.root)
         self.root.config(menu=menubar)
         
         language_menu = tk.Menu(menubar, tearoff=0)
@@ -107,6 +215,105 @@ class RiscVDecoderGUI:
         language_menu.add_command(label="English (US)", 
                                 command=lambda: self.change_language('en_US'))
 
+    def create_profiling_menu(self):
+        self.profiling_var = tk.BooleanVar(value=profiling.is_enabled())
+        self.profiling_memory_var = tk.BooleanVar(value=False)
+        self.profile_window = None
+        self.profile_tree = None
+
+        self.profiling_menu = tk.Menu(self.menubar, tearoff=0)
+        self.menubar.add_cascade(label=self.get_text('profiling_menu'), menu=self.profiling_menu)
+        self.profiling_menu_index = self.menubar.index("end")
+        self.profiling_menu.add_checkbutton(label=self.get_text('profiling_enable'),
+                                            variable=self.profiling_var,
+                                            command=self.toggle_profiling)
+        self.profiling_menu.add_checkbutton(label=self.get_text('profiling_memory'),
+                                            variable=self.profiling_memory_var,
+                                            command=self.toggle_profiling)
+        self.profiling_menu.add_separator()
+        self.profiling_menu.add_command(label=self.get_text('profiling_show'),
+                                        command=self.show_profile_panel)
+        self.profiling_menu.add_command(label=self.get_text('profiling_export_json'),
+                                        command=lambda: self.export_profile(False))
+        self.profiling_menu.add_command(label=self.get_text('profiling_export_trace'),
+                                        command=lambda: self.export_profile(True))
+        self.profiling_menu.add_command(label=self.get_text('profiling_reset'),
+                                        command=self.reset_profile)
+
+    def toggle_profiling(self):
+        """Liga ou desliga a instrumentação; mudar a opção de memória recomeça as medições"""
+        profiling.disable()
+        if self.profiling_var.get():
+            profiling.enable(memory=self.profiling_memory_var.get())
+        self.refresh_profile_panel()
+
+    def show_profile_panel(self):
+        if not profiling.is_enabled():
+            self.status_var.set(self.get_text('profiling_disabled'))
+            return
+        if self.profile_window is None or not self.profile_window.winfo_exists():
+            self.profile_window = tk.Toplevel(self.root)
+            self.profile_window.title(self.get_text('profiling_title'))
+            self.profile_window.geometry("720x320")
+            columns = tuple(f"c{i}" for i in range(5))
+            self.profile_tree = ttk.Treeview(self.profile_window, columns=columns, show="headings")
+            for column, heading in zip(columns, self.get_text('profiling_columns')):
+                self.profile_tree.heading(column, text=heading)
+                self.profile_tree.column(column, width=100, anchor="e")
+            self.profile_tree.column(columns[0], width=260, anchor="w")
+            self.profile_tree.pack(fill="both", expand=True, padx=10, pady=10)
+        self.refresh_profile_panel()
+        self.profile_window.lift()
+
+    def refresh_profile_panel(self):
+        if self.profile_window is None or not self.profile_window.winfo_exists():
+            return
+        tree = self.profile_tree
+        tree.delete(*tree.get_children())
+        profiler = profiling.get_profiler()
+        if profiler is None:
+            return
+        for name, stats in profiler.summary():
+            tree.insert("", "end", values=(
+                name,
+                stats.calls,
+                f"{stats.seconds * 1000:,.1f}",
+                f"{stats.instructions_per_second:,.0f}" if stats.items else "",
+                f"{stats.peak_bytes / 1024:,.0f}" if profiler.memory else ""
+            ))
+
+    def profile_finished(self):
+        """Mostra os tempos por etapa ao fim de cada análise, se a instrumentação estiver ligada"""
+        if profiling.is_enabled():
+            self.show_profile_panel()
+
+    def export_profile(self, chrome_trace):
+        profiler = profiling.get_profiler()
+        if profiler is None:
+            self.status_var.set(self.get_text('profiling_disabled'))
+            return
+        filename = filedialog.asksaveasfilename(
+            defaultextension=".trace.json" if chrome_trace else ".json",
+            filetypes=[("JSON", "*.json")],
+            title=self.get_text('profiling_export_trace' if chrome_trace else 'profiling_export_json')
+        )
+        if not filename:
+            return
+        try:
+            if chrome_trace:
+                profiler.write_chrome_trace(filename)
+            else:
+                profiler.write_json(filename)
+            self.status_var.set(self.get_text('file_saved').format(filename))
+        except OSError as e:
+            messagebox.showerror(self.get_text('error'), self.get_text('save_error').format(str(e)))
+
+    def reset_profile(self):
+        profiler = profiling.get_profiler()
+        if profiler is not None:
+            profiler.reset()
+        self.refresh_profile_panel()
+
     def change_language(self, lang):
         self.current_language = lang
         self.update_ui_texts()
@@ -131,6 +338,8 @@ class RiscVDecoderGUI:
                         child.config(text=self.get_text('view'))
                     elif current_text in [self.get_text('save', 'pt_BR'), self.get_text('save', 'en_US')]:
                         child.config(text=self.get_text('save'))
+                    elif current_text in [self.get_text('cancel', 'pt_BR'), self.get_text('cancel', 'en_US')]:
+                        child.config(text=self.get_text('cancel'))
                 update_buttons_recursive(child)
 
         update_buttons_recursive(self.root)
@@ -138,6 +347,17 @@ class RiscVDecoderGUI:
         # Atualizar textos das abas
         self.notebook.tab(0, text=self.get_text('decode_tab'))
         self.notebook.tab(1, text=self.get_text('pipeline_tab'))
+        self.decode_view.set_headings(self.get_text('decode_columns'))
+        self.live_check.config(text=self.get_text('live_analysis'))
+        self.menubar.entryconfig(self.profiling_menu_index, label=self.get_text('profiling_menu'))
+        for index, key in PROFILING_MENU_KEYS:
+            self.profiling_menu.entryconfig(index, label=self.get_text(key))
+        if self.profile_window is not None and self.profile_window.winfo_exists():
+            self.profile_window.title(self.get_text('profiling_title'))
+            for column, heading in zip(self.profile_tree["columns"], self.get_text('profiling_columns')):
+                self.profile_tree.heading(column, text=heading)
+        if self.decode_view.selected is not None:
+            self.show_instruction_details(self.decode_view.selected)
         
         # Atualizar cabeçalhos da grid
         grid_frame = self.notebook.winfo_children()[1].winfo_children()[0]
@@ -201,6 +421,15 @@ class RiscVDecoderGUI:
             command=self.clear
         ).pack(side="left", padx=5)
 
+        self.live_var = tk.BooleanVar(value=False)
+        self.live_check = ttk.Checkbutton(
+            btn_frame,
+            text=self.get_text('live_analysis'),
+            variable=self.live_var,
+            command=self.toggle_live_analysis
+        )
+        self.live_check.pack(side="left", padx=5)
+
     def create_results_grid(self, parent):
         # Cabeçalhos
         headers = self.get_text('grid_headers')
@@ -266,85 +495,392 @@ class RiscVDecoderGUI:
             command=lambda: self.save_technique(row-1)
         ).pack(side="left", padx=2)
 
+    @profiled("gui.load_file")
     def load_file(self):
         filename = filedialog.askopenfilename(
             title=self.get_text('load_file'),
-            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+            filetypes=[("Text files", "*.txt"), ("Binary/ELF", "*.bin *.elf"), ("All files", "*.*")]
         )
         if filename:
-            instructions = read_hex_file(filename)
+            bad_lines = []
+            base_address = 0
+            if is_binary_program(filename):
+                try:
+                    image = load_program(filename)
+                    instructions = image.words.tolist()
+                    base_address = image.base_address
+                    image.close()
+                except (OSError, ValueError):
+                    instructions = None
+            else:
+                instructions = read_hex_file(
+                    filename, on_error=lambda line_no, text: bad_lines.append(line_no)
+                )
             if instructions:
+                preview = len(instructions) > PREVIEW_LINES
+                self.loaded_words = instructions if preview else None
+                self.input_text.config(state="normal")
                 self.input_text.delete(1.0, tk.END)
-                for instruction in instructions:
-                    self.input_text.insert(tk.END, f"{instruction:08X}\n")
-                self.status_var.set(self.get_text('file_loaded').format(filename))
+                self.input_text.insert(tk.END, "".join(
+                    f"{instruction:08X}\n" for instruction in instructions[:PREVIEW_LINES]
+                ))
+                if preview:
+                    self.input_text.config(state="disabled")
+                if self.incremental is not None:
+                    self.mark_all_dirty()
+                    self.schedule_live_analysis()
+                self.base_address = base_address
+                if preview:
+                    self.status_var.set(self.get_text('file_loaded_preview').format(
+                        filename, len(instructions), PREVIEW_LINES
+                    ))
+                elif bad_lines:
+                    self.status_var.set(self.get_text('file_loaded_invalid').format(
+                        filename, len(bad_lines), bad_lines[0]
+                    ))
+                else:
+                    self.status_var.set(self.get_text('file_loaded').format(filename))
             else:
                 self.status_var.set(self.get_text('file_error'))
 
+    def start_task(self, status_key, target, on_done, on_error, *args, on_progress=None):
+        """Executa target(task, *args) em segundo plano, cancelando a tarefa anterior
+
+        O Tk só é acessado nesta thread: o progresso e o resultado chegam por
+        poll_task, agendado com root.after.
+        """
+        self.cancel_task(silent=True)
+        # A nova tarefa espera a anterior (cancelada) sair do analisador compartilhado
+        self.task = self.last_task = BackgroundTask(target, *args, after=self.last_task)
+        self.progress['value'] = 0
+        self.cancel_button.config(state="normal")
+        self.status_var.set(self.get_text(status_key))
+        self.root.after(POLL_MS, self.poll_task, self.task, on_done, on_error, on_progress)
+
+    def poll_task(self, task, on_done, on_error, on_progress=None):
+        if task is not self.task:
+            return  # Tarefa substituída por uma mais recente: resultado descartado
+        for kind, payload in task.poll():
+            if kind == "progress":
+                self.progress['value'] = payload
+                if on_progress is not None:
+                    on_progress(payload)
+            elif kind == "done":
+                self.finish_task()
+                on_done(payload)
+            elif kind == "error":
+                self.finish_task()
+                on_error(payload)
+            elif kind == "cancelled":
+                self.finish_task()
+                self.status_var.set(self.get_text('task_cancelled'))
+        if task.finished and self.fill_queued and self.task is None:
+            self.fill_results_grid()
+        if not task.finished:
+            self.root.after(POLL_MS, self.poll_task, task, on_done, on_error, on_progress)
+
+    def finish_task(self):
+        self.task = None
+        self.progress['value'] = 0
+        self.cancel_button.config(state="disabled")
+
+    def cancel_task(self, silent=False):
+        if self.task is None:
+            return
+        self.task.cancel()
+        self.finish_task()
+        if not silent:
+            self.fill_queued = False  # Cancelado pelo usuário: nada começa sozinho depois
+            self.status_var.set(self.get_text('task_cancelled'))
+
+    @profiled("gui.decode")
     def decode(self):
-        try:
-            self.decode_text.delete(1.0, tk.END)
-            input_text = self.input_text.get(1.0, tk.END).strip()
-            
-            if not input_text:
-                self.status_var.set(self.get_text('empty_input'))
-                return
-            
-            instructions = []
-            for line in input_text.split('\n'):
-                if line.strip():
-                    instruction = int(line.strip(), 16)
-                    instructions.append(instruction)
-            
-            self.decode_text.insert(tk.END, f"{self.get_text('decode_tab')}:\n")
-            self.decode_text.insert(tk.END, "=" * 70 + "\n")
-            
-            for i, instruction in enumerate(instructions):
-                info = decode_instruction(instruction)
-                formatted_info = self.format_instruction_info(info)
-                self.decode_text.insert(
-                    tk.END,
-                    f"Instrução {i+1}: 0x{instruction:08X} ->\n{formatted_info}\n\n"
-                )
-            
+        words = self.loaded_words
+        input_text = self.input_text.get(1.0, tk.END).strip() if words is None else ""
+
+        if words is None and not input_text:
+            self.status_var.set(self.get_text('empty_input'))
+            return
+
+        def on_done(table):
+            self.decoded_table = table
+            with stage("gui.render_decode_view", len(table)):
+                self.decode_view.set_rows(len(table), instruction_rows(table, self.base_address))
+            self.details_var.set("")
             self.status_var.set(self.get_text('decode_success'))
-            
-        except ValueError as e:
-            self.status_var.set(self.get_text('invalid_hex'))
-        except Exception as e:
-            self.status_var.set(self.get_text('decode_error').format(str(e)))
+            self.profile_finished()
 
+        def on_error(e):
+            if isinstance(e, ValueError):
+                self.status_var.set(self.get_text('invalid_hex'))
+            else:
+                self.status_var.set(self.get_text('decode_error').format(str(e)))
+
+        self.start_task('decoding', self.decode_worker, on_done, on_error, input_text, words)
+
+    def decode_worker(self, task, input_text, words=None):
+        """Lê e decodifica as instruções fora da thread do Tk
+
+        Só as colunas são produzidas aqui; o texto de cada linha é montado
+        pela visão quando ela fica visível.
+        """
+        instructions = words if words is not None else self.parse_input(input_text, progress=task.report)
+        # Decodifica o buffer uma única vez; a análise reaproveita a tabela
+        return decode_buffer(instructions)
+
+    @profiled("gui.show_instruction_details")
+    def show_instruction_details(self, index):
+        lang = self.current_language
+        self.details_var.set(
+            InstructionFormatter(lang, numbered=True).line(self.decoded_table, index)
+        )
+
+    @profiled("gui.analyze_pipeline")
     def analyze_pipeline(self):
-        try:
-            input_text = self.input_text.get(1.0, tk.END).strip()
-            
-            if not input_text:
-                self.status_var.set(self.get_text('analysis_empty'))
-                return
-            
-            instructions = []
-            for line in input_text.split('\n'):
-                if line.strip():
-                    instruction = int(line.strip(), 16)
-                    instructions.append(instruction)
-            
-            analyzer = PipelineAnalyzer(instructions)
-            self.analysis_results = analyzer.analyze_all_techniques()
-            
-            # Atualiza o grid com os resultados
-            for i, (technique, (modified_instructions, overhead)) in enumerate(self.analysis_results.items()):
-                # Atualiza labels de conflitos e sobrecusto
-                conflicts_label = self.get_grid_label(i, 1)
-                overhead_label = self.get_grid_label(i, 2)
-                
-                conflicts_label.config(text=str(len(modified_instructions) - len(instructions)))
-                overhead_label.config(text=f"{overhead} {self.get_text('instructions')}")
-            
+        words = self.loaded_words
+        input_text = self.input_text.get(1.0, tk.END).strip() if words is None else ""
+
+        if words is None and not input_text:
+            self.status_var.set(self.get_text('analysis_empty'))
+            return
+
+        def on_done(outcome):
+            self.analysis_count, self.analysis_results, self.analysis_key = outcome
+            self.update_results_grid()
+            if all(self.result_ready(technique) for technique in TECHNIQUES):
+                self.status_var.set(self.get_text('analysis_success'))
+                self.profile_finished()
+            else:
+                self.status_var.set(self.get_text('analysis_pending'))
+                self.fill_results_grid()
+
+        def on_error(e):
+            self.status_var.set(self.get_text('analysis_error').format(str(e)))
+
+        self.start_task('analyzing', self.analyze_worker, on_done, on_error, input_text, words)
+
+    @profiled("gui.analyze_worker")
+    def analyze_worker(self, task, input_text, words=None):
+        """Decodifica o programa fora da thread do Tk
+
+        Retorna os resultados do cache, se houver, ou um TechniqueResults:
+        cada técnica só é calculada quando sua célula do grid é exibida ou
+        quando é vista/salva.
+        """
+        instructions = words if words is not None else self.parse_input(input_text, progress=task.report)
+        key = None
+        if self.result_cache is not None:
+            key = self.result_cache.key(instructions)
+            cached = self.result_cache.get(key, instructions)
+            if cached is not None:
+                return len(instructions), cached, None
+        analyzer = PipelineAnalyzer(instructions, cancel_check=task.checkpoint)
+        return len(instructions), analyzer.results(), key
+
+    def result_ready(self, technique):
+        results = self.analysis_results
+        if isinstance(results, TechniqueResults):
+            return results.is_computed(technique)
+        return technique in results
+
+    def fill_results_grid(self):
+        """Calcula em segundo plano as técnicas do grid que ainda faltam
+
+        Só acontece com a aba de pipeline visível, que é quando as células
+        aparecem; cada célula é preenchida assim que sua técnica termina.
+        Com outra tarefa em andamento (ver ou salvar uma técnica, por
+        exemplo), o preenchimento fica para quando ela terminar.
+        """
+        if self.task is not None:
+            self.fill_queued = True
+            return
+        self.fill_queued = False
+        results = self.analysis_results
+        if not isinstance(results, TechniqueResults) or self.notebook.index("current") != 1:
+            return
+        pending = [technique for technique in TECHNIQUES if not results.is_computed(technique)]
+        if not pending:
+            return
+
+        def on_done(_):
+            self.update_results_grid()
             self.status_var.set(self.get_text('analysis_success'))
-            
-        except Exception as e:
+            self.profile_finished()
+
+        def on_error(e):
             self.status_var.set(self.get_text('analysis_error').format(str(e)))
 
+        self.start_task('analyzing', self.fill_worker, on_done, on_error,
+                        results, pending, self.analysis_key,
+                        on_progress=lambda fraction: self.update_results_grid())
+
+    @profiled("gui.fill_worker")
+    def fill_worker(self, task, results, pending, key):
+        # O analisador passa de tarefa em tarefa: o cancelamento é sempre o da atual
+        results.analyzer.cancel_check = task.checkpoint
+        for count, technique in enumerate(pending, 1):
+            results[technique]
+            task.report(count / len(pending))
+        # Com todas as técnicas calculadas, o resultado pode ir para o cache
+        if key is not None and self.result_cache is not None:
+            self.result_cache.put(key, dict(results), results.analyzer.original_instructions)
+
+    def technique_worker(self, task, results, technique):
+        results.analyzer.cancel_check = task.checkpoint
+        return results[technique]
+
+    def with_technique(self, index, action):
+        """Executa action(técnica, programa, sobrecusto), calculando a técnica antes se preciso"""
+        technique = TECHNIQUES[index]
+        if self.result_ready(technique):
+            action(technique, *self.analysis_results[technique])
+            return
+        results = self.analysis_results
+        if not isinstance(results, TechniqueResults):
+            return  # Ainda em cálculo na análise ao vivo
+
+        def on_done(value):
+            self.update_results_grid()
+            self.status_var.set(self.get_text('analysis_success'))
+            action(technique, *value)
+            self.fill_results_grid()
+
+        def on_error(e):
+            self.status_var.set(self.get_text('analysis_error').format(str(e)))
+
+        self.start_task('analyzing', self.technique_worker, on_done, on_error, results, technique)
+
+    @profiled("gui.update_results_grid")
+    def update_results_grid(self):
+        """Mostra os resultados no grid; técnicas ainda não calculadas aparecem como '...'"""
+        for i, technique in enumerate(TECHNIQUES):
+            # Atualiza labels de conflitos e sobrecusto
+            conflicts_label = self.get_grid_label(i, 1)
+            overhead_label = self.get_grid_label(i, 2)
+            if self.result_ready(technique):
+                modified_instructions, overhead = self.analysis_results[technique]
+                conflicts_label.config(text=str(len(modified_instructions) - self.analysis_count))
+                overhead_label.config(text=f"{overhead} {self.get_text('instructions')}")
+            else:
+                conflicts_label.config(text="...")
+                overhead_label.config(text="...")
+
+    def watch_input_edits(self):
+        """Intercepta insert/delete do campo de entrada para registrar as linhas alteradas
+
+        O comando Tcl do widget é renomeado e substituído por um proxy, de modo
+        que toda edição (digitação, colar, load_file, clear) passa por aqui.
+        """
+        widget = self.input_text
+        original = widget._w + "_original"
+        widget.tk.call("rename", widget._w, original)
+
+        def line_of(index):
+            line = int(widget.tk.call(original, "index", index).split(".")[0])
+            last = int(widget.tk.call(original, "index", "end-1c").split(".")[0])
+            return min(line, last) - 1
+
+        def no_selection(args):
+            return any(str(arg).startswith("sel.") for arg in args) and \
+                not widget.tk.call(original, "tag", "ranges", "sel")
+
+        def proxy(command, *args):
+            edit = self.incremental is not None and command in ("insert", "delete", "replace")
+            bounds = None
+            if edit:
+                try:
+                    if command == "insert":
+                        first = last = line_of(args[0])
+                        chars = "".join(args[1::2])
+                    else:
+                        first = line_of(args[0])
+                        last = line_of(args[1] if len(args) > 1 else f"{args[0]}+1c")
+                        chars = args[2] if command == "replace" else ""
+                    bounds = first, last - first + 1, 1 + chars.count("\n")
+                except tk.TclError:
+                    pass  # Índice inválido: o próprio comando falha abaixo
+            try:
+                result = widget.tk.call((original, command) + args)
+            except tk.TclError:
+                # As ligações do Tk apagam "sel.first sel.last" mesmo sem seleção
+                if command == "delete" and no_selection(args):
+                    return ""
+                if edit:
+                    # O texto pode ter mudado em parte: reanalisa tudo
+                    self.mark_all_dirty()
+                    self.schedule_live_analysis()
+                raise
+            if edit:
+                if bounds is None:
+                    self.mark_all_dirty()
+                else:
+                    self.dirty_lines.replace(*bounds)
+                self.schedule_live_analysis()
+            return result
+
+        widget.tk.createcommand(widget._w, proxy)
+
+    def mark_all_dirty(self):
+        """Recomeça a análise ao vivo do zero: o programa atual inteiro é a próxima alteração"""
+        self.incremental = IncrementalAnalyzer()
+        if self.loaded_words is not None:
+            line_count = len(self.loaded_words)
+        else:
+            line_count = int(self.input_text.index("end-1c").split(".")[0])
+        self.dirty_lines = DirtyLines()
+        self.dirty_lines.replace(0, 0, line_count)
+
+    def schedule_live_analysis(self):
+        if self.live_job is not None:
+            self.root.after_cancel(self.live_job)
+        self.live_job = self.root.after(LIVE_DELAY_MS, self.live_analyze)
+
+    def toggle_live_analysis(self):
+        if self.live_var.get():
+            self.mark_all_dirty()
+            self.live_analyze()
+        else:
+            self.incremental = None
+            if self.live_job is not None:
+                self.root.after_cancel(self.live_job)
+                self.live_job = None
+
+    @profiled("gui.live_analyze")
+    def live_analyze(self):
+        """Reanalisa só as linhas alteradas e atualiza o grid
+
+        As técnicas locais são corrigidas aqui mesmo; as que dependem do
+        programa inteiro são recalculadas em segundo plano sobre uma cópia.
+        """
+        self.live_job = None
+        if self.incremental is None or self.dirty_lines.range is None:
+            return
+        start, old_end, new_end = self.dirty_lines.take()
+        if self.loaded_words is not None:
+            # O campo só tem o começo do programa: as linhas vêm do arquivo
+            lines = [f"{word:08X}" for word in self.loaded_words[start:new_end]]
+        else:
+            lines = self.input_text.get(f"{start + 1}.0", f"{new_end}.end").split("\n")
+        self.analysis_results = dict(self.incremental.update(start, old_end, lines))
+        self.analysis_count = len(self.incremental.words)
+        self.update_results_grid()
+
+        def on_done(results):
+            self.analysis_results.update(results)
+            self.update_results_grid()
+            invalid = self.incremental.invalid_lines if self.incremental is not None else 0
+            if invalid:
+                self.status_var.set(self.get_text('live_invalid_lines').format(invalid))
+            else:
+                self.status_var.set(self.get_text('analysis_success'))
+            self.profile_finished()
+
+        def on_error(e):
+            self.status_var.set(self.get_text('analysis_error').format(str(e)))
+
+        self.start_task('analyzing', analyze_global_techniques_task, on_done, on_error,
+                        self.incremental.snapshot())
+
     def get_grid_label(self, row, col):
         # Encontra o widget na posição específica do grid
         for widget in self.notebook.winfo_children()[1].winfo_children()[0].winfo_children():
@@ -359,33 +895,27 @@ class RiscVDecoderGUI:
                 self.get_text('run_analysis_first')
             )
             return
-        
-        technique = list(self.analysis_results.keys())[index]
-        instructions, overhead = self.analysis_results[technique]
-        
+        self.with_technique(index, self.show_technique)
+
+    @profiled("gui.show_technique")
+    def show_technique(self, technique, instructions, overhead):
         # Cria uma nova janela para visualização
         view_window = tk.Toplevel(self.root)
         view_window.title(f"{self.get_text('view')} - {technique}")
-        view_window.geometry("600x400")
+        view_window.geometry("720x400")
         
-        # Área de texto para mostrar as instruções
-        text_area = scrolledtext.ScrolledText(
+        ttk.Label(
             view_window,
-            width=70,
-            height=20,
+            text=f"{self.get_text('technique')}: {technique}\n"
+                 f"{self.get_text('overhead')}: {overhead} {self.get_text('instructions')}",
             font=("Courier", 10)
-        )
-        text_area.pack(fill="both", expand=True, padx=10, pady=10)
-        
-        # Insere as instruções
-        text_area.insert(tk.END, f"{self.get_text('technique')}: {technique}\n")
-        text_area.insert(tk.END, f"{self.get_text('overhead')}: {overhead} {self.get_text('instructions')}\n")
-        text_area.insert(tk.END, "=" * 50 + "\n\n")
-        
-        for i, inst in enumerate(instructions):
-            text_area.insert(tk.END, f"{i+1}: 0x{inst:08X}\n")
-        
-        text_area.config(state="disabled")
+        ).pack(fill="x", padx=10, pady=(10, 0))
+
+        # Visão virtualizada: as linhas são montadas só quando ficam visíveis
+        table = decode_buffer(instructions)
+        view = VirtualTableView(view_window, self.get_text('decode_columns'), DECODE_COLUMN_WIDTHS)
+        view.pack(fill="both", expand=True, padx=10, pady=10)
+        view.set_rows(len(table), instruction_rows(table, self.base_address))
 
     def save_technique(self, index):
         if not self.analysis_results:
@@ -394,10 +924,10 @@ class RiscVDecoderGUI:
                 self.get_text('run_analysis_first')
             )
             return
-        
-        technique = list(self.analysis_results.keys())[index]
-        instructions, overhead = self.analysis_results[technique]
-        
+        self.with_technique(index, self.write_technique)
+
+    @profiled("gui.write_technique")
+    def write_technique(self, technique, instructions, overhead):
         filename = filedialog.asksaveasfilename(
             defaultextension=".txt",
             filetypes=[(self.get_text('text_files'), "*.txt")],
@@ -419,28 +949,30 @@ class RiscVDecoderGUI:
                     self.get_text('save_error').format(str(e))
                 )
 
-    def format_instruction_info(self, info):
-        """Formata a informação da instrução para exibição"""
-        base = self.get_text('instruction_format').format(info['tipo'].lower())
-        
-        if 'rd' in info:
-            base += f", {self.get_text('register_dest').format(info['rd'])}"
-        if 'funct3' in info:
-            base += f", {self.get_text('function3').format(info['funct3'])}"
-        if 'rs1' in info:
-            base += f", {self.get_text('register_src1').format(info['rs1'])}"
-        if 'rs2' in info:
-            base += f", {self.get_text('register_src2').format(info['rs2'])}"
-        if 'imm' in info:
-            base += f", {self.get_text('immediate').format(info['imm'])}"
-        if 'funct7' in info:
-            base += f", {self.get_text('function7').format(info['funct7'])}"
-        
-        return base
+    @profiled("gui.parse_input")
+    def parse_input(self, input_text, progress=None):
+        """Converte o texto de entrada (uma instrução hexadecimal por linha) em inteiros
+
+        `progress`, se dado, recebe a fração de linhas já lidas.
+        """
+        instructions = []
+        lines = input_text.split('\n')
+        for line_no, line in enumerate(lines):
+            if progress is not None and line_no % DECODE_CHUNK == 0:
+                progress(line_no / len(lines))
+            instruction = parse_hex_line(line)
+            if instruction is not None:
+                instructions.append(instruction)
+        return instructions
 
     def clear(self):
+        self.loaded_words = None
+        self.input_text.config(state="normal")
         self.input_text.delete(1.0, tk.END)
-        self.decode_text.delete(1.0, tk.END)
+        self.decode_view.clear()
+        self.details_var.set("")
+        self.decoded_table = None
+        self.base_address = 0
         self.analysis_results = {}
         
         # Limpa os labels do grid
@@ -0,0 +1,676 @@
+"""Simulador funcional RV32I para gerar traces dinâmicos
+
+Cada palavra do programa é pré-decodificada uma única vez (decode_word) em
+uma função especializada, com registradores, imediato e índice seguinte já
+resolvidos; executar uma instrução é chamar handlers[índice](), que devolve
+o índice da próxima. A memória é esparsa (páginas de 4 KiB como array('I'),
+criadas na primeira escrita) e o programa é carregado nela em
+`base_address`, de modo que loads podem ler o próprio código (stores nele
+não alteram as instruções já pré-decodificadas).
+
+A execução termina no ecall de saída (a7 = 93, como em test/test.s, ou 10
+do RARS), ao atingir o limite de instruções, ao sair do programa ou em uma
+instrução desconhecida. Os índices das instruções executadas são entregues
+em blocos aos consumidores (por exemplo, DynamicAnalysis) e os desvios e
+saltos vão para um BranchTrace. Os endereços efetivos dos loads e stores
+acompanham cada bloco (para os modelos de cache de cache_model).
+"""
+from array import array
+from dataclasses import dataclass, field
+from itertools import repeat
+from typing import Callable, Dict, List, Optional, Sequence
+
+from branch_prediction import BranchPredictor, BranchTrace, PredictionStats, BimodalPredictor
+from instruction_table import InstructionTable
+from pipeline_analyzer import HazardScoreboard, DEFAULT_LOOKAHEAD, CONTROL_SLOTS
+from pipeline_timing import Forwarding, PipelineTimer, TimingConfig, TimingResult
+from riscv_classifier import decode_word, MNEMONICS, TYPE_NAMES, IMM_BITS, sign_extend
+
+MASK = 0xFFFFFFFF
+SIGN = 0x80000000
+
+DEFAULT_MAX_INSTRUCTIONS = 10_000_000
+# Instruções por bloco entregue aos consumidores
+CHUNK_SIZE = 1 << 16
+
+PAGE_BITS = 12
+PAGE_WORDS = 1 << (PAGE_BITS - 2)
+OFFSET_MASK = (1 << PAGE_BITS) - 1
+
+# Valores iniciais de sp e gp (os mesmos do RARS)
+STACK_POINTER = 0x7FFFEFFC
+GLOBAL_POINTER = 0x10008000
+
+# Chamadas de sistema de saída (a7): 93 (Linux/RARS exit com código) e 10 (RARS exit)
+EXIT_SYSCALLS = (93, 10)
+
+# Motivos de parada
+STOP_EXIT = "exit"
+STOP_LIMIT = "limit"
+STOP_OUT_OF_PROGRAM = "out_of_program"
+STOP_INVALID = "invalid_instruction"
+
+# x0 nunca é escrito: destinos x0 escrevem neste registrador extra, que ninguém lê
+SCRATCH_REG = 32
+
+class SparseMemory:
+    """Memória de 32 bits endereçada por byte, little-endian, em páginas sob demanda"""
+
+    def __init__(self):
+        self.pages: Dict[int, array] = {}
+
+    def page(self, address: int) -> array:
+        """Página que contém `address`, criada zerada se ainda não existe"""
+        number = address >> PAGE_BITS
+        page = self.pages.get(number)
+        if page is None:
+            page = self.pages[number] = array('I', bytes(4 * PAGE_WORDS))
+        return page
+
+    def load(self, address: int, size: int) -> int:
+        """Lê `size` bytes sem sinal (caminho lento, para acessos desalinhados)"""
+        value = 0
+        for offset in range(size):
+            byte_address = (address + offset) & MASK
+            page = self.pages.get(byte_address >> PAGE_BITS)
+            if page is not None:
+                word = page[(byte_address & OFFSET_MASK) >> 2]
+                value |= ((word >> ((byte_address & 3) << 3)) & 0xFF) << (8 * offset)
+        return value
+
+    def store(self, address: int, size: int, value: int) -> None:
+        for offset in range(size):
+            byte_address = (address + offset) & MASK
+            page = self.page(byte_address)
+            index = (byte_address & OFFSET_MASK) >> 2
+            shift = (byte_address & 3) << 3
+            page[index] = (page[index] & ~(0xFF << shift) & MASK) \
+                | (((value >> (8 * offset)) & 0xFF) << shift)
+
+    def load_words(self, address: int, words: Sequence[int]) -> None:
+        """Copia palavras a partir de `address` (alinhado)"""
+        for offset, word in enumerate(words):
+            word_address = address + 4 * offset
+            self.page(word_address)[(word_address & OFFSET_MASK) >> 2] = word
+
+class SimulationError(Exception):
+    """Programa que não pode ser simulado (endereço base desalinhado, ...)"""
+
+class _Stop(Exception):
+    """Levantada por um handler para encerrar a simulação"""
+
+    def __init__(self, reason: str, executed: bool):
+        super().__init__(reason)
+        self.reason = reason
+        self.executed = executed  # A instrução que parou conta como executada
+
+@dataclass
+class SimulationResult:
+    executed: int
+    stop_reason: str
+    exit_code: Optional[int]
+    pc: int
+    registers: List[int]
+    branch_trace: BranchTrace
+    # Índices (na tabela estática) das instruções executadas e endereços
+    # efetivos dos loads e stores, se guardados
+    trace: Optional[array] = None
+    addresses: Optional[array] = None
+
+# Construtores de handlers por mnemônico: (simulador, rd, rs1, rs2, imediato
+# com sinal, índice, pc) -> função sem argumentos que devolve o próximo índice
+_BUILDERS: Dict[str, Callable] = {}
+
+def _handler(*mnemonics: str):
+    def register(builder):
+        for mnemonic in mnemonics:
+            _BUILDERS[mnemonic] = builder
+        return builder
+    return register
+
+@_handler("lui")
+def _lui(sim, rd, rs1, rs2, imm, index, pc):
+    regs, value, following = sim.regs, (imm << 12) & MASK, index + 1
+    def lui():
+        regs[rd] = value
+        return following
+    return lui
+
+@_handler("auipc")
+def _auipc(sim, rd, rs1, rs2, imm, index, pc):
+    regs, value, following = sim.regs, (pc + (imm << 12)) & MASK, index + 1
+    def auipc():
+        regs[rd] = value
+        return following
+    return auipc
+
+@_handler("jal")
+def _jal(sim, rd, rs1, rs2, imm, index, pc):
+    regs, link = sim.regs, (pc + 4) & MASK
+    target_pc = (pc + imm) & MASK
+    target = sim.index_of(target_pc)
+    record = sim.record_branch
+    def jal():
+        regs[rd] = link
+        record(pc, 1, target_pc)
+        return target
+    return jal
+
+@_handler("jalr")
+def _jalr(sim, rd, rs1, rs2, imm, index, pc):
+    regs, link = sim.regs, (pc + 4) & MASK
+    index_of, record = sim.index_of, sim.record_branch
+    def jalr():
+        target_pc = (regs[rs1] + imm) & 0xFFFFFFFE
+        regs[rd] = link
+        record(pc, 1, target_pc)
+        return index_of(target_pc)
+    return jalr
+
+def _branch(compare):
+    def build(sim, rd, rs1, rs2, imm, index, pc):
+        regs, following = sim.regs, index + 1
+        target_pc = (pc + imm) & MASK
+        target = sim.index_of(target_pc)
+        record = sim.record_branch
+        return compare(regs, rs1, rs2, target, following, pc, target_pc, record)
+    return build
+
+def _beq(regs, rs1, rs2, target, following, pc, target_pc, record):
+    def beq():
+        if regs[rs1] == regs[rs2]:
+            record(pc, 1, target_pc)
+            return target
+        record(pc, 0, target_pc)
+        return following
+    return beq
+
+def _bne(regs, rs1, rs2, target, following, pc, target_pc, record):
+    def bne():
+        if regs[rs1] != regs[rs2]:
+            record(pc, 1, target_pc)
+            return target
+        record(pc, 0, target_pc)
+        return following
+    return bne
+
+# Comparação com sinal de valores sem sinal: basta inverter o bit de sinal
+def _blt(regs, rs1, rs2, target, following, pc, target_pc, record):
+    def blt():
+        if regs[rs1] ^ SIGN < regs[rs2] ^ SIGN:
+            record(pc, 1, target_pc)
+            return target
+        record(pc, 0, target_pc)
+        return following
+    return blt
+
+def _bge(regs, rs1, rs2, target, following, pc, target_pc, record):
+    def bge():
+        if regs[rs1] ^ SIGN >= regs[rs2] ^ SIGN:
+            record(pc, 1, target_pc)
+            return target
+        record(pc, 0, target_pc)
+        return following
+    return bge
+
+def _bltu(regs, rs1, rs2, target, following, pc, target_pc, record):
+    def bltu():
+        if regs[rs1] < regs[rs2]:
+            record(pc, 1, target_pc)
+            return target
+        record(pc, 0, target_pc)
+        return following
+    return bltu
+
+def _bgeu(regs, rs1, rs2, target, following, pc, target_pc, record):
+    def bgeu():
+        if regs[rs1] >= regs[rs2]:
+            record(pc, 1, target_pc)
+            return target
+        record(pc, 0, target_pc)
+        return following
+    return bgeu
+
+for _name, _compare in (("beq", _beq), ("bne", _bne), ("blt", _blt), ("bge", _bge),
+                        ("bltu", _bltu), ("bgeu", _bgeu)):
+    _BUILDERS[_name] = _branch(_compare)
+
+@_handler("lw")
+def _lw(sim, rd, rs1, rs2, imm, index, pc):
+    regs, pages, load, following = sim.regs, sim.memory.pages, sim.memory.load, index + 1
+    touch = sim.data_addresses.append
+    def lw():
+        address = (regs[rs1] + imm) & MASK
+        touch(address)
+        page = pages.get(address >> PAGE_BITS)
+        if page is not None and not address & 3:
+            regs[rd] = page[(address & OFFSET_MASK) >> 2]
+        else:
+            regs[rd] = load(address, 4)
+        return following
+    return lw
+
+def _load_small(size: int, signed: bool):
+    mask = (1 << (8 * size)) - 1
+    sign = 1 << (8 * size - 1)
+    def build(sim, rd, rs1, rs2, imm, index, pc):
+        regs, pages, load, following = sim.regs, sim.memory.pages, sim.memory.load, index + 1
+        touch = sim.data_addresses.append
+        def load_small():
+            address = (regs[rs1] + imm) & MASK
+            touch(address)
+            page = pages.get(address >> PAGE_BITS)
+            if page is not None and not address & (size - 1):
+                value = (page[(address & OFFSET_MASK) >> 2] >> ((address & 3) << 3)) & mask
+            else:
+                value = load(address, size)
+            if signed and value & sign:
+                value = (value - (sign << 1)) & MASK
+            regs[rd] = value
+            return following
+        return load_small
+    return build
+
+for _name, _size, _signed in (("lb", 1, True), ("lh", 2, True), ("lbu", 1, False),
+                              ("lhu", 2, False)):
+    _BUILDERS[_name] = _load_small(_size, _signed)
+
+@_handler("sw")
+def _sw(sim, rd, rs1, rs2, imm, index, pc):
+    regs, pages, memory, following = sim.regs, sim.memory.pages, sim.memory, index + 1
+    touch = sim.data_addresses.append
+    def sw():
+        address = (regs[rs1] + imm) & MASK
+        touch(address)
+        if address & 3:
+            memory.store(address, 4, regs[rs2])
+        else:
+            page = pages.get(address >> PAGE_BITS) or memory.page(address)
+            page[(address & OFFSET_MASK) >> 2] = regs[rs2]
+        return following
+    return sw
+
+def _store_small(size: int):
+    mask = (1 << (8 * size)) - 1
+    def build(sim, rd, rs1, rs2, imm, index, pc):
+        regs, pages, memory, following = sim.regs, sim.memory.pages, sim.memory, index + 1
+        touch = sim.data_addresses.append
+        def store_small():
+            address = (regs[rs1] + imm) & MASK
+            touch(address)
+            if address & (size - 1):
+                memory.store(address, size, regs[rs2])
+            else:
+                page = pages.get(address >> PAGE_BITS) or memory.page(address)
+                word = (address & OFFSET_MASK) >> 2
+                shift = (address & 3) << 3
+                page[word] = (page[word] & ~(mask << shift) & MASK) | ((regs[rs2] & mask) << shift)
+            return following
+        return store_small
+    return build
+
+_BUILDERS["sb"] = _store_small(1)
+_BUILDERS["sh"] = _store_small(2)
+
+@_handler("addi")
+def _addi(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following = sim.regs, index + 1
+    def addi():
+        regs[rd] = (regs[rs1] + imm) & MASK
+        return following
+    return addi
+
+@_handler("slti")
+def _slti(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following, bound = sim.regs, index + 1, (imm & MASK) ^ SIGN
+    def slti():
+        regs[rd] = 1 if regs[rs1] ^ SIGN < bound else 0
+        return following
+    return slti
+
+@_handler("sltiu")
+def _sltiu(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following, bound = sim.regs, index + 1, imm & MASK
+    def sltiu():
+        regs[rd] = 1 if regs[rs1] < bound else 0
+        return following
+    return sltiu
+
+@_handler("xori")
+def _xori(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following, value = sim.regs, index + 1, imm & MASK
+    def xori():
+        regs[rd] = regs[rs1] ^ value
+        return following
+    return xori
+
+@_handler("ori")
+def _ori(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following, value = sim.regs, index + 1, imm & MASK
+    def ori():
+        regs[rd] = regs[rs1] | value
+        return following
+    return ori
+
+@_handler("andi")
+def _andi(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following, value = sim.regs, index + 1, imm & MASK
+    def andi():
+        regs[rd] = regs[rs1] & value
+        return following
+    return andi
+
+# Nos deslocamentos imediatos, o shamt é o campo rs2
+@_handler("slli")
+def _slli(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following, shamt = sim.regs, index + 1, rs2
+    def slli():
+        regs[rd] = (regs[rs1] << shamt) & MASK
+        return following
+    return slli
+
+@_handler("srli")
+def _srli(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following, shamt = sim.regs, index + 1, rs2
+    def srli():
+        regs[rd] = regs[rs1] >> shamt
+        return following
+    return srli
+
+@_handler("srai")
+def _srai(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following, shamt = sim.regs, index + 1, rs2
+    def srai():
+        regs[rd] = (((regs[rs1] ^ SIGN) - SIGN) >> shamt) & MASK
+        return following
+    return srai
+
+@_handler("add")
+def _add(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following = sim.regs, index + 1
+    def add():
+        regs[rd] = (regs[rs1] + regs[rs2]) & MASK
+        return following
+    return add
+
+@_handler("sub")
+def _sub(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following = sim.regs, index + 1
+    def sub():
+        regs[rd] = (regs[rs1] - regs[rs2]) & MASK
+        return following
+    return sub
+
+@_handler("sll")
+def _sll(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following = sim.regs, index + 1
+    def sll():
+        regs[rd] = (regs[rs1] << (regs[rs2] & 31)) & MASK
+        return following
+    return sll
+
+@_handler("slt")
+def _slt(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following = sim.regs, index + 1
+    def slt():
+        regs[rd] = 1 if regs[rs1] ^ SIGN < regs[rs2] ^ SIGN else 0
+        return following
+    return slt
+
+@_handler("sltu")
+def _sltu(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following = sim.regs, index + 1
+    def sltu():
+        regs[rd] = 1 if regs[rs1] < regs[rs2] else 0
+        return following
+    return sltu
+
+@_handler("xor")
+def _xor(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following = sim.regs, index + 1
+    def xor():
+        regs[rd] = regs[rs1] ^ regs[rs2]
+        return following
+    return xor
+
+@_handler("srl")
+def _srl(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following = sim.regs, index + 1
+    def srl():
+        regs[rd] = regs[rs1] >> (regs[rs2] & 31)
+        return following
+    return srl
+
+@_handler("sra")
+def _sra(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following = sim.regs, index + 1
+    def sra():
+        regs[rd] = (((regs[rs1] ^ SIGN) - SIGN) >> (regs[rs2] & 31)) & MASK
+        return following
+    return sra
+
+@_handler("or")
+def _or(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following = sim.regs, index + 1
+    def or_():
+        regs[rd] = regs[rs1] | regs[rs2]
+        return following
+    return or_
+
+@_handler("and")
+def _and(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following = sim.regs, index + 1
+    def and_():
+        regs[rd] = regs[rs1] & regs[rs2]
+        return following
+    return and_
+
+@_handler("fence")
+def _fence(sim, rd, rs1, rs2, imm, index, pc):
+    following = index + 1
+    def fence():
+        return following
+    return fence
+
+@_handler("ecall")
+def _ecall(sim, rd, rs1, rs2, imm, index, pc):
+    regs, following = sim.regs, index + 1
+    def ecall():
+        if regs[17] in EXIT_SYSCALLS:
+            raise _Stop(STOP_EXIT, True)
+        return following  # Outras chamadas de sistema são ignoradas
+    return ecall
+
+def _stopper(reason: str):
+    def stop():
+        raise _Stop(reason, False)
+    return stop
+
+class Simulator:
+    """Executa um programa RV32I a partir da primeira instrução
+
+    `regs` tem 33 posições: x0-x31 e o registrador de descarte usado como
+    destino das escritas em x0. Os valores são guardados sem sinal.
+    """
+
+    def __init__(self, words: Sequence[int], base_address: int = 0,
+                 memory: SparseMemory = None):
+        if base_address & 3:
+            raise SimulationError(f"endereço base desalinhado: 0x{base_address:08X}")
+        self.base_address = base_address
+        self.size = len(words)
+        self.memory = memory if memory is not None else SparseMemory()
+        self.memory.load_words(base_address, words)
+        self.regs = [0] * (SCRATCH_REG + 1)
+        self.regs[2] = STACK_POINTER
+        self.regs[3] = GLOBAL_POINTER
+        self.branch_trace = BranchTrace()
+        trace = self.branch_trace
+        pcs, taken, targets = trace.pcs.append, trace.taken.append, trace.targets.append
+
+        def record_branch(pc: int, outcome: int, target: int) -> None:
+            pcs(pc)
+            taken(outcome)
+            targets(target)
+        self.record_branch = record_branch
+        # Endereços efetivos dos loads e stores ainda não entregues aos consumidores
+        self.data_addresses = array('I')
+        self.index = 0
+        self.executed = 0
+        self.handlers = self._predecode(words)
+
+    def index_of(self, address: int) -> int:
+        """Índice da instrução em `address`; fora do programa, o índice do handler de parada"""
+        offset = address - self.base_address
+        if offset & 3 or not 0 <= offset < 4 * self.size:
+            return self.size + 1
+        return offset >> 2
+
+    def _predecode(self, words: Sequence[int]) -> List[Callable[[], int]]:
+        handlers = []
+        invalid = _stopper(STOP_INVALID)
+        for index, word in enumerate(words):
+            decoded = decode_word(word)
+            builder = _BUILDERS.get(MNEMONICS[decoded.mnemonic])
+            if builder is None:
+                handlers.append(invalid)
+                continue
+            type_name = TYPE_NAMES[decoded.type_code]
+            imm = decoded.imm
+            if type_name in ("I", "S", "B", "J"):
+                imm = sign_extend(imm, IMM_BITS[type_name.lower()])
+            rd = decoded.rd or SCRATCH_REG
+            pc = self.base_address + 4 * index
+            handlers.append(builder(self, rd, decoded.rs1, decoded.rs2, imm, index, pc))
+        # Índice n: saiu do fim do programa; n + 1: desvio para fora dele
+        handlers.append(_stopper(STOP_OUT_OF_PROGRAM))
+        handlers.append(_stopper(STOP_OUT_OF_PROGRAM))
+        return handlers
+
+    def run(self, max_instructions: int = DEFAULT_MAX_INSTRUCTIONS,
+            consumers: Sequence["TraceConsumer"] = (), keep_trace: bool = False,
+            chunk_size: int = CHUNK_SIZE) -> SimulationResult:
+        """Executa até parar; cada bloco de índices executados vai para `consumers`"""
+        handlers = self.handlers
+        index = self.index
+        remaining = max_instructions
+        kept = (array('I'), array('I')) if keep_trace else None
+        reason = STOP_LIMIT
+        chunk = array('I')
+        append = chunk.append
+        try:
+            while remaining > 0:
+                for _ in repeat(None, min(chunk_size, remaining)):
+                    append(index)
+                    index = handlers[index]()
+                remaining -= len(chunk)
+                self._deliver(chunk, consumers, kept)
+                del chunk[:]
+        except _Stop as stop:
+            reason = stop.reason
+            if not stop.executed:
+                chunk.pop()
+            elif reason == STOP_EXIT:
+                index += 1
+            self._deliver(chunk, consumers, kept)
+        self.index = index
+        regs = self.regs
+        exit_code = None
+        if reason == STOP_EXIT:
+            exit_code = regs[10] - ((regs[10] & SIGN) << 1)
+        if index > self.size:
+            pc = self.branch_trace.targets[-1]  # Desvio ou salto para fora do programa
+        else:
+            pc = self.base_address + 4 * index
+        result = SimulationResult(
+            executed=self.executed, stop_reason=reason, exit_code=exit_code,
+            pc=pc, registers=regs[:32],
+            branch_trace=self.branch_trace, trace=kept and kept[0],
+            addresses=kept and kept[1]
+        )
+        for consumer in consumers:
+            consumer.finish(result)
+        return result
+
+    def _deliver(self, chunk: array, consumers: Sequence["TraceConsumer"],
+                 kept: Optional[tuple]) -> None:
+        self.executed += len(chunk)
+        addresses = self.data_addresses
+        if kept is not None:
+            kept[0].extend(chunk)
+            kept[1].extend(addresses)
+        for consumer in consumers:
+            consumer.feed(chunk, addresses)
+        del addresses[:]
+
+class TraceConsumer:
+    """Recebe os índices executados e os endereços efetivos dos loads e stores
+    desses índices, em blocos (os arrays são reutilizados depois de feed)"""
+
+    def feed(self, indices: array, addresses: array) -> None:
+        pass
+
+    def finish(self, result: SimulationResult) -> None:
+        pass
+
+@dataclass
+class DynamicReport:
+    """Conflitos e ciclos da sequência executada, e não da listagem"""
+    instructions: int = 0
+    data_conflicts: int = 0
+    data_conflicts_fw: int = 0
+    timing: TimingResult = None
+    timing_fw: TimingResult = None
+    prediction: PredictionStats = None
+    caches: List = field(default_factory=list)  # CacheStats, se houve modelo de cache
+
+    @property
+    def cycles(self) -> int:
+        """Ciclos sem forwarding, com as bolhas de controle do preditor (e das caches)"""
+        return self.timing.cycles if self.timing is not None else 0
+
+class DynamicAnalysis(TraceConsumer):
+    """Detecção de conflitos e tempo de pipeline sobre o trace, bloco a bloco
+
+    As bolhas de controle vêm das predições erradas de `predictor` sobre os
+    desvios executados, em vez de um custo fixo por desvio.
+    """
+
+    def __init__(self, table: InstructionTable, lookahead: int = DEFAULT_LOOKAHEAD,
+                 predictor: BranchPredictor = None):
+        self.table = table
+        self.predictor = predictor if predictor is not None else BimodalPredictor()
+        self.scoreboards = (HazardScoreboard(False, lookahead), HazardScoreboard(True, lookahead))
+        self.timers = tuple(
+            PipelineTimer(TimingConfig(forwarding=forwarding, lookahead=lookahead,
+                                       control_bubbles=0))
+            for forwarding in (Forwarding.NONE, Forwarding.EX_EX)
+        )
+        self.conflicts = [0, 0]
+        self.report = None
+
+    def feed(self, indices: array, addresses: array) -> None:
+        chunk = self.table.take(indices)
+        for position, scoreboard in enumerate(self.scoreboards):
+            self.conflicts[position] += len(scoreboard.scan(chunk))
+        for timer in self.timers:
+            timer.feed(chunk)
+
+    def finish(self, result: SimulationResult) -> None:
+        prediction = self.predictor.run(result.branch_trace, CONTROL_SLOTS)
+        timings = [timer.result() for timer in self.timers]
+        for timing in timings:
+            if timing.instructions:
+                timing.cycles += prediction.stall_cycles
+            timing.stalls["control"] = prediction.stall_cycles
+        self.report = DynamicReport(
+            instructions=result.executed, data_conflicts=self.conflicts[0],
+            data_conflicts_fw=self.conflicts[1], timing=timings[0], timing_fw=timings[1],
+            prediction=prediction
+        )
+
+def simulate_program(words: Sequence[int], base_address: int = 0,
+                     max_instructions: int = DEFAULT_MAX_INSTRUCTIONS,
+                     keep_trace: bool = False) -> SimulationResult:
+    """Atalho para Simulator(words, base_address).run(max_instructions)"""
+    return Simulator(words, base_address).run(max_instructions, keep_trace=keep_trace)
@@ -0,0 +1,42 @@
+"""Preditores: caminho NumPy x laço em Python sobre os mesmos traces"""
+import random
+
+import pytest
+
+import branch_prediction
+from branch_prediction import (
+    BranchTrace, StaticNotTaken, BackwardTaken, BimodalPredictor, GsharePredictor,
+    BranchTargetBuffer
+)
+
+PREDICTORS = [
+    StaticNotTaken(), BackwardTaken(), BimodalPredictor(4, 1), BimodalPredictor(16, 2),
+    BimodalPredictor(1, 2), GsharePredictor(16), GsharePredictor(8, history=5),
+    BranchTargetBuffer(4), BranchTargetBuffer(1),
+]
+
+def random_trace(rng, count):
+    pcs = [rng.choice([0x100, 0x104, 0x2100, 0x500, 0x900, 0x1100]) + 4 * rng.randrange(4)
+           for _ in range(count)]
+    bias = rng.choice([0.1, 0.5, 0.9])
+    taken = [int(rng.random() < bias) for _ in range(count)]
+    targets = [rng.choice([0x40, 0x3000, pc]) for pc in pcs]
+    return BranchTrace(pcs, taken, targets)
+
+@pytest.mark.skipif(branch_prediction.np is None, reason="NumPy não instalado")
+@pytest.mark.parametrize("scan_steps", [1, 3, 16, 2048])
+def test_numpy_matches_python(monkeypatch, scan_steps):
+    monkeypatch.setattr(branch_prediction, "NUMPY_MIN_EVENTS", 1)
+    monkeypatch.setattr(branch_prediction, "SCAN_STEPS", scan_steps)
+    rng = random.Random(scan_steps)
+    for _ in range(50):
+        trace = random_trace(rng, rng.randrange(0, 400))
+        for predictor in PREDICTORS:
+            expected = predictor._mispredictions_python(trace.pcs, trace.taken, trace.targets)
+            assert predictor.mispredictions(trace) == expected, predictor.name
+
+def test_always_taken_loop():
+    trace = BranchTrace([0x40] * 100, [1] * 99 + [0], [0x20] * 100)
+    assert BackwardTaken().mispredictions(trace) == 1
+    assert StaticNotTaken().mispredictions(trace) == 99
+    assert BimodalPredictor(16, 2).mispredictions(trace) == 2  # Aquecimento e saída
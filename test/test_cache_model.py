@@ -0,0 +1,70 @@
+"""Caches: LRU x um modelo com OrderedDict, e o custo das faltas nas técnicas"""
+import random
+from collections import OrderedDict
+
+import pytest
+
+from cache_model import Cache, CacheAnalysis, CacheConfig, simulate_cache
+from parallel_analysis import analyze_all_techniques_parallel
+from pipeline_analyzer import PipelineAnalyzer, TECHNIQUES, CYCLE_TECHNIQUES
+from program_generator import generate_loop_program
+
+def lru_misses(addresses, size, ways, line_size):
+    sets = [OrderedDict() for _ in range(size // (ways * line_size))]
+    misses = 0
+    for address in addresses:
+        line = address // line_size
+        resident = sets[line % len(sets)]
+        if line in resident:
+            resident.move_to_end(line)
+        else:
+            misses += 1
+            resident[line] = True
+            if len(resident) > ways:
+                resident.popitem(last=False)
+    return misses
+
+@pytest.mark.parametrize("ways", [1, 2, 4, 8])
+def test_lru_matches_model(ways):
+    rng = random.Random(ways)
+    for _ in range(40):
+        line_size, sets = rng.choice([4, 16, 64]), rng.choice([1, 2, 8, 64])
+        size = ways * line_size * sets
+        addresses = [rng.choice([rng.randrange(1 << 32), rng.randrange(4096),
+                                 0x7FFFE000 + rng.randrange(256)])
+                     for _ in range(rng.randrange(1, 2000))]
+        cache = Cache(CacheConfig(size, ways, line_size))
+        # Em dois blocos: o estado persiste entre chamadas
+        split = rng.randrange(len(addresses) + 1)
+        cache.access_many(addresses[:split])
+        cache.access_many(iter(addresses[split:]))
+        assert cache.accesses == len(addresses)
+        assert cache.misses == lru_misses(addresses, size, ways, line_size)
+        if ways == 1:
+            assert simulate_cache(addresses, CacheConfig(size, 1, line_size, "random")).misses == cache.misses
+
+def test_invalid_config():
+    with pytest.raises(ValueError):
+        Cache(CacheConfig(size=3000))
+    with pytest.raises(ValueError):
+        Cache(CacheConfig(replacement="fifo"))
+
+def test_disabled_cache():
+    analysis = CacheAnalysis(icache=None)
+    assert analysis.icache is None and analysis.dcache is not None
+    # Cada CacheAnalysis tem as próprias caches
+    assert CacheAnalysis().icache is not CacheAnalysis().icache
+
+def test_miss_cycles_only_in_cycle_techniques():
+    analyzer = PipelineAnalyzer(list(generate_loop_program(20_000, body=500)))
+    analyzer.simulate()  # As bolhas de controle passam a vir do preditor
+    results = analyzer.results()
+    before = {name: results[name][1] for name in TECHNIQUES}
+    analyzer.simulate(caches=CacheAnalysis(CacheConfig(1024, 2, 32), None))
+    memory = analyzer.memory_stall_cycles()
+    assert memory > 0
+    parallel = analyze_all_techniques_parallel(analyzer, 2)
+    for name in TECHNIQUES:
+        expected = before[name] + (memory if name in CYCLE_TECHNIQUES else 0)
+        assert results[name][1] == expected, name  # Resultados memorizados renovados
+        assert parallel[name][1] == expected, name
@@ -0,0 +1,61 @@
+"""decode_batch (NumPy) x decodificação escalar, campo a campo"""
+import random
+
+import pytest
+
+from riscv_classifier import (
+    np, decode_batch, decode_word, decode_instruction, MNEMONIC_SPECS, MNEMONICS, OPCODE_TYPES, IMM_BITS,
+    TYPE_NAMES, TYPE_CODES, get_opcode, get_rd, get_funct3, get_rs1, get_rs2, get_funct7,
+    get_imm_i, get_imm_s, get_imm_b, get_imm_u, get_imm_j, sign_extend
+)
+
+pytestmark = pytest.mark.skipif(np is None, reason="NumPy não instalado")
+
+FIELDS = {"opcode": get_opcode, "rd": get_rd, "funct3": get_funct3, "rs1": get_rs1,
+          "rs2": get_rs2, "funct7": get_funct7}
+IMMEDIATES = {"i": get_imm_i, "s": get_imm_s, "b": get_imm_b, "u": get_imm_u, "j": get_imm_j}
+
+def sample_words():
+    rng = random.Random(0)
+    words = [rng.randrange(1 << 32) for _ in range(5000)] + [0, 0xFFFFFFFF, 0x80000000]
+    # Cada mnemônico, cada opcode conhecido com todo funct3 e funct7 de borda, e opcodes desconhecidos
+    for _, opcode, funct3, funct7 in MNEMONIC_SPECS:
+        for _ in range(20):
+            word = (rng.randrange(1 << 25) << 7) | opcode
+            if funct3 is not None:
+                word = (word & ~(0x7 << 12)) | (funct3 << 12)
+            if funct7 is not None:
+                word = (word & 0x01FFFFFF) | (funct7 << 25)
+            words.append(word)
+    for opcode in list(OPCODE_TYPES) + [0x7F, 0x0B, 0x53]:
+        for funct3 in range(8):
+            for funct7 in (0x00, 0x01, 0x20, 0x7F):
+                words.append((funct7 << 25) | (rng.randrange(1 << 13) << 12 & 0x1FF000)
+                             | (funct3 << 12) | (rng.randrange(32) << 7) | opcode)
+    return words
+
+def test_matches_scalar_decoder():
+    words = sample_words()
+    batch = decode_batch(np.array(words, dtype=np.uint32))
+    columns = {name: column.tolist() for name, column in batch.items()}
+    for index, word in enumerate(words):
+        for name, getter in FIELDS.items():
+            assert columns[name][index] == getter(word), (hex(word), name)
+        for fmt, getter in IMMEDIATES.items():
+            assert columns["imm_" + fmt][index] == getter(word), (hex(word), fmt)
+            assert columns["simm_" + fmt][index] == sign_extend(getter(word), IMM_BITS[fmt]), (hex(word), fmt)
+        decoded = decode_word(word)
+        assert (columns["type_code"][index], columns["flags"][index], columns["mnemonic"][index]) == \
+            (decoded.type_code, decoded.flags, decoded.mnemonic), hex(word)
+        # Referência direta pelas especificações, sem passar por DECODE_LUT
+        opcode, funct3, funct7 = word & 0x7F, (word >> 12) & 7, word >> 25
+        assert TYPE_NAMES[decoded.type_code] == OPCODE_TYPES.get(opcode, "UNKNOWN"), hex(word)
+        mnemonic = next((name for name, op, f3, f7 in MNEMONIC_SPECS
+                         if op == opcode and f3 in (None, funct3) and f7 in (None, funct7)), "unknown")
+        assert MNEMONICS[decoded.mnemonic] == mnemonic, hex(word)
+        if decoded.type_code != TYPE_CODES["UNKNOWN"]:
+            assert decode_instruction(word)["tipo"] == TYPE_NAMES[decoded.type_code]
+
+def test_empty_input():
+    batch = decode_batch(np.empty(0, dtype=np.uint32))
+    assert all(len(column) == 0 for column in batch.values())
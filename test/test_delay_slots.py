@@ -0,0 +1,125 @@
+"""O programa com os slots preenchidos, executado com delayed branch, tem o
+mesmo efeito que o original executado sem atraso"""
+import random
+
+import pytest
+
+from delay_slots import fill_delay_slots
+from instruction_table import decode_buffer, FLAG_BRANCH, FLAG_JUMP
+from program_generator import (
+    generate_program, ProgramProfile, encode_b, encode_i, encode_j, encode_s
+)
+from riscv_simulator import Simulator, PAGE_BITS
+
+BASE = 0x40000000  # Longe dos endereços usados pelos loads e stores
+LIMIT = 5000
+
+def addi(rd, rs1, imm):
+    return encode_i(0x13, rd, 0, rs1, imm)
+
+def beq(rs1, rs2, offset):
+    return encode_b(0x63, 0, rs1, rs2, offset * 4)
+
+def bne(rs1, rs2, offset):
+    return encode_b(0x63, 1, rs1, rs2, offset * 4)
+
+def jal(rd, offset):
+    return encode_j(0x6F, rd, offset * 4)
+
+def sw(rs2, rs1, imm):
+    return encode_s(0x23, 2, rs1, rs2, imm)
+
+def run(words, slots, registers):
+    """Executa com `slots` slots de atraso depois de cada desvio ou salto
+
+    Retorna registradores, memória de dados e onde a execução saiu do
+    programa (antes do início ou depois do fim), ou None no limite.
+    """
+    sim = Simulator(words, BASE)
+    sim.regs[1:32] = registers
+    handlers, n = sim.handlers, len(words)
+    flags = decode_buffer(words).flags
+    index = 0
+    for _ in range(LIMIT):
+        if index >= n:
+            break
+        following = handlers[index]()
+        if flags[index] & (FLAG_BRANCH | FLAG_JUMP):
+            if flags[index] & FLAG_JUMP:
+                sim.regs[(words[index] >> 7) & 31] = 0  # O endereço de retorno muda com o layout
+            for slot in range(index + 1, min(index + 1 + slots, n)):
+                handlers[slot]()
+            if following == index + 1:
+                following += slots
+        index = following
+    else:
+        return None
+    end = BASE + 4 * n
+    pc = sim.branch_trace.targets[-1] if index > n else end
+    exit = ("before", pc - BASE) if pc < BASE else ("after", pc - end)
+    code = range(BASE >> PAGE_BITS, (end >> PAGE_BITS) + 1)
+    data = {number: page for number, page in sim.memory.pages.items() if number not in code}
+    return sim.regs[:32], data, exit
+
+def check(words, slots=1, registers=None):
+    registers = registers if registers is not None else [0] * 31
+    result = fill_delay_slots(decode_buffer(words), slots=slots)
+    expected = run(words, 0, registers)
+    assert expected is not None
+    assert run(result.program, slots, registers) == expected
+    assert result.report.unrelocated == 0
+    return result.report
+
+def test_hoist():
+    words = [addi(5, 0, 1), addi(6, 0, 2), beq(6, 6, 2), addi(7, 0, 3), addi(8, 5, 4)]
+    assert check(words).filled_before == 1
+
+def test_target_copy():
+    words = [beq(1, 0, 3), addi(7, 0, 5), addi(6, 0, 2), addi(7, 0, 7), addi(8, 7, 1)]
+    report = check(words)
+    assert report.filled_target == 1
+    check(words, registers=[1] + [0] * 30)  # Também no caminho não tomado
+
+def test_jump_target_copy():
+    words = [jal(1, 2), addi(5, 0, 1), addi(6, 0, 2), addi(7, 6, 1)]
+    assert check(words).filled_target == 1
+
+def test_fall_through():
+    words = [bne(1, 0, 3), addi(5, 0, 1), addi(6, 0, 2), sw(6, 1, 0), addi(5, 0, 9)]
+    report = check(words)
+    assert report.filled_fall_through == 1
+    check(words, registers=[8] + [0] * 30)
+
+@pytest.mark.parametrize("slots", [1, 2])
+def test_target_outside_program(slots):
+    # Alvos antes do início e depois do fim, com slots inseridos entre desvio e alvo
+    words = [addi(5, 0, 1), beq(1, 0, 4), addi(6, 0, 2), beq(0, 0, -5), addi(7, 0, 3)]
+    check(words, slots)
+    check(words, slots, registers=[1] + [0] * 30)
+    words = [addi(5, 0, 1), beq(1, 0, 4), jal(0, 3), addi(6, 0, 2), beq(0, 0, -7)]
+    check(words, slots)
+    check(words, slots, registers=[1] + [0] * 30)
+
+def test_auipc_not_moved():
+    auipc = (1 << 12) | (5 << 7) | 0x17
+    words = [auipc, addi(6, 0, 2), beq(6, 6, 2), addi(7, 0, 3), addi(8, 5, 4)]
+    assert check(words).filled_before == 0
+
+def test_generated_programs():
+    rng = random.Random(1)
+    checked = 0
+    for seed in range(300):
+        profile = ProgramProfile(
+            branch_density=rng.choice([0.05, 0.15, 0.3]), jump_density=rng.choice([0.0, 0.05]),
+            dependency_distance=rng.choice([1.5, 3.0, 8.0]), max_branch_offset=rng.choice([4, 16])
+        )
+        words = list(generate_program(rng.randrange(5, 60), profile, seed=seed))
+        slots = rng.choice([1, 2, 3])
+        registers = [rng.randrange(1 << 32) for _ in range(31)]
+        expected = run(words, 0, registers)
+        if expected is None:
+            continue  # Laço sem saída
+        result = fill_delay_slots(decode_buffer(words), slots=slots)
+        assert run(result.program, slots, registers) == expected, seed
+        checked += 1
+    assert checked > 100
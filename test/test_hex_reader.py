@@ -0,0 +1,38 @@
+"""Leitura de arquivos hexadecimais: linhas válidas, inválidas e relatório"""
+import warnings
+
+import pytest
+
+from riscv_classifier import parse_hex_line, iter_hex_chunks, read_hex_file
+
+@pytest.mark.parametrize("text, expected", [
+    ("00000013", 0x13), ("13", 0x13), ("0x00A00093", 0x00A00093), ("0XFFFFFFFF", 0xFFFFFFFF),
+    ("  00000013  # comentário", 0x13), ("00000013 // comentário", 0x13),
+    ("", None), ("   ", None), ("# só comentário", None),
+])
+def test_valid_lines(text, expected):
+    assert parse_hex_line(text) == expected
+
+@pytest.mark.parametrize("text", ["0x0x13", "0x", "+13", "-1", "1_3", "123456789", "0013 0013", "zz"])
+def test_invalid_lines(text):
+    with pytest.raises(ValueError):
+        parse_hex_line(text)
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 1024])
+def test_bad_lines_reported(tmp_path, chunk_size):
+    path = tmp_path / "trace.txt"
+    path.write_text("00000013\n0x0x13\n00A00093\n\nzz\n008000EF\n")
+    bad = []
+    words = []
+    for chunk in iter_hex_chunks(str(path), chunk_size, on_error=lambda line_no, text: bad.append((line_no, text))):
+        words.extend(chunk.tolist())
+    assert words == [0x13, 0x00A00093, 0x008000EF]
+    assert bad == [(2, "0x0x13"), (5, "zz")]
+
+def test_default_reporter_warns(tmp_path):
+    path = tmp_path / "trace.txt"
+    path.write_text("00000013\nzz\n")
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always")
+        assert read_hex_file(str(path)) == [0x13]
+    assert len(caught) == 1 and "linha 2" in str(caught[0].message)
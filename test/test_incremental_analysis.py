@@ -0,0 +1,93 @@
+"""Análise incremental: depois de cada edição, os mesmos resultados que a
+análise completa do texto atual"""
+import random
+
+import pytest
+
+import incremental_analysis
+from incremental_analysis import IncrementalAnalyzer, DirtyLines, analyze_global_techniques
+from pipeline_analyzer import PipelineAnalyzer, DEFAULT_LOOKAHEAD
+
+POOL = [0x00A00093, 0x00108133, 0x0000A183, 0x00208663, 0xFFDFF06F, 0x00312023,
+        0x00418233, 0x002081B3, 0x0001A283, 0x00528333]
+
+def random_line(rng):
+    draw = rng.random()
+    if draw < 0.05:
+        return ""
+    if draw < 0.08:
+        return "zz"  # Linha incompleta durante a digitação
+    if draw < 0.1:
+        return "# comentário"
+    return f"{rng.choice(POOL):08X}"
+
+def random_edit(rng, lines, most):
+    start = rng.randint(0, len(lines) - 1)
+    stop = rng.randint(start, min(len(lines), start + most))
+    return start, stop, [random_line(rng) for _ in range(rng.randint(1, most))]
+
+def words_of(lines):
+    return [int(line, 16) for line in lines if line and not line.startswith("#") and line != "zz"]
+
+@pytest.mark.parametrize("lookahead", [0, 1, 2, 4])
+def test_matches_full_analysis(lookahead):
+    rng = random.Random(lookahead)
+    for _ in range(30):
+        incremental = IncrementalAnalyzer(lookahead)
+        lines = [random_line(rng) for _ in range(rng.randint(1, 60))]
+        incremental.update(0, 0, lines)
+        for _ in range(6):
+            # Duas edições acumuladas antes de cada atualização
+            dirty = DirtyLines()
+            for most in (5, 3):
+                start, stop, new = random_edit(rng, lines, most)
+                dirty.replace(start, stop - start, len(new))
+                lines = lines[:start] + new + lines[stop:]
+            first, old_end, new_end = dirty.take()
+            results = incremental.update(first, old_end, lines[first:new_end])
+            assert incremental.invalid_lines == lines.count("zz")
+
+            words = words_of(lines)
+            expected = PipelineAnalyzer(words, lookahead).analyze_all_techniques()
+            assert list(incremental.words) == words
+            for name, (program, overhead) in results.items():
+                assert (list(program), overhead) == (list(expected[name][0]), expected[name][1]), name
+            for name, value in analyze_global_techniques(incremental.snapshot()).items():
+                assert value == expected[name], name
+
+def test_dirty_lines_accumulates():
+    dirty = DirtyLines()
+    dirty.replace(10, 1, 3)  # Linha 10 vira 10-12
+    dirty.replace(2, 0, 1)   # Linha nova antes dela
+    assert dirty.take() == (2, 11, 14)
+    assert dirty.take() is None
+
+def test_edit_rescans_only_a_window(monkeypatch):
+    rng = random.Random(0)
+    lines = [f"{rng.choice(POOL):08X}" for _ in range(20_000)]
+    incremental = IncrementalAnalyzer()
+    incremental.update(0, 0, lines)
+    scanned, rebuilt = [], []
+    for stream in (incremental.data, incremental.data_fw, incremental.control):
+        def detect(analyzer, start, stop, original=stream.detect):
+            scanned.append(stop - start)
+            return original(analyzer, start, stop)
+        stream.detect = detect
+    with_nops = incremental_analysis._with_nops
+    def recording(words, stalls, start):
+        rebuilt.append(len(stalls))
+        return with_nops(words, stalls, start)
+    monkeypatch.setattr(incremental_analysis, "_with_nops", recording)
+    monkeypatch.setattr(incremental.analyzer, "compute_stalls", None)  # Nada de recálculo completo
+
+    for _ in range(10):
+        index = rng.randrange(len(lines))
+        lines[index] = f"{rng.choice(POOL):08X}"
+        results = incremental.update(index, index + 1, lines[index:index + 1])
+    # Cada edição de uma linha reexamina só uma janela em volta dela
+    assert len(scanned) == len(rebuilt) == 30
+    assert max(scanned) <= 1 + DEFAULT_LOOKAHEAD
+    assert max(rebuilt) <= 64
+    expected = PipelineAnalyzer(words_of(lines)).analyze_all_techniques()
+    for name, (program, overhead) in results.items():
+        assert (list(program), overhead) == (list(expected[name][0]), expected[name][1]), name
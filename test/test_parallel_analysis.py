@@ -0,0 +1,20 @@
+"""Análise em processos separados x análise serial"""
+import random
+
+import pytest
+
+from parallel_analysis import analyze_all_techniques_parallel
+from pipeline_analyzer import PipelineAnalyzer, TECHNIQUES
+
+POOL = [0x00A00093, 0x00108133, 0x0000A183, 0x00208663, 0xFFDFF06F, 0x00312023,
+        0x00418233, 0x002081B3, 0x0001A283, 0x00528333, 0x00000073]
+
+@pytest.mark.parametrize("count", [0, 5, 3000])
+def test_matches_serial(count):
+    rng = random.Random(count)
+    words = [rng.choice(POOL) for _ in range(count)]
+    expected = PipelineAnalyzer(words).analyze_all_techniques()
+    results = analyze_all_techniques_parallel(PipelineAnalyzer(words), workers=2)
+    assert list(results) == list(expected) == list(TECHNIQUES)
+    for name, (program, overhead) in results.items():
+        assert (list(program), overhead) == (list(expected[name][0]), expected[name][1]), name
@@ -0,0 +1,73 @@
+"""PipelineTimer: ciclos calculados à mão para programas curtos
+
+Sem conflitos, n instruções levam n + 4 ciclos no pipeline de 5 estágios.
+"""
+import pytest
+
+from instruction_table import InstructionTable
+from pipeline_timing import (
+    PipelineTimer, TimingConfig, Forwarding, BranchResolution, simulate
+)
+from program_generator import encode_b, encode_i, encode_j, encode_r
+
+def addi(rd, rs1, imm=1):
+    return encode_i(0x13, rd, 0, rs1, imm)
+
+def add(rd, rs1, rs2):
+    return encode_r(0x33, rd, 0, rs1, rs2, 0)
+
+def lw(rd, rs1):
+    return encode_i(0x03, rd, 2, rs1, 0)
+
+def beq(rs1, rs2):
+    return encode_b(0x63, 0, rs1, rs2, 8)
+
+def jal(rd):
+    return encode_j(0x6F, rd, 8)
+
+def jalr(rd, rs1):
+    return encode_i(0x67, rd, 0, rs1, 0)
+
+def timing(words, forwarding=Forwarding.NONE, resolution=BranchResolution.EX, **options):
+    config = TimingConfig(forwarding=forwarding, branch_resolution=resolution, lookahead=2, **options)
+    result = simulate(InstructionTable.from_words(words), config)
+    return result.cycles, result.stalls
+
+NONE, EX_EX = Forwarding.NONE, Forwarding.EX_EX
+ID, EX = BranchResolution.ID, BranchResolution.EX
+
+@pytest.mark.parametrize("words, forwarding, resolution, cycles, stalls", [
+    # Sem dependências
+    ([addi(1, 0), addi(2, 0), addi(3, 0)], NONE, EX, 7, (0, 0, 0)),
+    # RAW entre ALUs: 2 bolhas sem forwarding, nenhuma com
+    ([addi(1, 0), add(2, 1, 1)], NONE, EX, 8, (2, 0, 0)),
+    ([addi(1, 0), add(2, 1, 1)], EX_EX, EX, 6, (0, 0, 0)),
+    # RAW a distância 2: 1 bolha sem forwarding
+    ([addi(1, 0), addi(3, 0), add(2, 1, 1)], NONE, EX, 8, (1, 0, 0)),
+    # Load-use: 1 bolha mesmo com forwarding
+    ([lw(1, 0), add(2, 1, 0)], EX_EX, EX, 7, (0, 1, 0)),
+    ([lw(1, 0), add(2, 1, 0)], NONE, EX, 8, (2, 0, 0)),
+    # Desvio: 2 bolhas resolvido no EX, 1 no ID
+    ([beq(0, 0), addi(1, 0)], NONE, EX, 8, (0, 0, 2)),
+    ([beq(0, 0), addi(1, 0)], NONE, ID, 7, (0, 0, 1)),
+    ([jal(0), addi(1, 0)], NONE, EX, 8, (0, 0, 2)),
+    # No ID com forwarding, o desvio precisa do operando um ciclo antes
+    ([addi(1, 0), beq(1, 0), addi(2, 0)], EX_EX, ID, 9, (1, 0, 1)),
+    ([addi(1, 0), beq(1, 0), addi(2, 0)], EX_EX, EX, 9, (0, 0, 2)),
+    # jalr lê o alvo de rs1 e paga o mesmo ciclo; jal não tem operandos
+    ([addi(1, 0), jalr(0, 1), addi(2, 0)], EX_EX, ID, 9, (1, 0, 1)),
+    ([addi(1, 0), jal(0), addi(2, 0)], EX_EX, ID, 8, (0, 0, 1)),
+])
+def test_hand_computed(words, forwarding, resolution, cycles, stalls):
+    assert timing(words, forwarding, resolution) == (cycles, dict(zip(("data", "load_use", "control"), stalls)))
+
+def test_delay_slot_hides_one_bubble():
+    assert timing([beq(0, 0), addi(1, 0)], delay_slots=1) == (7, {"data": 0, "load_use": 0, "control": 1})
+
+def test_chunks_match_whole_program():
+    words = [lw(1, 0), add(2, 1, 0), beq(2, 1), addi(3, 2), jalr(1, 3), add(4, 3, 1)] * 5
+    config = TimingConfig(forwarding=EX_EX, branch_resolution=ID)
+    timer = PipelineTimer(config)
+    for start in range(0, len(words), 4):
+        timer.feed(InstructionTable.from_words(words[start:start + 4]))
+    assert timer.result() == simulate(InstructionTable.from_words(words), config)
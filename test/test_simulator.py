@@ -0,0 +1,134 @@
+"""Simulador RV32I: test/test.txt, laço com ecall de saída e comparação com
+um interpretador de referência direto"""
+import os
+import random
+
+import pytest
+
+from program_generator import generate_loop_program, generate_program, ProgramProfile
+from riscv_classifier import read_hex_file
+from riscv_simulator import (
+    Simulator, simulate_program, STACK_POINTER, GLOBAL_POINTER,
+    STOP_EXIT, STOP_LIMIT, STOP_OUT_OF_PROGRAM
+)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+MASK = 0xFFFFFFFF
+
+def test_example_program():
+    words = read_hex_file(os.path.join(HERE, "test.txt"))
+    sim = Simulator(words)
+    result = sim.run(keep_trace=True)
+    # O beq não é tomado e o jal salta por cima do addi a7, para fora do programa
+    assert result.stop_reason == STOP_OUT_OF_PROGRAM
+    assert result.executed == 6
+    assert list(result.trace) == [0, 1, 2, 3, 4, 5]
+    assert result.pc == 4 * 7
+    assert result.registers[8] == 5 and result.registers[9] == 10
+    assert result.registers[10] == 0x12345000
+    assert result.registers[1] == 4 * 6  # Link do jal
+    assert sim.memory.load(17, 4) == 10
+    assert list(result.addresses) == [17]
+
+@pytest.mark.parametrize("body", [1, 64, 256])
+def test_loop_program_exits(body):
+    result = simulate_program(generate_loop_program(20_000, body, seed=body), keep_trace=True)
+    assert result.stop_reason == STOP_EXIT
+    assert 20_000 - (body + 2) < result.executed <= 20_000 + 6
+    assert result.executed == len(result.trace)
+    # O laço fecha com um bne tomado em todas as voltas, menos a última
+    taken = result.branch_trace.taken
+    assert taken.count(0) == 1 and taken[-1] == 0
+
+def test_instruction_limit():
+    words = generate_loop_program(10_000)
+    result = simulate_program(words, max_instructions=1000)
+    assert result.stop_reason == STOP_LIMIT and result.executed == 1000
+
+def _signed(value, bits):
+    sign = 1 << (bits - 1)
+    return (value ^ sign) - sign
+
+def reference(words, limit):
+    """Interpretador palavra a palavra, sem pré-decodificação"""
+    x = [0] * 32
+    x[2], x[3] = STACK_POINTER, GLOBAL_POINTER
+    memory = {4 * k + b: (word >> (8 * b)) & 0xFF for k, word in enumerate(words) for b in range(4)}
+    branches = []
+    pc = executed = 0
+    while executed < limit:
+        if pc & 3 or not 0 <= pc >> 2 < len(words):
+            return STOP_OUT_OF_PROGRAM, executed, x, pc, branches, memory
+        w = words[pc >> 2]
+        op, rd, f3, f7 = w & 0x7F, (w >> 7) & 31, (w >> 12) & 7, w >> 25
+        a, b = x[(w >> 15) & 31], x[(w >> 20) & 31]
+        imm_i = _signed(w >> 20, 12)
+        following, value = pc + 4, None
+        if op == 0x37:
+            value = w & 0xFFFFF000
+        elif op == 0x17:
+            value = pc + (w & 0xFFFFF000)
+        elif op == 0x6F:
+            offset = _signed((((w >> 31) & 1) << 20) | (((w >> 12) & 0xFF) << 12)
+                             | (((w >> 20) & 1) << 11) | (((w >> 21) & 0x3FF) << 1), 21)
+            value, following = pc + 4, (pc + offset) & MASK
+            branches.append((pc, 1, following))
+        elif op == 0x67:
+            value, following = pc + 4, (a + imm_i) & 0xFFFFFFFE
+            branches.append((pc, 1, following))
+        elif op == 0x63:
+            offset = _signed((((w >> 31) & 1) << 12) | (((w >> 7) & 1) << 11)
+                             | (((w >> 25) & 0x3F) << 5) | (((w >> 8) & 0xF) << 1), 13)
+            sa, sb = _signed(a, 32), _signed(b, 32)
+            taken = {0: a == b, 1: a != b, 4: sa < sb, 5: sa >= sb, 6: a < b, 7: a >= b}[f3]
+            target = (pc + offset) & MASK
+            branches.append((pc, int(taken), target))
+            if taken:
+                following = target
+        elif op == 0x03:
+            address = (a + imm_i) & MASK
+            size = {0: 1, 1: 2, 2: 4, 4: 1, 5: 2}[f3]
+            value = sum(memory.get((address + k) & MASK, 0) << (8 * k) for k in range(size))
+            if f3 in (0, 1):
+                value = _signed(value, 8 * size)
+        elif op == 0x23:
+            address = (a + _signed((f7 << 5) | rd, 12)) & MASK
+            for k in range({0: 1, 1: 2, 2: 4}[f3]):
+                memory[(address + k) & MASK] = (b >> (8 * k)) & 0xFF
+        elif op == 0x13:
+            shift = (w >> 20) & 31
+            value = {0: a + imm_i, 1: a << shift, 2: int(_signed(a, 32) < imm_i),
+                     3: int(a < imm_i & MASK), 4: a ^ imm_i, 6: a | imm_i, 7: a & imm_i,
+                     5: _signed(a, 32) >> shift if f7 else a >> shift}[f3]
+        elif op == 0x33:
+            shift = b & 31
+            value = {0: a - b if f7 else a + b, 1: a << shift,
+                     2: int(_signed(a, 32) < _signed(b, 32)), 3: int(a < b), 4: a ^ b,
+                     5: _signed(a, 32) >> shift if f7 else a >> shift, 6: a | b, 7: a & b}[f3]
+        if value is not None and rd:
+            x[rd] = value & MASK
+        pc = following
+        executed += 1
+    return STOP_LIMIT, executed, x, pc, branches, memory
+
+def test_matches_reference():
+    for seed in range(400):
+        rng = random.Random(seed)
+        profile = ProgramProfile(load=0.15, store=0.15, jump_density=0.04)
+        words = generate_program(rng.randrange(5, 200), profile, seed)
+        # Alguns jalr e auipc
+        for _ in range(3):
+            rd = rng.randrange(6, 31)
+            words[rng.randrange(len(words))] = rng.choice([
+                ((rng.randrange(-64, 64) * 4 & 0xFFF) << 20) | (rd << 7) | 0x67,
+                (rng.randrange(1 << 20) << 12) | (rd << 7) | 0x17,
+            ])
+        limit = rng.randrange(1, 3000)
+        reason, executed, registers, pc, branches, memory = reference(list(words), limit)
+        sim = Simulator(words)
+        result = sim.run(limit, chunk_size=rng.choice([1, 7, 4096]))
+        trace = sim.branch_trace
+        assert (result.stop_reason, result.executed, result.registers, result.pc) == \
+            (reason, executed, registers, pc), seed
+        assert list(zip(trace.pcs, trace.taken, trace.targets)) == branches, seed
+        assert all(sim.memory.load(address, 1) == value for address, value in memory.items()), seed
@@ -10,6 +10,8 @@ TRANSLATIONS = {
         'pipeline_tab': 'Análise de Pipeline',
         'ready': 'Pronto para decodificar instruções',
         'file_loaded': 'Arquivo carregado: {}',
+        'file_loaded_invalid': 'Arquivo carregado: {} ({} linhas inválidas ignoradas, a primeira na linha {})',
+        'file_loaded_preview': 'Arquivo carregado: {} ({} instruções; o campo mostra só as primeiras {} e não pode ser editado)',
         'file_error': 'Erro ao carregar o arquivo',
         'empty_input': 'Por favor, insira algumas instruções para decodificar',
         'decode_success': 'Decodificação concluída com sucesso',
@@ -17,6 +19,13 @@ TRANSLATIONS = {
         'decode_error': 'Erro durante a decodificação: {}',
         'analysis_empty': 'Por favor, insira algumas instruções para analisar',
         'analysis_success': 'Análise de pipeline concluída com sucesso',
+        'cancel': 'Cancelar',
+        'task_cancelled': 'Operação cancelada',
+        'decoding': 'Decodificando...',
+        'analyzing': 'Analisando...',
+        'analysis_pending': 'Programa decodificado; as técnicas são calculadas ao exibir a aba de pipeline',
+        'live_analysis': 'Análise ao vivo',
+        'live_invalid_lines': 'Análise concluída; {} linha(s) inválida(s) ignorada(s)',
         'analysis_error': 'Erro durante a análise: {}',
         'warning': 'Aviso',
         'error': 'Erro',
@@ -41,8 +50,20 @@ TRANSLATIONS = {
             '9': '9. Combinação 4+6'
         },
         'grid_headers': ['Técnica', 'Conflitos', 'Sobrecusto', 'Ações'],
+        'decode_columns': ['Endereço', 'Hex', 'Tipo', 'rd', 'rs1', 'rs2', 'Imediato', 'Assembly'],
+        'profiling_menu': 'Desempenho',
+        'profiling_enable': 'Medir tempos por etapa',
+        'profiling_memory': 'Medir também o pico de memória (mais lento)',
+        'profiling_show': 'Painel de tempos',
+        'profiling_export_json': 'Exportar resumo (JSON)...',
+        'profiling_export_trace': 'Exportar trace do Chrome...',
+        'profiling_reset': 'Zerar medições',
+        'profiling_title': 'Tempos por etapa',
+        'profiling_columns': ['Etapa', 'Chamadas', 'Tempo (ms)', 'Instr/s', 'Pico (KiB)'],
+        'profiling_disabled': 'Ative "Medir tempos por etapa" no menu Desempenho',
         'view': 'Ver',
         'save': 'Salvar',
+        'instruction_label': 'Instrução',
         'instruction_format': 'formato = {}',
         'register_dest': 'rd = {}',
         'register_src1': 'rs1 = {}',
@@ -62,6 +83,8 @@ TRANSLATIONS = {
         'pipeline_tab': 'Pipeline Analysis',
         'ready': 'Ready to decode instructions',
         'file_loaded': 'File loaded: {}',
+        'file_loaded_invalid': 'File loaded: {} ({} invalid lines skipped, first at line {})',
+        'file_loaded_preview': 'File loaded: {} ({} instructions; the field shows only the first {} and is read-only)',
         'file_error': 'Error loading file',
         'empty_input': 'Please enter some instructions to decode',
         'decode_success': 'Decoding completed successfully',
@@ -69,6 +92,13 @@ TRANSLATIONS = {
         'decode_error': 'Error during decoding: {}',
         'analysis_empty': 'Please enter some instructions to analyze',
         'analysis_success': 'Pipeline analysis completed successfully',
+        'cancel': 'Cancel',
+        'task_cancelled': 'Operation cancelled',
+        'decoding': 'Decoding...',
+        'analyzing': 'Analyzing...',
+        'analysis_pending': 'Program decoded; techniques are computed when the pipeline tab is shown',
+        'live_analysis': 'Live analysis',
+        'live_invalid_lines': 'Analysis completed; {} invalid line(s) ignored',
         'analysis_error': 'Error during analysis: {}',
         'warning': 'Warning',
         'error': 'Error',
@@ -93,8 +123,20 @@ TRANSLATIONS = {
             '9': '9. Combination 4+6'
         },
         'grid_headers': ['Technique', 'Conflicts', 'Overhead', 'Actions'],
+        'decode_columns': ['Address', 'Hex', 'Type', 'rd', 'rs1', 'rs2', 'Immediate', 'Assembly'],
+        'profiling_menu': 'Performance',
+        'profiling_enable': 'Measure per-stage timings',
+        'profiling_memory': 'Also measure peak memory (slower)',
+        'profiling_show': 'Timing panel',
+        'profiling_export_json': 'Export summary (JSON)...',
+        'profiling_export_trace': 'Export Chrome trace...',
+        'profiling_reset': 'Reset measurements',
+        'profiling_title': 'Per-stage timings',
+        'profiling_columns': ['Stage', 'Calls', 'Time (ms)', 'Instr/s', 'Peak (KiB)'],
+        'profiling_disabled': 'Enable "Measure per-stage timings" in the Performance menu',
         'view': 'View',
         'save': 'Save',
+        'instruction_label': 'Instruction',
         'instruction_format': 'format = {}',
         'register_dest': 'rd = {}',
         'register_src1': 'rs1 = {}',
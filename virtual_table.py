@@ -0,0 +1,142 @@
+from tkinter import ttk
+from typing import Callable, Optional, Sequence, Tuple
+
+# Altura de linha usada quando o tema não define a do Treeview
+DEFAULT_ROW_HEIGHT = 20
+# Linhas roladas por passo da roda do mouse
+WHEEL_ROWS = 3
+
+class VirtualTableView(ttk.Frame):
+    """Tabela que só mantém itens para as linhas visíveis
+
+    Os dados ficam fora do widget e são lidos sob demanda por
+    `row_getter(índice)`, que retorna os valores das colunas. O Treeview tem
+    sempre tantos itens quanto cabem na tela; rolar apenas troca os valores
+    desses itens, então a memória do widget não depende do número de linhas.
+    """
+
+    def __init__(self, parent, columns: Sequence[str], widths: Sequence[int] = None, **kwargs):
+        super().__init__(parent, **kwargs)
+        self.columns = tuple(f"c{i}" for i in range(len(columns)))
+        self.tree = ttk.Treeview(self, columns=self.columns, show="headings", selectmode="none")
+        self.set_headings(columns)
+        for column, width in zip(self.columns, widths or ()):
+            self.tree.column(column, width=width, stretch=False)
+        self.tree.tag_configure("selected", background="#cce4ff")
+
+        self.scrollbar = ttk.Scrollbar(self, orient="vertical", command=self.yview)
+        self.scrollbar.pack(side="right", fill="y")
+        self.tree.pack(side="left", fill="both", expand=True)
+
+        self.row_count = 0
+        self.row_getter: Optional[Callable[[int], Tuple]] = None
+        self.on_select: Optional[Callable[[int], None]] = None
+        self.top = 0
+        self.selected = None
+        self.items = []
+
+        self.tree.bind("<Configure>", lambda event: self.refresh())
+        self.tree.bind("<Button-1>", self._on_click)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda event: self.scroll(-WHEEL_ROWS))
+        self.tree.bind("<Button-5>", lambda event: self.scroll(WHEEL_ROWS))
+        self.tree.bind("<Up>", lambda event: self._move_selection(-1))
+        self.tree.bind("<Down>", lambda event: self._move_selection(1))
+        self.tree.bind("<Prior>", lambda event: self._move_selection(-len(self.items)))
+        self.tree.bind("<Next>", lambda event: self._move_selection(len(self.items)))
+        self.tree.bind("<Home>", lambda event: self._move_selection(-self.row_count))
+        self.tree.bind("<End>", lambda event: self._move_selection(self.row_count))
+
+    def set_headings(self, headings: Sequence[str]) -> None:
+        for column, heading in zip(self.columns, headings):
+            self.tree.heading(column, text=heading)
+
+    def set_rows(self, count: int, row_getter: Callable[[int], Tuple]) -> None:
+        """Troca a fonte de dados e volta ao início"""
+        self.row_count = count
+        self.row_getter = row_getter
+        self.top = 0
+        self.selected = None
+        self.refresh()
+
+    def clear(self) -> None:
+        self.set_rows(0, None)
+
+    def _visible_rows(self) -> int:
+        row_height = ttk.Style().lookup("Treeview", "rowheight")
+        row_height = int(row_height) if row_height else DEFAULT_ROW_HEIGHT
+        # Desconta o cabeçalho, com altura de aproximadamente uma linha
+        return max(1, self.tree.winfo_height() // row_height - 1)
+
+    def refresh(self) -> None:
+        """Ajusta o número de itens à altura atual e preenche as linhas visíveis"""
+        visible = self._visible_rows()
+        while len(self.items) < visible:
+            self.items.append(self.tree.insert("", "end"))
+        while len(self.items) > visible:
+            self.tree.delete(self.items.pop())
+
+        self.top = max(0, min(self.top, self.row_count - visible))
+        for offset, item in enumerate(self.items):
+            index = self.top + offset
+            if index < self.row_count:
+                tags = ("selected",) if index == self.selected else ()
+                self.tree.item(item, values=self.row_getter(index), tags=tags)
+            else:
+                self.tree.item(item, values=(), tags=())
+        # Mantém o Treeview sem rolagem própria
+        self.tree.yview_moveto(0)
+
+        if self.row_count:
+            first = self.top / self.row_count
+            last = min(1.0, (self.top + visible) / self.row_count)
+            self.scrollbar.set(first, last)
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def yview(self, *args) -> None:
+        """Comando da barra de rolagem ('moveto', fração) ou ('scroll', n, unidade)"""
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * self.row_count)
+        elif args[0] == "scroll":
+            step = len(self.items) if args[2] == "pages" else 1
+            self.top += int(args[1]) * step
+        self.refresh()
+
+    def scroll(self, rows: int) -> str:
+        self.top += rows
+        self.refresh()
+        return "break"
+
+    def see(self, index: int) -> None:
+        """Rola o mínimo necessário para que a linha `index` fique visível"""
+        if index < self.top:
+            self.top = index
+        elif index >= self.top + len(self.items):
+            self.top = index - len(self.items) + 1
+        self.refresh()
+
+    def select(self, index: int) -> None:
+        if not self.row_count:
+            return
+        self.selected = max(0, min(index, self.row_count - 1))
+        self.see(self.selected)
+        if self.on_select is not None:
+            self.on_select(self.selected)
+
+    def _on_click(self, event) -> None:
+        self.tree.focus_set()
+        item = self.tree.identify_row(event.y)
+        if item in self.items:
+            index = self.top + self.items.index(item)
+            if index < self.row_count:
+                self.select(index)
+
+    def _on_wheel(self, event) -> str:
+        # Windows usa múltiplos de 120; o macOS envia passos pequenos
+        steps = event.delta // 120 if abs(event.delta) >= 120 else (1 if event.delta > 0 else -1)
+        return self.scroll(-steps * WHEEL_ROWS)
+
+    def _move_selection(self, delta: int) -> str:
+        self.select((self.top if self.selected is None else self.selected) + delta)
+        return "break"